@@ -1,30 +1,117 @@
-
 import os
+import argparse
+import asyncio
+import logging
+import subprocess
+import sys
 from dotenv import load_dotenv
 from model.task_model import TaskModel
+from model.async_task_model import AsyncTaskModel
+from model.storage_client import StorageClient
+from model.storage_server import DEFAULT_ADDRESS
+from model.translation_cache import TranslationCache
+from model.embedding_store import EmbeddingStore
 from viewmodel.task_viewmodel import TaskViewModel
+from viewmodel.nlp_worker_pool import NLPWorkerPool
+from viewmodel.history_backfill import HistoryBackfill
 from view.task_view import TaskView
+from utils.logging_config import configure_logging
 import discord
- 
 
-# Load environment variables from .env file
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Discord task bot")
+    parser.add_argument('--shards', type=int, default=0,
+                        help="Launch a storage server and this many shard processes, one per gateway shard")
+    parser.add_argument('--shard-id', type=int, default=None, help="Run only this shard (used by --shards)")
+    parser.add_argument('--shard-count', type=int, default=None)
+    parser.add_argument('--storage', default=None,
+                        help="host:port of a storage server to use instead of opening discord_tasks.db directly")
+    parser.add_argument('--nlp-workers', type=int, default=0,
+                        help="Run language detection and translation in this many worker processes, "
+                             "plus one for embeddings and summaries (shard 0 only when sharded)")
+    parser.add_argument('--import-jsonl', metavar='PATH', default=None,
+                        help="Import a JSONL message export into discord_tasks.db and exit, without connecting to Discord")
+    return parser.parse_args()
+
+
+def launch_shards(args):
+    """Start the single storage server, then one bot process per shard, and wait for them."""
+    command = [sys.executable, '-m', 'model.storage_server', '--address', args.storage or DEFAULT_ADDRESS]
+    if os.getenv('METRICS_PORT'):
+        # Shards serve on METRICS_PORT + shard id, so the storage server takes the port after the last shard
+        command += ['--metrics-port', str(int(os.getenv('METRICS_PORT')) + args.shards)]
+    storage = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    address = storage.stdout.readline().strip().rsplit(' ', 1)[-1]  # "Storage server listening on host:port"
+    logger.info("Storage server running at %s", address)
+    shards = [subprocess.Popen([sys.executable, __file__, '--shard-id', str(shard_id), '--shard-count', str(args.shards),
+                                '--storage', address, '--nlp-workers', str(args.nlp_workers)])
+              for shard_id in range(args.shards)]
+    try:
+        for shard in shards:
+            shard.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in shards + [storage]:
+            process.terminate()
+        for process in shards + [storage]:
+            process.wait()
+
+
+def import_history(path):
+    """Offline history import: resumable, and safe to run again on the same file."""
+    storage = AsyncTaskModel(TaskModel(reset_table=False))
+    try:
+        asyncio.run(HistoryBackfill(storage, TaskViewModel()).import_jsonl(path))
+    finally:
+        storage.close()
+    logger.info("New tasks are translated and embedded the next time the bot runs.")
+
+
+def main():
+    args = parse_args()
+    load_dotenv()  # LID_MODEL_PATH and LOG_LEVEL may be set there
+    configure_logging()
+    if args.import_jsonl:
+        import_history(args.import_jsonl)
+        return
+    if args.shards:
+        launch_shards(args)
+        return
+
+    # Get Discord bot token
+    discord_token = os.getenv('DISCORD_TOKEN')
+
+    # Instantiate Model, ViewModel, and View
+    if args.storage:
+        # Sharded: every shard talks to the one storage server, which is the only SQLite writer
+        task_model = StorageClient(args.storage)
+    else:
+        # All SQLite access goes through a dedicated thread so it never blocks the event loop
+        task_model = AsyncTaskModel(TaskModel(reset_table=False))
+    # The translation cache lives in discord_tasks.db; new translations are written through task_model, its one writer
+    task_viewmodel = TaskViewModel(translation_cache=TranslationCache('discord_tasks.db', read_only=True))
+    # Shard 0 runs the background stages, so it is the only one that needs the pool
+    nlp_pool = NLPWorkerPool(args.nlp_workers, storage=task_model) if args.nlp_workers and not args.shard_id else None
 
-# Get Discord bot token
-discord_token = os.getenv('DISCORD_TOKEN')
+    intents = discord.Intents.default()
+    intents.message_content = True
+    # intents.messages = True  # Ensure the bot can read messages
 
-# Instantiate Model, ViewModel, and View
-task_model = TaskModel(reset_table=False)
-task_viewmodel = TaskViewModel()
+    # # Initialize the bot with commands.Bot, inheriting from TaskView
+    # bot = commands.Bot(command_prefix="!", intents=intents)
 
-intents = discord.Intents.default()
-intents.message_content = True
-# intents.messages = True  # Ensure the bot can read messages
+    # Task embeddings for "find", kept in discord_messages.db plus a memory-mapped matrix file;
+    # shard 0 embeds new tasks, the other shards only search
+    embedding_store = EmbeddingStore(read_only=bool(args.shard_id))
 
-# # Initialize the bot with commands.Bot, inheriting from TaskView
-# bot = commands.Bot(command_prefix="!", intents=intents)
+    client = TaskView(model=task_model, viewmodel=task_viewmodel, nlp_pool=nlp_pool, embedding_store=embedding_store, intents=intents,
+                      shard_id=args.shard_id, shard_count=args.shard_count)
 
-client = TaskView(model=task_model, viewmodel=task_viewmodel, intents=intents)
+    # Run the Discord bot; logging is already configured, so discord.py must not add its own handler
+    client.run(discord_token, log_handler=None)
 
 
 # # Command to clear a specified number of messages
@@ -63,5 +150,6 @@ client = TaskView(model=task_model, viewmodel=task_viewmodel, intents=intents)
 # bot.run(discord_token)
 
 
-# Run the Discord bot
-client.run(discord_token)
+# Worker processes of the NLP pool import this module too, so nothing may start at import time
+if __name__ == '__main__':
+    main()
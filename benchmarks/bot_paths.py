@@ -0,0 +1,259 @@
+# /benchmarks/bot_paths.py
+"""Drive TaskView.on_message through ingest and every report path, at several DB sizes.
+
+Discord and the NLP models are replaced (benchmarks/fakes.py): messages come
+from fake users in fake channels, and language identification, translation and
+embeddings are fast deterministic stubs. The numbers therefore measure the bot's
+own pipeline: preprocessing, thread hops, SQLite, digests, report assembly,
+translation caching, chunking and dispatch. Discord's rate limits are lifted
+(benchmarks.message_dispatch measures those). Needs discord.py and NumPy, as the
+bot does.
+
+For each size the database is seeded with a corpus spread over months
+(benchmarks/corpus.py), then translated, embedded and digested as the background
+stages would have done. Then:
+
+- ingest: `--messages` live messages through on_message, `--concurrency` at a
+  time as discord.py dispatches events; msgs/s includes the last group commit
+- reports: `--requests` mentions per report path, some of them in French so
+  reports are translated; latency runs from on_message until the last chunk is sent
+- memory: peak traced Python allocations per phase, in a separate shorter pass
+  because tracing slows everything down, and the process's peak RSS so far
+
+Results go to a JSON file (default benchmarks/results/bot_paths-<commit>.json).
+Compare two runs with:  python -m benchmarks.compare_results old.json new.json
+
+Run from the repository root:  python -m benchmarks.bot_paths --sizes 10000,100000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import discord
+
+from benchmarks.common import CHANNELS, percentile, temp_db_path
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.fakes import FakeServer, StubEmbedder, StubLanguageIdentifier, StubTranslator
+from model.async_task_model import AsyncTaskModel
+from model.embedding_store import EmbeddingStore
+from model.task_model import TaskModel
+from model.translation_cache import TranslationCache
+from view.message_dispatcher import MessageDispatcher
+from view.task_view import TaskView
+from viewmodel.task_viewmodel import TaskViewModel
+
+REPORT_CHANNEL = 'reports'  # Not a task channel, as reports are usually asked for elsewhere
+EMBEDDING_DIM = 64
+
+
+def report_request(path, corpus, server, rng, foreign_share=0.3):
+    """A mention that handle_bot_mentions routes to `path`; returns (content, mentions)."""
+    bot = server.bot_user
+    word = 'rapport' if rng.random() < foreign_share else 'report'  # French requests get French reports
+    user = server.users[corpus.author()]
+    day = datetime.strptime(rng.choice(corpus.days), '%Y-%m-%d').strftime('%d/%m/%Y')
+    if path == 'find':
+        return f"{bot.mention} find tasks about {corpus.line('en', words=3)}", [bot]
+    if path == 'today':
+        return f"{bot.mention} {word} today", [bot]
+    if path == 'day':
+        return f"{bot.mention} {word} {day}", [bot]
+    if path == 'user_day':
+        return f"{bot.mention} {user.mention} {word} {day}", [bot, user]
+    if path == 'till_date':
+        return f"{bot.mention} {word} till {day}", [bot]
+    if path == 'user_till_date':
+        return f"{bot.mention} {user.mention} {word} till {day}", [bot, user]
+    raise ValueError(f"Unknown report path {path}")
+
+
+def report_messages(path, count, corpus, server, rng, foreign_share):
+    messages = []
+    for _ in range(count):
+        content, mentions = report_request(path, corpus, server, rng, foreign_share)
+        messages.append(server.message(content, corpus.author(), REPORT_CHANNEL, mentions))
+    return messages
+
+
+# handle_bot_mentions branches; "all tasks of a user" is not listed because the
+# today/yesterday fallback before it catches every mention without a date
+REPORT_PATHS = ('find', 'today', 'day', 'user_day', 'till_date', 'user_till_date')
+
+
+async def build_bot(db_path, size, corpus):
+    """A TaskView on a seeded database, with stub NLP and no gateway connection."""
+    directory = os.path.dirname(db_path)
+    model = TaskModel(db_path=db_path)
+    start = time.perf_counter()
+    tasks = corpus.tasks(size)
+    while chunk := [row for _, row in zip(range(5000), tasks)]:
+        model.store_tasks(chunk)
+
+    viewmodel = TaskViewModel(translation_cache=TranslationCache(os.path.join(directory, 'translation_cache.db')),
+                              translator_factory=StubTranslator, language_identifier=StubLanguageIdentifier(),
+                              embedder=StubEmbedder(EMBEDDING_DIM))
+    embedding_store = EmbeddingStore(db_path=os.path.join(directory, 'messages.db'),
+                                     matrix_path=os.path.join(directory, 'embeddings.f32'), dim=EMBEDDING_DIM)
+    bot = TaskView(model=AsyncTaskModel(model), viewmodel=viewmodel, embedding_store=embedding_store,
+                   intents=discord.Intents.default())
+    server = FakeServer(CHANNELS + [REPORT_CHANNEL, 'general-chat'], corpus.authors)
+    bot._connection.user = server.bot_user  # What logging in would set; on_message compares authors and mentions with it
+    # Discord's per-channel rate limits would dominate every report; take them out
+    bot.dispatcher = MessageDispatcher(capacity=10 ** 9, rate=10 ** 9)
+
+    # What the background stages would have done by now; setup_hook is not run, since the
+    # digest job would start summarizing every past day with T5
+    await bot.pivot_stage.backfill()
+    bot.embedding_stage.batch_size = 1000
+    while await bot.embedding_stage.run_once():
+        pass
+    await bot.model.refresh_digests()
+    bot.ingest_queue.start()
+    return bot, server, time.perf_counter() - start
+
+
+async def close_bot(bot):
+    await bot.ingest_queue.close()
+    await bot.dispatcher.close()
+    bot.model.close()
+    bot.embedding_store.close()
+    bot.viewmodel.translation_cache.conn.close()
+
+
+async def drive_ingest(bot, messages, concurrency):
+    """Dispatch messages as discord.py does, each in its own task, at most `concurrency` at a time."""
+    latencies = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def handle(message):
+        async with slots:
+            start = time.perf_counter()
+            await bot.on_message(message)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handle(message) for message in messages))
+    await bot.ingest_queue.flush()
+    return time.perf_counter() - start, latencies
+
+
+async def drive_requests(bot, messages):
+    latencies = []
+    for message in messages:
+        start = time.perf_counter()
+        await bot.on_message(message)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def traced_peak_mb(coroutine):
+    """Peak Python allocations (MiB) while the coroutine runs, threads included."""
+    tracemalloc.start()
+    try:
+        await coroutine
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def latency_stats(latencies):
+    milliseconds = [latency * 1000 for latency in latencies]
+    return {'p50_ms': round(percentile(milliseconds, 50), 3), 'p99_ms': round(percentile(milliseconds, 99), 3),
+            'max_ms': round(max(milliseconds, default=0), 3), 'mean_ms': round(sum(milliseconds) / max(1, len(milliseconds)), 3)}
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10, 1)  # Bytes on macOS, KiB on Linux
+
+
+async def run_size(size, args):
+    corpus = CorpusGenerator(seed=args.seed, authors=args.authors, months=args.months)
+    rng = random.Random(args.seed)
+    with temp_db_path() as db_path:
+        bot, server, seed_seconds = await build_bot(db_path, size, corpus)
+        try:
+            result = {'db_tasks': size, 'seed_seconds': round(seed_seconds, 2)}
+
+            live = [server.message(*message) for message in corpus.live_messages(args.messages)]
+            elapsed, latencies = await drive_ingest(bot, live, args.concurrency)
+            traced = [server.message(*message) for message in corpus.live_messages(max(1, args.messages // 10))]
+            result['ingest'] = {'messages': len(live), 'msgs_per_sec': round(len(live) / elapsed, 1), **latency_stats(latencies),
+                                'peak_mb': round(await traced_peak_mb(drive_ingest(bot, traced, args.concurrency)), 2)}
+            print(f"{size:>9} tasks  ingest          {result['ingest']['msgs_per_sec']:>9.0f} msgs/s  "
+                  f"p50 {result['ingest']['p50_ms']:8.2f} ms  p99 {result['ingest']['p99_ms']:8.2f} ms  "
+                  f"peak {result['ingest']['peak_mb']:7.1f} MiB", flush=True)
+
+            result['reports'] = {}
+            for path in REPORT_PATHS:
+                requests = report_messages(path, args.requests, corpus, server, rng, args.foreign_share)
+                sent_before = server.messages_sent()
+                latencies = await drive_requests(bot, requests)
+                sent = server.messages_sent() - sent_before
+                traced = report_messages(path, max(1, args.requests // 10), corpus, server, rng, args.foreign_share)
+                stats = {'requests': len(requests), **latency_stats(latencies),
+                         'discord_messages_per_request': round(sent / len(requests), 1),
+                         'peak_mb': round(await traced_peak_mb(drive_requests(bot, traced)), 2)}
+                result['reports'][path] = stats
+                print(f"{'':>15}  {path:<15} {stats['discord_messages_per_request']:>9.1f} msgs/req  "
+                      f"p50 {stats['p50_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  peak {stats['peak_mb']:7.1f} MiB", flush=True)
+            result['max_rss_mb'] = peak_rss_mb()
+            return result
+        finally:
+            await close_bot(bot)
+
+
+def git_revision():
+    """(short commit, whether the tree has uncommitted changes), or (None, None) outside a checkout."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000', help="Comma-separated task counts to seed the database with")
+    parser.add_argument('--messages', type=int, default=5000, help="Live messages sent through on_message per size")
+    parser.add_argument('--concurrency', type=int, default=16, help="on_message calls in flight at once during ingest")
+    parser.add_argument('--requests', type=int, default=20, help="Mentions per report path per size")
+    parser.add_argument('--authors', type=int, default=200)
+    parser.add_argument('--months', type=int, default=6)
+    parser.add_argument('--foreign-share', type=float, default=0.3, help="Share of report requests written in French")
+    parser.add_argument('--translator-delay', type=float, default=0.0, help="Seconds each stub translator request takes")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help="JSON results file (default benchmarks/results/bot_paths-<commit>.json)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)  # Slow-query warnings still show
+    StubTranslator.delay = args.translator_delay
+
+    commit, dirty = git_revision()
+    results = {'benchmark': 'bot_paths', 'commit': commit, 'dirty': dirty, 'created_at': datetime.now().isoformat(timespec='seconds'),
+               'python': platform.python_version(), 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+               'params': {name: value for name, value in vars(args).items() if name != 'output'}, 'sizes': []}
+    for size in (int(size) for size in args.sizes.split(',')):
+        results['sizes'].append(asyncio.run(run_size(size, args)))
+    results['translator_requests'] = StubTranslator.requests
+
+    output = args.output or os.path.join('benchmarks', 'results', f"bot_paths-{commit or 'unknown'}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# /benchmarks/common.py
+import os
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+
+CHANNELS = ['général', 'back', 'front', 'database']
+AUTHORS = [f"user{i}#{1000 + i}" for i in range(50)]
+WORDS = ("fix login bug deploy api endpoint review pull request update schema write tests "
+         "refactor frontend form database migration call with client urgent asap").split()
+
+
+@contextmanager
+def temp_db_path():
+    """Yield a path to a throwaway SQLite file that is removed afterwards."""
+    with tempfile.TemporaryDirectory() as tmp:
+        yield os.path.join(tmp, 'bench_tasks.db')
+
+
+def synthetic_task(rng=random):
+    """Return a (content, author, channel, language) tuple that looks like a standup line."""
+    content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 14)))
+    return content, rng.choice(AUTHORS), rng.choice(CHANNELS), 'en'
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,69 @@
+# /benchmarks/compare_results.py
+"""Compare two bot_paths result files and flag regressions.
+
+Every metric present in both files is listed with its change. Throughput
+(msgs_per_sec) should go up; latencies (*_ms) and memory (*_mb) should go down.
+A change for the worse beyond --threshold percent is marked REGRESSION, and the
+exit status is 1 if there is any, so the comparison can gate a CI job.
+
+Run from the repository root:  python -m benchmarks.compare_results old.json new.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+# Latencies this small are mostly scheduler noise, so their relative changes are not flagged
+MIN_FLAGGED_MS = 1.0
+
+
+def flatten(results):
+    """{(db_tasks, path, metric): value} for the numeric metrics of a bot_paths result file."""
+    metrics = {}
+    for size in results['sizes']:
+        phases = {'ingest': size['ingest'], **size['reports']}
+        for path, stats in phases.items():
+            for metric, value in stats.items():
+                if metric.endswith(('_ms', '_mb', '_per_sec')):
+                    metrics[(size['db_tasks'], path, metric)] = value
+        metrics[(size['db_tasks'], 'process', 'max_rss_mb')] = size['max_rss_mb']
+    return metrics
+
+
+def describe(results):
+    revision = results.get('commit') or 'unknown commit'
+    return f"{revision}{' (uncommitted changes)' if results.get('dirty') else ''}, {results.get('created_at', '')}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10.0, help="Percent change for the worse that counts as a regression")
+    args = parser.parse_args()
+    with open(args.baseline, encoding='utf-8') as baseline_file, open(args.candidate, encoding='utf-8') as candidate_file:
+        baseline, candidate = json.load(baseline_file), json.load(candidate_file)
+    if baseline.get('params') != candidate.get('params'):
+        print("Warning: the runs used different parameters, so not every change is the code's")
+    print(f"baseline:  {describe(baseline)}\ncandidate: {describe(candidate)}\n")
+
+    old, new = flatten(baseline), flatten(candidate)
+    regressions = 0
+    print(f"{'tasks':>9}  {'path':<15} {'metric':<30}{'baseline':>12}{'candidate':>12}{'change':>9}")
+    for key in sorted(old.keys() & new.keys()):
+        db_tasks, path, metric = key
+        before, after = old[key], new[key]
+        change = (after - before) / before * 100 if before else 0.0
+        worse = -change if metric.endswith('_per_sec') else change
+        flagged = worse > args.threshold and not (metric.endswith('_ms') and max(before, after) < MIN_FLAGGED_MS)
+        regressions += flagged
+        print(f"{db_tasks:>9}  {path:<15} {metric:<30}{before:>12.2f}{after:>12.2f}{change:>+8.1f}%"
+              f"{'  REGRESSION' if flagged else ''}")
+    missing = sorted(old.keys() ^ new.keys())
+    if missing:
+        print(f"\n{len(missing)} metrics are only in one of the files, e.g. {missing[0]}")
+    print(f"\n{regressions} regressions beyond {args.threshold:g}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
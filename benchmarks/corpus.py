@@ -0,0 +1,149 @@
+# /benchmarks/corpus.py
+"""Synthetic, reproducible task corpora: several languages, many authors, months of timestamps.
+
+A few authors post most of the tasks, as in a real server. Lines are built
+from a small word list per language whose entries line up by position, so the
+stub translator in benchmarks/fakes.py can translate word for word and the
+stub language identifier can tell the languages apart. None of the words
+contain a date keyword the report parser reacts to ("till", "today", ...).
+
+The corpus can also be written as a JSONL export, e.g. to seed a development
+database through `python app.py --import-jsonl`:
+
+    python -m benchmarks.corpus --tasks 100000 --jsonl export.jsonl
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.common import CHANNELS
+
+LANGUAGES = ('en', 'fr', 'es', 'de')
+
+# One row per word: its English, French, Spanish and German form
+VOCABULARY = [
+    ("fix", "corriger", "arreglar", "beheben"),
+    ("login", "connexion", "acceso", "anmeldung"),
+    ("bug", "bogue", "fallo", "fehler"),
+    ("deploy", "deployer", "desplegar", "ausrollen"),
+    ("endpoint", "terminaison", "extremo", "endpunkt"),
+    ("review", "relire", "revisar", "pruefen"),
+    ("code", "code", "codigo", "quelltext"),
+    ("update", "mettre", "actualizar", "aktualisieren"),
+    ("schema", "schema", "esquema", "schema"),
+    ("write", "ecrire", "escribir", "schreiben"),
+    ("tests", "tests", "pruebas", "tests"),
+    ("refactor", "restructurer", "refactorizar", "umbauen"),
+    ("form", "formulaire", "formulario", "formular"),
+    ("database", "base", "base", "datenbank"),
+    ("migration", "migration", "migracion", "migration"),
+    ("call", "appel", "llamada", "anruf"),
+    ("with", "avec", "con", "mit"),
+    ("client", "client", "cliente", "kunde"),
+    ("page", "page", "pagina", "seite"),
+    ("payment", "paiement", "pago", "zahlung"),
+    ("report", "rapport", "informe", "bericht"),
+    ("dashboard", "tableau", "panel", "uebersicht"),
+    ("server", "serveur", "servidor", "server"),
+    ("release", "version", "lanzamiento", "freigabe"),
+    ("urgent", "urgent", "urgente", "dringend"),
+    ("cache", "cache", "cache", "zwischenspeicher"),
+    ("invoice", "facture", "factura", "rechnung"),
+    ("checkout", "commande", "compra", "kasse"),
+]
+
+# Share of tasks written in each language
+LANGUAGE_SHARES = {'en': 0.6, 'fr': 0.25, 'es': 0.1, 'de': 0.05}
+
+
+class CorpusGenerator:
+    """Generates tasks and live messages from one seed, so every run sees the same corpus."""
+
+    def __init__(self, seed=42, authors=200, months=6, end=None, repeat_share=0.03):
+        self.rng = random.Random(seed)
+        self.authors = [f"user{i}#{1000 + i}" for i in range(authors)]
+        self.author_weights = [1 / rank for rank in range(1, authors + 1)]  # Zipf-like: a few authors post most
+        self.end = end or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)  # History ends before today
+        self.start = self.end - timedelta(days=30 * months)
+        self.repeat_share = repeat_share  # Reposts of one of the author's recent lines, for the duplicate check
+        self._recent = {}  # author -> their last few lines
+
+    @property
+    def days(self):
+        """Every 'YYYY-MM-DD' the history covers."""
+        return [(self.start + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range((self.end - self.start).days)]
+
+    def author(self):
+        return self.rng.choices(self.authors, self.author_weights)[0]
+
+    def language(self):
+        return self.rng.choices(list(LANGUAGE_SHARES), list(LANGUAGE_SHARES.values()))[0]
+
+    def line(self, language, words=None):
+        column = LANGUAGES.index(language)
+        text = " ".join(self.rng.choice(VOCABULARY)[column] for _ in range(words or self.rng.randint(5, 14)))
+        if self.rng.random() < 0.3:
+            text += f" JIRA-{self.rng.randint(100, 9999)}"
+        return text
+
+    def content(self, author, language):
+        """A new line, or now and then a repeat of one of the author's recent ones."""
+        recent = self._recent.setdefault(author, [])
+        if recent and self.rng.random() < self.repeat_share:
+            return self.rng.choice(recent)
+        text = self.line(language)
+        recent.append(text)
+        del recent[:-5]
+        return text
+
+    def tasks(self, count):
+        """Yield (content, author, channel, timestamp, language) rows in time order, spread over the history."""
+        days = (self.end - self.start).days
+        for index in range(count):
+            day = self.start + timedelta(days=index * days // count)
+            # Working hours; ingest stores str(datetime.now()), which includes microseconds
+            timestamp = day + timedelta(hours=8, seconds=self.rng.randrange(10 * 3600), microseconds=self.rng.randint(1, 999999))
+            author, language = self.author(), self.language()
+            yield self.content(author, language), author, self.rng.choice(CHANNELS), str(timestamp), language
+
+    def live_messages(self, count, other_channel='general-chat'):
+        """Yield (content, author, channel) as users would post them now.
+
+        Most are task lines in the task channels. Some are chatter in another
+        channel, which on_message ignores, and some are emoji only, which are
+        empty after cleaning.
+        """
+        for _ in range(count):
+            author, kind = self.author(), self.rng.random()
+            if kind < 0.03:
+                yield "\U0001F389\U0001F44D", author, self.rng.choice(CHANNELS)
+            elif kind < 0.08:
+                yield self.line(self.language()), author, other_channel
+            else:
+                yield self.content(author, self.language()), author, self.rng.choice(CHANNELS)
+
+    def write_jsonl(self, path, count):
+        """Write `count` tasks as an export for HistoryBackfill.import_jsonl."""
+        with open(path, 'w', encoding='utf-8') as export:
+            for index, (content, author, channel, timestamp, _) in enumerate(self.tasks(count)):
+                record = {'id': 10 ** 17 + index, 'channel': channel, 'author': author, 'content': content,
+                          'timestamp': datetime.fromisoformat(timestamp).astimezone().isoformat()}
+                export.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--authors', type=int, default=200)
+    parser.add_argument('--months', type=int, default=6)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--jsonl', required=True, metavar='PATH', help="Write the corpus here as a JSONL export")
+    args = parser.parse_args()
+    corpus = CorpusGenerator(args.seed, args.authors, args.months)
+    corpus.write_jsonl(args.jsonl, args.tasks)
+    print(f"Wrote {args.tasks} tasks by {args.authors} authors from {corpus.days[0]} to {corpus.days[-1]} to {args.jsonl}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# /benchmarks/daily_digest.py
+"""Compare repeated day reports built from tasks with reports read from daily_digests.
+
+The legacy path is what "@bot today" did before digests: get_tasks_by_date, group
+and format, then translate the whole report. The digest path reads pre-grouped
+digests, and their stored translations after the first request. Translation is a
+local stub that counts the lines it is asked to translate, so the work avoided
+shows up without network calls. A third measurement adds one task between
+requests, so every read has to rebuild that author's digest first.
+
+Run from the repository root:  python -m benchmarks.daily_digest --tasks 200000 --requests 50
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import percentile, synthetic_task, temp_db_path
+from model.async_task_model import AsyncTaskModel
+from model.task_model import TaskModel
+from viewmodel.daily_digest_job import DailyDigestJob
+
+
+class StubViewModel:
+    """Stands in for TaskViewModel: formats like it and 'translates' by tagging lines."""
+
+    def __init__(self):
+        self.lines_translated = 0
+
+    def translate_report(self, report, target_language):
+        lines = report.split("\n")
+        self.lines_translated += len(lines)
+        return "\n".join(f"[{target_language}] {line}" for line in lines)
+
+    def translate_digests(self, digests, target_language):
+        return [(self.translate_report("\n".join(contents), target_language).split("\n"), summary) for contents, summary in digests]
+
+    def format_report(self, tasks_by_user):
+        lines = []
+        for author, channels in tasks_by_user.items():
+            lines += ["", f"User: {author}"]
+            for channel, contents in channels.items():
+                lines += ["", f"{channel}:"] + [f"• {content}" for content in contents]
+        return "\n".join(lines)
+
+
+def fill(model, tasks, days, rng):
+    """Spread `tasks` evenly over `days` days ending today."""
+    start = datetime.now().replace(hour=8, minute=0) - timedelta(days=days - 1)
+    rows = []
+    for index in range(tasks):
+        content, author, channel, language = synthetic_task(rng)
+        timestamp = start + timedelta(days=index * days // tasks, seconds=rng.randint(0, 36000))  # Working hours
+        rows.append((f"{content} {index}", author, channel, str(timestamp), language))
+    with contextlib.redirect_stdout(io.StringIO()):
+        for first in range(0, len(rows), 5000):
+            model.store_tasks(rows[first:first + 5000])
+
+
+async def legacy_report(storage, viewmodel, day):
+    tasks_by_user = await storage.get_tasks_by_date(day)
+    return viewmodel.translate_report(viewmodel.format_report(tasks_by_user), 'fr')
+
+
+async def digest_report(job, viewmodel, day):
+    tasks_by_user = {}
+    for author, channel, contents, _ in await job.get_report_digest(day, 'fr'):
+        tasks_by_user.setdefault(author, {})[channel] = contents
+    return viewmodel.format_report(tasks_by_user)
+
+
+async def time_requests(label, requests, make_request, viewmodel, between=None):
+    viewmodel.lines_translated = 0
+    latencies = []
+    for _ in range(requests):
+        if between is not None:
+            await between()
+        start = time.perf_counter()
+        await make_request()
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"{label:>28}: first {latencies[0]:7.1f} ms, p50 {percentile(latencies, 50):7.2f} ms, "
+          f"p99 {percentile(latencies, 99):7.2f} ms, {viewmodel.lines_translated} lines translated")
+
+
+async def run(args):
+    rng = random.Random(42)
+    with temp_db_path() as db_path:
+        model = TaskModel(db_path=db_path, dedup_mode='off')
+        fill(model, args.tasks, args.days, rng)
+        storage = AsyncTaskModel(model)
+        viewmodel = StubViewModel()
+        job = DailyDigestJob(storage, viewmodel)
+        today = datetime.now().strftime('%Y-%m-%d')
+        tasks_today = (await storage.run(lambda: model.conn.execute("SELECT COUNT(*) FROM tasks WHERE day = ?", (today,)).fetchone()[0]))
+        print(f"{args.tasks} tasks over {args.days} days, {tasks_today} today; {args.requests} requests for today's report each")
+
+        await time_requests("legacy (query + translate)", args.requests, lambda: legacy_report(storage, viewmodel, today), viewmodel)
+        await time_requests("digest", args.requests, lambda: digest_report(job, viewmodel, today), viewmodel)
+
+        async def add_task():
+            content, author, channel, language = synthetic_task(rng)
+            with contextlib.redirect_stdout(io.StringIO()):
+                await storage.store_tasks([(content, author, channel, str(datetime.now()), language)])
+        await time_requests("digest, new task each time", args.requests, lambda: digest_report(job, viewmodel, today), viewmodel,
+                            between=add_task)
+        storage.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=200000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--requests', type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
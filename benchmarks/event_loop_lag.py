@@ -0,0 +1,67 @@
+# /benchmarks/event_loop_lag.py
+"""Measure event-loop lag while a synthetic message flood is written to the task DB.
+
+Run from the repository root:  python -m benchmarks.event_loop_lag --messages 2000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.common import percentile, synthetic_task, temp_db_path
+from model.async_task_model import AsyncTaskModel
+from model.task_model import TaskModel
+
+
+async def probe_lag(stop, samples, interval=0.001):
+    """Sleep for `interval` repeatedly and record how late the loop wakes us up."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def flood(store, messages, rng):
+    for _ in range(messages):
+        result = store(*synthetic_task(rng))
+        if asyncio.iscoroutine(result):
+            await result
+        else:
+            await asyncio.sleep(0)  # Give the loop a chance to run, as discord.py would between events
+
+
+async def run(mode, messages):
+    rng = random.Random(42)
+    with temp_db_path() as db_path:
+        model = TaskModel(db_path=db_path)
+        store = model.store_task if mode == 'sync' else AsyncTaskModel(model).store_task
+        samples, stop = [], asyncio.Event()
+        prober = asyncio.create_task(probe_lag(stop, samples))
+        start = time.perf_counter()
+        await flood(store, messages, rng)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+        model.close()
+    return {
+        'mode': mode,
+        'messages': messages,
+        'msgs_per_sec': messages / elapsed,
+        'lag_p50_ms': percentile(samples, 50),
+        'lag_p99_ms': percentile(samples, 99),
+        'lag_max_ms': max(samples, default=0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=2000)
+    args = parser.parse_args()
+    for mode in ('sync', 'async'):
+        result = asyncio.run(run(mode, args.messages))
+        print("{mode:>5}: {msgs_per_sec:8.0f} msg/s  lag p50={lag_p50_ms:6.2f}ms  "
+              "p99={lag_p99_ms:6.2f}ms  max={lag_max_ms:6.2f}ms".format(**result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+# /benchmarks/fakes.py
+"""Stand-ins for Discord objects and the NLP models, for driving TaskView without a gateway or model files.
+
+The fakes implement only what on_message, the report paths and MessageDispatcher
+touch. The stubs are deterministic and fast. Language identification and
+translation work word by word on the corpus vocabulary (benchmarks/corpus.py),
+so tasks are identified and translated consistently. Embeddings are hashed bags
+of words, so "find" returns tasks that share words with the query.
+"""
+import itertools
+import time
+import zlib
+from datetime import datetime, timezone
+
+from benchmarks.corpus import LANGUAGES, VOCABULARY
+
+_snowflakes = itertools.count(10 ** 18)
+
+# Words that belong to exactly one language; shared ones ("code", "schema", ...) say nothing
+_WORD_LANGUAGE = {}
+for _row in VOCABULARY:
+    for _language, _word in zip(LANGUAGES, _row):
+        if sum(word == _word for word in _row) == 1:
+            _WORD_LANGUAGE[_word] = _language
+_TRANSLATIONS = {(source, target): {row[LANGUAGES.index(source)]: row[LANGUAGES.index(target)] for row in VOCABULARY}
+                 for source in LANGUAGES for target in LANGUAGES}
+
+
+class FakeUser:
+    def __init__(self, name, user_id=None, bot=False):
+        self.id = user_id or next(_snowflakes)
+        self.name = name
+        self.bot = bot
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+    def __str__(self):
+        return self.name  # Tasks are stored under str(message.author)
+
+    def __eq__(self, other):
+        return isinstance(other, FakeUser) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakeGuild:
+    def __init__(self, name="Benchmark server"):
+        self.id = next(_snowflakes)
+        self.name = name
+        self.text_channels = []
+
+
+class FakeMessage:
+    def __init__(self, content, author, channel, mentions=()):
+        self.id = next(_snowflakes)
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.mentions = list(mentions)
+        self.created_at = datetime.now(timezone.utc)
+
+    async def delete(self):
+        pass
+
+
+class FakeChannel:
+    """Stands in for discord.TextChannel; answers at once and counts what it was sent, without keeping it."""
+
+    def __init__(self, name, guild):
+        self.id = next(_snowflakes)
+        self.name = name
+        self.guild = guild
+        self.messages_sent = 0
+        self.characters_sent = 0
+        guild.text_channels.append(self)
+
+    async def send(self, content=None, **kwargs):
+        self.messages_sent += 1
+        self.characters_sent += len(content or "")
+        return FakeMessage(content, None, self)
+
+    def get_partial_message(self, message_id):
+        return FakeMessage(None, None, self)
+
+    async def delete_messages(self, messages):
+        pass
+
+
+class StubLanguageIdentifier:
+    """fastText's predict() API; the majority language of the known words, 'unknown' below the threshold."""
+
+    def predict(self, texts, k=1):
+        labels, probabilities = [], []
+        for text in texts:
+            votes = {}
+            for word in text.lower().split():
+                language = _WORD_LANGUAGE.get(word)
+                if language:
+                    votes[language] = votes.get(language, 0) + 1
+            if votes:
+                language = max(votes, key=votes.get)
+                labels.append((f"__label__{language}",))
+                probabilities.append((votes[language] / sum(votes.values()),))
+            else:
+                labels.append(("__label__en",))
+                probabilities.append((0.1,))  # Below the confidence threshold, so 'unknown'
+        return labels, probabilities
+
+
+class StubTranslator:
+    """deep_translator's API, translating corpus words one by one; `delay` seconds per request emulates the round trip."""
+
+    delay = 0.0
+    requests = 0
+
+    def __init__(self, source='auto', target='en'):
+        self.words = _TRANSLATIONS.get((source, target), {})
+
+    def translate(self, text):
+        StubTranslator.requests += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return "\n".join(" ".join(self.words.get(word, word) for word in line.split(" ")) for line in text.split("\n"))
+
+
+class StubEmbedder:
+    """SentenceTransformer's encode() API: L2-normalized hashed bags of words."""
+
+    def __init__(self, dim=64):
+        self.dim = dim
+
+    def encode(self, texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False):
+        import numpy as np
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode('utf-8')) % self.dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class FakeServer:
+    """One guild with the task channels, a report channel and a user per corpus author."""
+
+    def __init__(self, channel_names, authors, bot_name="TaskBot#0001"):
+        self.guild = FakeGuild()
+        self.channels = {name: FakeChannel(name, self.guild) for name in channel_names}
+        self.users = {name: FakeUser(name) for name in authors}
+        self.bot_user = FakeUser(bot_name, bot=True)
+
+    def channel(self, name):
+        if name not in self.channels:
+            self.channels[name] = FakeChannel(name, self.guild)
+        return self.channels[name]
+
+    def message(self, content, author, channel_name, mentions=()):
+        return FakeMessage(content, self.users.get(author) or FakeUser(author), self.channel(channel_name), mentions)
+
+    def messages_sent(self):
+        return sum(channel.messages_sent for channel in self.channels.values())
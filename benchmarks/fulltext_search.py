@@ -0,0 +1,116 @@
+# /benchmarks/fulltext_search.py
+"""Compare TaskModel.search_tasks (FTS5) with LIKE scans on a large synthetic task table.
+
+Task text draws words from a Zipf-distributed vocabulary (the standup words of
+benchmarks.common first, then thousands of made-up words), so queries range from
+terms in a third of all tasks to terms in a handful. LIKE is timed for its first
+page, which stops early when matches are common, and for all matches, which is
+what ranking or counting results would need.
+
+Run from the repository root:  python -m benchmarks.fulltext_search --tasks 200000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import AUTHORS, CHANNELS, WORDS, Timer, percentile, temp_db_path
+from model.task_model import TaskModel, build_fts_query
+
+# (label, search_tasks text, LIKE patterns that must all match, filters)
+QUERIES = [
+    ("common word", "fix", ["%fix%"], {}),
+    ("mid word", "urgent", ["%urgent%"], {}),
+    ("rare word", "kovatela", ["%kovatela%"], {}),
+    ("two words", "login bug", ["%login%", "%bug%"], {}),
+    ("prefix", "kova*", ["%kova%"], {}),
+    ("phrase", '"pull request"', ["%pull request%"], {}),
+    ("word + author", "deploy", ["%deploy%"], {'author': AUTHORS[7]}),
+    ("word + dates", "urgent", ["%urgent%"], {'date_from': '2024-03-01', 'date_to': '2024-03-31'}),
+]
+
+SYLLABLES = "ka ko va te la mi ru so ne pi da lo fe zu ba ti".split()
+
+
+def vocabulary(size, rng):
+    """The standup words, then made-up words, with Zipf weights (the n-th word is n times rarer than the first)."""
+    made_up = {"kovatela"}  # Guaranteed to exist for the "rare word" query
+    while len(made_up) < size:
+        made_up.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = WORDS + sorted(made_up)
+    return words, [1 / (rank + 1) for rank in range(len(words))]
+
+
+def fill(model, tasks, rng, batch_size=5000, vocabulary_size=5000):
+    words, weights = vocabulary(vocabulary_size, rng)
+    start_day = datetime(2024, 1, 1)
+    rows = []
+    for index in range(tasks):
+        content = " ".join(rng.choices(words, weights, k=rng.randint(4, 14)))
+        timestamp = start_day + timedelta(minutes=index * 525600 // tasks)  # Spread over one year
+        rows.append((content, rng.choice(AUTHORS), rng.choice(CHANNELS), str(timestamp), 'en'))
+        if len(rows) == batch_size:
+            model.store_tasks(rows)
+            rows = []
+    if rows:
+        model.store_tasks(rows)
+
+
+def like_search(model, patterns, filters, limit=-1):
+    sql = ["SELECT task_id, content, author, channel, day FROM tasks WHERE 1"]
+    params = []
+    for pattern in patterns:
+        sql.append("AND content LIKE ?")
+        params.append(pattern)
+    for condition, key in (("author = ?", 'author'), ("day >= ?", 'date_from'), ("day <= ?", 'date_to')):
+        if filters.get(key):
+            sql.append(f"AND {condition}")
+            params.append(filters[key])
+    sql.append("ORDER BY task_id LIMIT ?")  # LIKE has no relevance ranking to offer; -1 means every match
+    return model.conn.execute(" ".join(sql), params + [limit]).fetchall()
+
+
+def count_matches(model, query, filters):
+    sql = ["SELECT count(*) FROM tasks_fts JOIN tasks t ON t.task_id = tasks_fts.rowid WHERE tasks_fts MATCH ?"]
+    params = [build_fts_query(query)]
+    for condition, key in (("t.author = ?", 'author'), ("t.day >= ?", 'date_from'), ("t.day <= ?", 'date_to')):
+        if filters.get(key):
+            sql.append(f"AND {condition}")
+            params.append(filters[key])
+    return model.conn.execute(" ".join(sql), params).fetchone()[0]
+
+
+def time_it(func, repeats):
+    samples = []
+    for _ in range(repeats):
+        with Timer() as timer:
+            func()
+        samples.append(timer.elapsed * 1000)
+    return percentile(samples, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=200000)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=10, help="Results per page")
+    args = parser.parse_args()
+    rng = random.Random(42)
+    with temp_db_path() as db_path:
+        model = TaskModel(db_path=db_path)
+        start = time.perf_counter()
+        fill(model, args.tasks, rng)
+        print(f"Stored {args.tasks} tasks in {time.perf_counter() - start:.1f}s (FTS triggers included)")
+        for label, query, patterns, filters in QUERIES:
+            fts_ms = time_it(lambda: model.search_tasks(query, limit=args.limit, **filters), args.repeats)
+            deep_ms = time_it(lambda: model.search_tasks(query, limit=args.limit, offset=50 * args.limit, **filters), args.repeats)
+            like_ms = time_it(lambda: like_search(model, patterns, filters, args.limit), args.repeats)
+            like_all_ms = time_it(lambda: like_search(model, patterns, filters), args.repeats)
+            matches = count_matches(model, query, filters)
+            print(f"{label:>14}: {matches:>7} matches | FTS5 page 1 {fts_ms:7.2f} ms, page 51 {deep_ms:7.2f} ms | "
+                  f"LIKE first page {like_ms:7.2f} ms, all matches {like_all_ms:7.2f} ms")
+        model.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# /benchmarks/group_commit.py
+"""Compare per-message commits with group-committed batches from TaskIngestQueue.
+
+Run from the repository root:  python -m benchmarks.group_commit --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+
+from benchmarks.common import synthetic_task, temp_db_path
+from model.async_task_model import AsyncTaskModel
+from model.task_ingest_queue import TaskIngestQueue
+from model.task_model import TaskModel
+
+
+async def per_message(storage, tasks):
+    for task in tasks:
+        await storage.store_task(*task)
+
+
+async def batched(storage, tasks):
+    queue = TaskIngestQueue(storage)
+    queue.start()
+    for task in tasks:
+        await queue.put(*task)
+        await asyncio.sleep(0)  # Messages arrive as separate events in the bot
+    await queue.close()
+
+
+async def run(mode, size):
+    tasks = [synthetic_task(random.Random(i)) for i in range(size)]
+    with temp_db_path() as db_path:
+        storage = AsyncTaskModel(TaskModel(db_path=db_path))
+        with contextlib.redirect_stdout(io.StringIO()):  # Silence the per-task print in store_task
+            start = time.perf_counter()
+            await (per_message if mode == 'per-message' else batched)(storage, tasks)
+            elapsed = time.perf_counter() - start
+        stored = await storage.run(lambda: storage.model.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0])
+        storage.close()
+    assert stored == size, f"expected {size} rows, found {stored}"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        results = {mode: asyncio.run(run(mode, size)) for mode in ('per-message', 'batched')}
+        print(f"{size:>7} msgs: per-message {size / results['per-message']:9.0f} msg/s, "
+              f"batched {size / results['batched']:9.0f} msg/s "
+              f"({results['per-message'] / results['batched']:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
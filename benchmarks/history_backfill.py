@@ -0,0 +1,134 @@
+# /benchmarks/history_backfill.py
+"""Measure HistoryBackfill.import_jsonl against importing the same export one message at a time.
+
+The export is synthetic: standup lines spread over several months in the task
+channels, with some bot commands and bot messages mixed in, which are skipped as
+on_message would skip them. Language detection is a stub that tags every batch
+in one call, like one batched fastText prediction, so the numbers show
+storage and pipeline cost. The run also interrupts an import partway, resumes it
+and imports the file again, then checks that every message was stored exactly once.
+
+Run from the repository root:  python -m benchmarks.history_backfill --messages 100000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import synthetic_task, temp_db_path
+from model.async_task_model import AsyncTaskModel
+from model.task_model import TaskModel
+from utils.preprocess import MessagePreprocessor
+from viewmodel.history_backfill import HistoryBackfill, RawMessage, format_timestamp
+
+
+class StubViewModel:
+    def __init__(self):
+        self.preprocessor = MessagePreprocessor()
+        self.calls = 0
+
+    def preprocess_and_identify(self, texts):
+        self.calls += 1
+        return [(content, 'en') for content in map(self.preprocessor.clean, texts)]
+
+
+class Interrupted(Exception):
+    pass
+
+
+def write_export(path, messages, rng):
+    """Write `messages` JSONL records; returns how many of them are tasks."""
+    start = datetime(2024, 1, 1, 8)
+    tasks = 0
+    with open(path, 'w', encoding='utf-8') as export:
+        for index in range(messages):
+            content, author, channel, _ = synthetic_task(rng)
+            record = {'id': 10 ** 17 + index, 'channel': channel, 'author': author, 'content': f"{content} {index}",
+                      'timestamp': (start + timedelta(seconds=index * 90)).isoformat() + '+00:00'}
+            kind = rng.random()
+            if kind < 0.05:
+                record['content'] = "!manage_tasks"
+            elif kind < 0.08:
+                record.update(author="TaskBot#0001", bot=True)
+            else:
+                tasks += 1
+            export.write(json.dumps(record) + "\n")
+    return tasks
+
+
+async def one_at_a_time(storage, viewmodel, export_path):
+    """What importing through the live path would cost: detect and store each message on its own."""
+    backfill = HistoryBackfill(storage, viewmodel)
+    with open(export_path, encoding='utf-8') as export:
+        for line in export:
+            record = json.loads(line)
+            if record.get('bot') or not backfill.is_task_message(record['content']):
+                continue
+            message = RawMessage(record['id'], record['content'], record['author'], record['channel'],
+                                 format_timestamp(record['timestamp']))
+            await storage.store_tasks(await backfill.prepare([message]))
+
+
+async def run(args):
+    rng = random.Random(42)
+    with temp_db_path() as db_path:
+        export_path = os.path.join(os.path.dirname(db_path), 'export.jsonl')
+        tasks = write_export(export_path, args.messages, rng)
+        print(f"{args.messages} messages in the export, {tasks} of them tasks")
+
+        # Near-duplicate checks are off so both runs store every task and do the same writes
+        if args.messages <= args.baseline_max:
+            storage = AsyncTaskModel(TaskModel(db_path=db_path + '.baseline', dedup_mode='off'))
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                await one_at_a_time(storage, StubViewModel(), export_path)
+                elapsed = time.perf_counter() - start
+            storage.close()
+            print(f"  one at a time: {tasks / elapsed:8.0f} msgs/s ({elapsed:.1f}s)")
+
+        storage = AsyncTaskModel(TaskModel(db_path=db_path, dedup_mode='off'))
+        viewmodel = StubViewModel()
+        batches = 0
+
+        def stop_partway():
+            nonlocal batches
+            batches += 1
+            if batches == 3:
+                raise Interrupted()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                await HistoryBackfill(storage, viewmodel, batch_size=args.batch_size, on_batch=stop_partway).import_jsonl(export_path)
+            except Interrupted:
+                pass
+            checkpoint = await storage.get_import_checkpoint(f"jsonl:{os.path.abspath(export_path)}")
+            start = time.perf_counter()
+            resumed = await HistoryBackfill(storage, viewmodel, batch_size=args.batch_size).import_jsonl(export_path)
+            elapsed = time.perf_counter() - start
+            again = await HistoryBackfill(storage, viewmodel, batch_size=args.batch_size).import_jsonl(export_path)
+        print(f"  bulk (batches of {args.batch_size}): {resumed / elapsed:8.0f} msgs/s ({elapsed:.1f}s), "
+              f"{viewmodel.calls} detection calls in total")
+
+        stored, distinct = await storage.run(lambda: storage.model.conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT message_id) FROM tasks").fetchone())
+        print(f"  interrupted after {checkpoint[1]} tasks, resumed with {resumed} more, "
+              f"re-import stored {again}: {stored} tasks, {distinct} distinct messages")
+        assert stored == distinct == tasks, "import lost or duplicated messages"
+        storage.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--baseline-max', type=int, default=100000, help="Largest export to also import one message at a time")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# /benchmarks/instrumentation_overhead.py
+"""Measure what the metrics and logging on hot paths cost per call.
+
+Compares an empty loop with span(), a @timed function, Counter.inc and
+Histogram.observe, and a disabled logger.debug call with the print it replaced
+(written to /dev/null). Then fills the registry with a realistic number of
+series and times rendering it and one scrape of the /metrics endpoint.
+
+Run from the repository root:  python -m benchmarks.instrumentation_overhead --calls 200000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from contextlib import redirect_stdout
+
+from utils.metrics import Registry, counter, histogram, span, start_metrics_server, timed
+
+logger = logging.getLogger('benchmarks.instrumentation_overhead')
+
+
+def per_call_ns(func, calls):
+    start = time.perf_counter()
+    func(calls)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def empty_loop(calls):
+    for _ in range(calls):
+        pass
+
+
+def span_loop(calls):
+    for _ in range(calls):
+        with span('bench.span'):
+            pass
+
+
+@timed('bench.timed')
+def timed_noop():
+    pass
+
+
+def timed_loop(calls):
+    for _ in range(calls):
+        timed_noop()
+
+
+COUNTS = counter('bench_events_total', "Benchmark events", ['outcome'])
+LATENCY = histogram('bench_latency_seconds', "Benchmark latencies", ['stage'])
+
+
+def counter_loop(calls):
+    for _ in range(calls):
+        COUNTS.inc(outcome='task')
+
+
+def histogram_loop(calls):
+    for _ in range(calls):
+        LATENCY.observe(0.003, stage='preprocess')
+
+
+def debug_log_loop(calls):
+    content = "fix login bug on the checkout page"
+    for _ in range(calls):
+        logger.debug("Queued task in %s [%s]: %s", 'back', 'en', content)
+
+
+def print_loop(calls):
+    content = "fix login bug on the checkout page"
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for _ in range(calls):
+            print(f"Queued task: {content}")
+
+
+def populated_registry(series):
+    registry = Registry()
+    spans = registry.histogram('span_seconds', "Time spent in each instrumented stage", ['stage'])
+    calls = registry.counter('calls_total', "Calls", ['method'])
+    for index in range(series):
+        spans.observe(0.001 * (index % 50), stage=f"stage{index}")
+        calls.inc(method=f"method{index}")
+    return registry
+
+
+async def scrape(registry):
+    server = await start_metrics_server('127.0.0.1', 0, registry)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return time.perf_counter() - start, response
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--series', type=int, default=100, help="Label combinations per metric for the render and scrape timing")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)  # As configure_logging() does by default, so debug records are dropped
+
+    baseline = per_call_ns(empty_loop, args.calls)
+    print(f"{'path':<28}{'ns/call':>10}{'overhead':>10}")
+    for name, loop in (('span()', span_loop), ('@timed function', timed_loop), ('Counter.inc', counter_loop),
+                       ('Histogram.observe', histogram_loop), ('logger.debug (disabled)', debug_log_loop),
+                       ('print to /dev/null', print_loop)):
+        cost = per_call_ns(loop, args.calls)
+        print(f"{name:<28}{cost:>10.0f}{cost - baseline:>10.0f}")
+
+    registry = populated_registry(args.series)
+    start = time.perf_counter()
+    text = registry.render()
+    render_ms = (time.perf_counter() - start) * 1000
+    elapsed, response = asyncio.run(scrape(registry))
+    status = response.split(b"\r\n", 1)[0].decode()
+    print(f"\nrender: {len(text.splitlines())} lines, {len(text) / 1024:.0f} KiB in {render_ms:.1f} ms; "
+          f"scrape: {status} in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# /benchmarks/language_id.py
+"""Compare report-body language detection: langdetect per report vs the batched, memoized fastText API.
+
+Needs the fastText model at LID_MODEL_PATH. `langdetect` is no longer a bot dependency;
+without it (`pip install langdetect`) the langdetect comparison is skipped.
+Run from the repository root:  python -m benchmarks.language_id --reports 200
+"""
+import argparse
+import random
+import time
+
+try:
+    from langdetect import DetectorFactory, detect
+except ImportError:
+    detect = None  # Benchmark-only dependency
+
+from benchmarks.summarizer_backends import load_corpus
+from viewmodel.task_viewmodel import TaskViewModel
+
+FRENCH_LINES = [
+    "corrigé le bug de connexion sur la page d'accueil",
+    "réunion avec le client pour la migration de la base de données",
+    "ajouté des tests pour le formulaire de paiement",
+    "revue de code pour la nouvelle API",
+]
+
+
+def build_reports(count, rng):
+    """Multi-line reports of a few kilobytes, mixing English and French task lines."""
+    english_lines = [line for text in load_corpus() for line in text.split(', ')]
+    reports = []
+    for _ in range(count):
+        lines = [f"• {rng.choice(english_lines if rng.random() < 0.7 else FRENCH_LINES)}" for _ in range(rng.randint(20, 60))]
+        reports.append("\n".join(lines))
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reports', type=int, default=200)
+    args = parser.parse_args()
+    reports = build_reports(args.reports, random.Random(3))
+
+    langdetect_seconds = None
+    if detect is not None:
+        DetectorFactory.seed = 0  # Otherwise langdetect is not even deterministic between runs
+        start = time.perf_counter()
+        for report in reports:
+            detect(report)
+        langdetect_seconds = time.perf_counter() - start
+
+    viewmodel = TaskViewModel()
+    viewmodel.language_identifier  # Load the model outside the timed section
+    start = time.perf_counter()
+    viewmodel.identify_languages(reports)
+    cold_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    viewmodel.identify_languages(reports)
+    memo_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for report in reports:
+        viewmodel.identify_languages(report.split("\n"))  # What translate_report does per report
+    per_line_seconds = time.perf_counter() - start
+
+    per_report = lambda seconds: seconds / len(reports) * 1000
+    if langdetect_seconds is None:
+        print("langdetect, whole report:      skipped (pip install langdetect to compare)")
+    else:
+        print(f"langdetect, whole report:      {per_report(langdetect_seconds):8.3f} ms/report")
+    print(f"fastText batch, cold:          {per_report(cold_seconds):8.3f} ms/report")
+    print(f"fastText batch, memoized:      {per_report(memo_seconds):8.3f} ms/report")
+    print(f"fastText per line (memoized):  {per_report(per_line_seconds):8.3f} ms/report")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# /benchmarks/message_dispatch.py
+"""Compare back-to-back channel.send/msg.delete calls with MessageDispatcher on fake channels.
+
+The fake channels enforce a per-channel token bucket like Discord's and answer after a
+fixed round trip; a call over the limit is counted as a 429 and waits for the reset,
+as discord.py does. Rates are scaled up so the run takes seconds, not minutes.
+
+Run from the repository root:  python -m benchmarks.message_dispatch --channels 3 --lines 60
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from datetime import datetime, timezone
+
+from benchmarks.common import WORDS
+from view.message_dispatcher import MessageDispatcher, TokenBucket
+
+_message_ids = itertools.count(1)
+
+
+class FakeMessage:
+    def __init__(self, channel, content):
+        self.id = next(_message_ids)
+        self.channel = channel
+        self.content = content
+        self.created_at = datetime.now(timezone.utc)
+
+    async def delete(self):
+        await self.channel.api_call()
+        self.channel.messages.pop(self.id, None)
+
+
+class FakeChannel:
+    """Stands in for discord.TextChannel: send, delete_messages, and Discord-like rate limiting."""
+
+    def __init__(self, channel_id, capacity, rate, round_trip):
+        self.id = channel_id
+        self.limit = TokenBucket(capacity, rate)
+        self.round_trip = round_trip
+        self.messages = {}
+        self.sent = []  # Contents in the order Discord received them
+        self.calls = 0
+        self.rate_limited = 0
+
+    async def api_call(self):
+        self.calls += 1
+        self.limit._refill()
+        if self.limit.tokens < 1:
+            self.rate_limited += 1  # Discord would answer 429; discord.py sleeps for retry_after and retries
+        await self.limit.acquire()
+        await asyncio.sleep(self.round_trip)
+
+    async def send(self, content=None, **kwargs):
+        await self.api_call()
+        message = FakeMessage(self, content)
+        self.messages[message.id] = message
+        self.sent.append(content)
+        return message
+
+    async def delete_messages(self, messages):
+        await self.api_call()
+        for message in messages:
+            self.messages.pop(message.id, None)
+
+
+def report_lines(count, offset):
+    return [f"- {' '.join(WORDS[(offset + i + j) % len(WORDS)] for j in range(6))}" for i in range(count)]
+
+
+async def run(mode, channels, lines, deletes, capacity, rate, round_trip):
+    fakes = [FakeChannel(i, capacity, rate, round_trip) for i in range(channels)]
+    for channel in fakes:
+        for _ in range(deletes):
+            await channel.send("old task display")
+        channel.calls = channel.rate_limited = 0
+        channel.sent.clear()
+        channel.limit = TokenBucket(capacity, rate)
+    dispatcher = MessageDispatcher(capacity=capacity, rate=rate)
+
+    async def one_channel(channel):
+        old = list(channel.messages.values())
+        expected = report_lines(lines, channel.id)
+        if mode == 'sequential':
+            for line in expected:
+                await channel.send(line)
+            for message in old:
+                await message.delete()
+        else:
+            await dispatcher.send_chunks(channel, expected)
+            await dispatcher.delete_messages(channel, old)
+        received = "\n".join(channel.sent)
+        assert received == "\n".join(expected), "text arrived out of order or altered"
+        assert not channel.messages.keys() & {message.id for message in old}, "old messages left behind"
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_channel(channel) for channel in fakes))
+    elapsed = time.perf_counter() - start
+    stats = dispatcher.stats()
+    return {
+        'mode': mode,
+        'seconds': elapsed,
+        'api_calls': sum(channel.calls for channel in fakes),
+        'rate_limited': sum(channel.rate_limited for channel in fakes),
+        'max_queue_depth': stats['max_queue_depth'] if mode == 'dispatcher' else 0,
+        'wait_p99_seconds': stats['wait_p99_seconds'] if mode == 'dispatcher' else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--channels', type=int, default=3)
+    parser.add_argument('--lines', type=int, default=60, help="Short report lines sent per channel")
+    parser.add_argument('--deletes', type=int, default=20, help="Old messages cleaned up per channel")
+    parser.add_argument('--capacity', type=int, default=5)
+    parser.add_argument('--rate', type=float, default=50.0, help="Calls per second per channel (Discord: about 1)")
+    parser.add_argument('--round-trip', type=float, default=0.01)
+    args = parser.parse_args()
+    for mode in ('sequential', 'dispatcher'):
+        result = asyncio.run(run(mode, args.channels, args.lines, args.deletes, args.capacity, args.rate, args.round_trip))
+        print(f"{result['mode']:>10}: {result['seconds']:.2f}s, {result['api_calls']} API calls, "
+              f"{result['rate_limited']} rate-limited, max queue depth {result['max_queue_depth']}, "
+              f"wait p99 {result['wait_p99_seconds'] * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
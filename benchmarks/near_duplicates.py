@@ -0,0 +1,119 @@
+# /benchmarks/near_duplicates.py
+"""Measure near-duplicate detection at ingest: throughput, accuracy, and lookup cost against a linear scan.
+
+A share of the synthetic tasks repeat one of the same author's recent tasks with
+a small edit (a word added, dropped or swapped, different case or punctuation),
+as people do when they repost a standup line in another channel. The rest are
+fresh lines. Accuracy is checked against which rows were generated as repeats.
+
+Run from the repository root:  python -m benchmarks.near_duplicates --tasks 100000
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import AUTHORS, CHANNELS, WORDS, percentile, temp_db_path
+from model.task_model import TaskModel
+from utils.minhash import jaccard, shingles
+
+EXTRA_WORDS = ("today tomorrow again still asap please done wip blocked staging prod "
+               "checkout payment invoice report dashboard").split()
+
+
+def fresh_line(rng):
+    return " ".join(rng.choice(WORDS + EXTRA_WORDS) for _ in range(rng.randint(8, 16)))
+
+
+def near_copy(content, rng):
+    """Repeat a line with one small edit."""
+    words = content.split()
+    edit = rng.choice(('add', 'drop', 'swap', 'case'))
+    if edit == 'add':
+        words.insert(len(words), rng.choice(EXTRA_WORDS))  # "... again", "... today"
+    elif edit == 'drop' and len(words) > 8:
+        del words[-1]
+    elif edit == 'swap':
+        words[-1] = rng.choice(EXTRA_WORDS)
+    else:
+        return content.capitalize() + "!"
+    return " ".join(words)
+
+
+def corpus(tasks, duplicate_share, rng):
+    """Return rows and the set of row indexes generated as repeats."""
+    rows, repeats, recent = [], set(), {}
+    start = datetime(2024, 1, 1)
+    for index in range(tasks):
+        timestamp = str(start + timedelta(seconds=index * 30))
+        author = rng.choice(AUTHORS)
+        if recent.get(author) and rng.random() < duplicate_share:
+            content = near_copy(rng.choice(recent[author]), rng)
+            repeats.add(index)
+        else:
+            content = fresh_line(rng)
+            recent.setdefault(author, []).append(content)
+            del recent[author][:-5]  # Repeats refer to one of the author's last few lines
+        rows.append((content, author, rng.choice(CHANNELS), timestamp, 'en'))
+    return rows, repeats
+
+
+def ingest(db_path, rows, mode, window_hours, batch_size=500):
+    """Store rows in ingest-sized batches; returns (seconds, model). The caller closes the model."""
+    model = TaskModel(db_path=db_path, dedup_mode=mode, dedup_window_hours=window_hours)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for first in range(0, len(rows), batch_size):
+            model.store_tasks(rows[first:first + batch_size])
+        elapsed = time.perf_counter() - start
+    return elapsed, model
+
+
+def linear_scan(model, content, author, timestamp):
+    """The same lookup without the band keys: compare against every task of the author in the window."""
+    since = str(datetime.fromisoformat(timestamp) - model.dedup_window)
+    features = shingles(content)
+    for task_id, candidate in model.conn.execute("SELECT task_id, content FROM tasks WHERE author = ? AND timestamp >= ? "
+                                                 "AND timestamp <= ? AND duplicate_of IS NULL ORDER BY task_id",
+                                                 (author, since, timestamp)):
+        if jaccard(features, shingles(candidate)) >= model.dedup_similarity:
+            return task_id
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--duplicate-share', type=float, default=0.2)
+    parser.add_argument('--lookups', type=int, default=1000)
+    parser.add_argument('--window-hours', type=float, default=24, help="Dedup window; longer windows hold more candidates per author")
+    args = parser.parse_args()
+    rng = random.Random(42)
+    rows, repeats = corpus(args.tasks, args.duplicate_share, rng)
+    print(f"{args.tasks} tasks, {len(repeats)} generated as near-duplicates")
+    for mode in ('off', 'link', 'suppress'):
+        with temp_db_path() as db_path:
+            elapsed, model = ingest(db_path, rows, mode, args.window_hours)
+            stored = model.conn.execute("SELECT COUNT(*) FROM tasks WHERE duplicate_of IS NULL").fetchone()[0]
+            line = f"{mode:>8}: {args.tasks / elapsed:8.0f} tasks/s, {stored} tasks left for reports"
+            if mode == 'link':
+                linked = {task_id - 1 for (task_id,) in model.conn.execute("SELECT task_id FROM tasks WHERE duplicate_of IS NOT NULL")}
+                line += (f" | caught {len(linked & repeats)}/{len(repeats)} repeats, "
+                         f"{len(linked - repeats)} fresh lines linked by mistake")
+                sample = rng.sample(rows, min(args.lookups, len(rows)))
+                for label, lookup in (("band index", lambda row: model.find_near_duplicate(row[0], row[1], row[3])),
+                                      ("linear scan", lambda row: linear_scan(model, row[0], row[1], row[3]))):
+                    latencies = []
+                    for row in sample:
+                        start = time.perf_counter()
+                        lookup(row)
+                        latencies.append((time.perf_counter() - start) * 1e6)
+                    line += f"\n{'':>10}{label} lookup p50 {percentile(latencies, 50):7.0f} us, p99 {percentile(latencies, 99):7.0f} us"
+            print(line)
+            model.close()
+
+
+if __name__ == '__main__':
+    main()
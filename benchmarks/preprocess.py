@@ -0,0 +1,125 @@
+# /benchmarks/preprocess.py
+"""Throughput and behaviour check for utils/preprocess.py against the original implementation.
+
+Every corpus message is run through both implementations; the script exits non-zero if
+any cleaned text, extracted date or 'till' flag differs. tests/test_preprocess.py runs
+the same comparison on a smaller corpus.
+Run from the repository root:  python -m benchmarks.preprocess --messages 100000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import WORDS
+from utils.preprocess import MessagePreprocessor
+
+# Reference copies of TaskViewModel.preprocess_content / extract_date_from_message before the engine
+
+def legacy_preprocess_content(content):
+    """Preprocess the content by removing mentions and unwanted characters."""
+    content = re.sub(r'<@!?[0-9]+>', '', content)  # Remove user mentions
+    content = re.sub(r'<@&[0-9]+>', '', content)   # Remove role mentions
+    content = re.sub(r'[^a-zA-Z0-9/\-\s!]', '', content)  # Keep alphanumeric, slashes, dashes, and spaces
+    content = re.sub(r'\s+', ' ', content)  # Replace multiple spaces with a single space
+    return content.strip()
+
+def legacy_extract_date_from_message(message_content):
+    """Extract date from the message if present, including handling 'till date'."""
+    # Pattern for dates in format '11/08/2024' or '11082024'
+    date_pattern = r'(\d{2}[/-]\d{2}[/-]\d{4})'
+    match = re.search(date_pattern, message_content)
+
+    if match:
+        date_str = match.group(1)
+        try:
+            extracted_date = datetime.strptime(date_str, '%d/%m/%Y')
+            return extracted_date.strftime('%Y-%m-%d')
+        except ValueError:
+            return None
+
+    # Handle 'today', 'yesterday', and 'tomorrow' in English and French
+    if any(keyword in message_content.lower() for keyword in ['today', "aujourd'hui"]):
+        return datetime.now().strftime('%Y-%m-%d')
+
+    if any(keyword in message_content.lower() for keyword in ['yesterday', 'hier']):
+        return (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+    if any(keyword in message_content.lower() for keyword in ['tomorrow', 'demain']):
+        return (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+
+    # Handle "till" or "jusqu'à" patterns for till date detection
+    till_pattern = r'(till|jusqu\'à) (\d{2}[/-]\d{2}[/-]\d{4})'
+    match_till = re.search(till_pattern, message_content.lower())
+
+    if match_till:
+        date_str = match_till.group(2)
+        try:
+            extracted_date = datetime.strptime(date_str, '%d/%m/%Y')
+            return extracted_date.strftime('%Y-%m-%d')
+        except ValueError:
+            return None
+
+    # Pattern for dates without slashes (e.g., '11082024')
+    no_slash_pattern = r'\b(\d{2})(\d{2})(\d{4})\b'
+    match_no_slash = re.search(no_slash_pattern, message_content)
+
+    if match_no_slash:
+        day, month, year = match_no_slash.groups()
+        try:
+            extracted_date = datetime.strptime(f'{day}/{month}/{year}', '%d/%m/%Y')
+            return extracted_date.strftime('%Y-%m-%d')
+        except ValueError:
+            return None
+
+    return None
+
+
+FRAGMENTS = [
+    "<@123456789>", "<@!987654321>", "<@&55555>", "today", "Today", "TODAY", "yesterday", "hier", "hierarchy",
+    "tomorrow", "demain", "aujourd'hui", "till", "still", "jusqu'à", "11/08/2024", "31/02/2024", "11-08-2024",
+    "11082024", "123456789", "01/13/2024", "é", "à", "ç", "#", "@", "&", "<", ">", "'", ",", ".", "?", "!",
+    "--", "/", "  ", "\t", "\n", "\u00a0", "🚀", "fix", "bug", "2024",
+]
+
+
+def build_corpus(count, rng):
+    corpus = []
+    for _ in range(count):
+        parts = [rng.choice(FRAGMENTS) if rng.random() < 0.4 else rng.choice(WORDS) for _ in range(rng.randint(1, 20))]
+        corpus.append(rng.choice(["", " ", ""]).join(parts) if rng.random() < 0.2 else " ".join(parts))
+    return corpus
+
+
+def legacy_process(message):
+    content = legacy_preprocess_content(message)
+    return content, legacy_extract_date_from_message(content), 'till' in content.lower()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=100000)
+    args = parser.parse_args()
+    corpus = build_corpus(args.messages, random.Random(11))
+    engine = MessagePreprocessor()
+
+    start = time.perf_counter()
+    legacy_results = [legacy_process(message) for message in corpus]
+    legacy_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    engine_results = [engine.process(message)[:3] for message in corpus]
+    engine_seconds = time.perf_counter() - start
+
+    mismatches = [(message, old, new) for message, old, new in zip(corpus, legacy_results, engine_results) if old != new]
+    for message, old, new in mismatches[:10]:
+        print(f"MISMATCH {message!r}: legacy={old!r} engine={new!r}")
+    print(f"legacy: {len(corpus) / legacy_seconds:10.0f} msg/s")
+    print(f"engine: {len(corpus) / engine_seconds:10.0f} msg/s ({legacy_seconds / engine_seconds:.1f}x)")
+    print(f"{len(corpus) - len(mismatches)}/{len(corpus)} messages match the original behaviour")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
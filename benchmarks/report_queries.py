@@ -0,0 +1,88 @@
+# /benchmarks/report_queries.py
+"""Time the report queries on a large synthetic DB and check that they use the day indexes.
+
+The EXPLAIN QUERY PLAN check exits non-zero if a report query regresses to a full scan.
+Run from the repository root:  python -m benchmarks.report_queries --rows 2000000
+"""
+import argparse
+import contextlib
+import io
+import random
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import AUTHORS, Timer, synthetic_task, temp_db_path
+from model.task_model import TaskModel
+
+QUERY_DAY = '2024-06-15'
+QUERY_AUTHOR = AUTHORS[0]
+
+# (name, indexed query, legacy date(timestamp) query, params, index the plan must use)
+REPORT_QUERIES = [
+    ('get_tasks_by_date',
+     "SELECT COALESCE(translated_content, content), author, channel FROM tasks WHERE day = ? AND duplicate_of IS NULL",
+     "SELECT content, author, channel FROM tasks WHERE date(timestamp) = ?",
+     (QUERY_DAY,), 'idx_tasks_day_author_channel'),
+    ('get_tasks_by_author_and_date',
+     "SELECT COALESCE(translated_content, content), channel, day FROM tasks WHERE author = ? AND day = ? AND duplicate_of IS NULL",
+     "SELECT content, channel, date(timestamp) FROM tasks WHERE author = ? AND date(timestamp) = ?",
+     (QUERY_AUTHOR, QUERY_DAY), 'idx_tasks_author_day'),
+    ('get_tasks_by_author_till_date',
+     "SELECT COALESCE(translated_content, content), channel, day FROM tasks WHERE author = ? AND day <= ? AND duplicate_of IS NULL ORDER BY timestamp ASC",
+     "SELECT content, channel, date(timestamp) FROM tasks WHERE author = ? AND date(timestamp) <= ? ORDER BY timestamp ASC",
+     (QUERY_AUTHOR, QUERY_DAY), 'idx_tasks_author_day'),
+]
+
+
+def populate(model, rows, days=365, batch=50000):
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1)
+    for offset in range(0, rows, batch):
+        chunk = []
+        for _ in range(min(batch, rows - offset)):
+            content, author, channel, language = synthetic_task(rng)
+            timestamp = str(start + timedelta(seconds=rng.randrange(days * 86400), microseconds=1))
+            chunk.append((content, author, channel, timestamp, language))
+        model.store_tasks(chunk)
+
+
+def check_plans(conn):
+    ok = True
+    for name, query, _, params, index in REPORT_QUERIES:
+        plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+        uses_index = index in plan
+        ok &= uses_index
+        print(f"{'ok  ' if uses_index else 'FAIL'} {name}: {plan}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with temp_db_path() as db_path:
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = TaskModel(db_path=db_path)
+            with Timer() as load:
+                populate(model, args.rows)
+        model.conn.execute("ANALYZE")
+        print(f"Loaded {args.rows} rows in {load.elapsed:.1f}s")
+
+        plans_ok = check_plans(model.conn)
+        for name, query, legacy_query, params, _ in REPORT_QUERIES:
+            timings = {}
+            for label, sql in (('indexed', query), ('legacy', legacy_query)):
+                with Timer() as t:
+                    for _ in range(args.repeat):
+                        model.conn.execute(sql, params).fetchall()
+                timings[label] = t.elapsed / args.repeat * 1000
+            print(f"{name:32} indexed {timings['indexed']:8.2f}ms  legacy {timings['legacy']:8.2f}ms  "
+                  f"({timings['legacy'] / max(timings['indexed'], 1e-9):.0f}x)")
+        model.close()
+    sys.exit(0 if plans_ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# /benchmarks/retention.py
+"""Archive a year of tasks down to a retention window and compare the database before and after.
+
+Seeds a year of corpus tasks (benchmarks/corpus.py), some with checklists, then
+times the till-date reports, a day report and a hot-table scan. Next it archives
+with a 90-day window (#back 30 days, #database kept forever) and vacuums, then
+times the same reads again. Till-date reports and the day report of an archived
+day must return exactly what they returned before; the exit status is 1 if not.
+
+Run from the repository root:  python -m benchmarks.retention --tasks 300000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+
+from benchmarks.common import Timer, temp_db_path
+from benchmarks.corpus import CorpusGenerator
+from model.task_model import TaskModel
+from viewmodel.retention_job import RetentionJob
+
+DEFAULT_DAYS = 90
+CHANNEL_DAYS = {'back': 30, 'database': 0}
+
+
+def seed(model, corpus, count, checklist_share=0.02):
+    tasks = corpus.tasks(count)
+    while chunk := [row for _, row in zip(range(20000), tasks)]:
+        model.store_tasks(chunk)
+    rng = random.Random(1)
+    task_ids = [row[0] for row in model.conn.execute("SELECT task_id FROM tasks")]
+    with model.conn:
+        model.conn.executemany("INSERT INTO checklists (task_id, content, timestamp, author) VALUES (?, 'check the logs', '2024-01-01', 'x')",
+                               [(task_id,) for task_id in rng.sample(task_ids, int(len(task_ids) * checklist_share))])
+    model.refresh_digests()
+
+
+def measure(model, query_day, old_day, author, repeat):
+    """Timings in ms, plus the outputs that must survive archiving."""
+    results, outputs = {}, {}
+    for name, read in (('till_date', lambda: list(model.iter_tasks_till_date(query_day))),
+                       ('user_till_date', lambda: list(model.iter_tasks_till_date(query_day, author))),
+                       ('old_day_digest', lambda: model.get_daily_digest(old_day)),
+                       ('hot_scan', lambda: model.get_all_tasks())):
+        with Timer() as timer:
+            for _ in range(repeat):
+                output = read()
+        results[name] = timer.elapsed / repeat * 1000
+        outputs[name] = output
+    return results, outputs
+
+
+def file_mib(db_path):
+    return os.path.getsize(db_path) / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=300000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = CorpusGenerator(seed=42, months=12)
+    query_day, old_day, author = corpus.days[-1], corpus.days[30], corpus.authors[10]
+    with temp_db_path() as db_path:
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = TaskModel(db_path=db_path, archive_dir=os.path.join(os.path.dirname(db_path), 'archive'))
+        with Timer() as load:
+            seed(model, corpus, args.tasks)
+        model.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        hot_before = model.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        size_before = file_mib(db_path)
+        print(f"Seeded {hot_before} tasks over {len(corpus.days)} days in {load.elapsed:.1f}s; file {size_before:.1f} MiB")
+        before, expected = measure(model, query_day, old_day, author, args.repeat)
+
+        job = RetentionJob(None, default_days=DEFAULT_DAYS, channel_days=CHANNEL_DAYS)
+        default_cutoff, channel_cutoffs = job.cutoffs(corpus.end)
+        months = 0
+        with Timer() as archiving:
+            while model.archive_expired_tasks(default_cutoff, channel_cutoffs) is not None:
+                months += 1
+        with Timer() as vacuuming:
+            freed = 0
+            while True:
+                pages, remaining = model.vacuum_free_pages(2000)
+                freed += pages
+                if not pages or not remaining:
+                    break
+        sizes = model.get_storage_sizes()
+        archived_tasks = sum(row[1] for row in sizes['archives'])
+        archive_mib = sum(row[2] for row in sizes['archives']) / 2 ** 20
+        print(f"{job.describe()}: archived {archived_tasks} tasks in {months} steps ({archiving.elapsed:.1f}s), "
+              f"archive {archive_mib:.1f} MiB; vacuum freed {freed} pages ({vacuuming.elapsed:.1f}s)")
+        print(f"File {size_before:.1f} MiB -> {file_mib(db_path):.1f} MiB, "
+              f"hot tasks {hot_before} -> {model.conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0]}")
+        for name, rows, size in sizes['tables'][:6]:
+            print(f"  {name:<20} {rows:>9} rows {size / 2 ** 20 if size is not None else float('nan'):8.1f} MiB")
+
+        after, actual = measure(model, query_day, old_day, author, args.repeat)
+        identical = True
+        for name in ('till_date', 'user_till_date', 'old_day_digest'):
+            same = actual[name] == expected[name]
+            identical &= same
+            print(f"{name:<16} {before[name]:9.1f} ms -> {after[name]:9.1f} ms  "
+                  f"{len(expected[name])} rows {'identical' if same else 'DIFFERENT'}")
+        print(f"{'hot_scan':<16} {before['hot_scan']:9.1f} ms -> {after['hot_scan']:9.1f} ms")
+        model.close()
+    sys.exit(0 if identical else 1)
+
+
+if __name__ == '__main__':
+    main()
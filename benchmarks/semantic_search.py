@@ -0,0 +1,94 @@
+# /benchmarks/semantic_search.py
+"""Measure EmbeddingStore ingest, load and top-k search latency at growing sizes.
+
+Random unit vectors stand in for sentence embeddings, so no model is needed. At
+the default 768 dimensions every million vectors take about 3 GB in the SQLite
+file and 3 GB in the matrix file. For comparison, the brute-force baseline decodes
+every BLOB from SQLite for each query, as a search without the matrix would.
+
+Run from the repository root:  python -m benchmarks.semantic_search --sizes 10000,100000,1000000
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.common import percentile, temp_db_path
+from model.embedding_store import EMBEDDING_DIM, EmbeddingStore
+
+
+def fill(store, size, dim, rng, batch_size=10000):
+    """Add `size` random vectors in ingest-sized batches; returns vectors per second."""
+    start = time.perf_counter()
+    for first in range(1, size + 1, batch_size):
+        count = min(batch_size, size - first + 1)
+        tasks = [(task_id, f"task {task_id}", "user#0001", "back", "2024-08-11 09:00:00", 'en')
+                 for task_id in range(first, first + count)]
+        store.add(tasks, rng.standard_normal((count, dim), dtype=np.float32))
+    return size / (time.perf_counter() - start)
+
+
+def brute_force_search(store, query, k):
+    """Top-k by decoding every BLOB from SQLite, the cost the memory-mapped matrix avoids."""
+    rows = store.conn.execute("SELECT task_id, embedding FROM messages WHERE task_id IS NOT NULL").fetchall()
+    matrix = store.normalize(np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows]))
+    scores = matrix @ store.normalize(query)
+    return [rows[i][0] for i in np.argsort(-scores)[:k]]
+
+
+def run(size, dim, queries, k, baseline):
+    rng = np.random.default_rng(42)
+    with temp_db_path() as db_path:
+        matrix_path = os.path.join(os.path.dirname(db_path), 'embeddings.f32')
+        store = EmbeddingStore(db_path=db_path, matrix_path=matrix_path, dim=dim)
+        ingest_rate = fill(store, size, dim, rng)
+        store.close()
+
+        start = time.perf_counter()
+        store = EmbeddingStore(db_path=db_path, matrix_path=matrix_path, dim=dim)  # Cold start: map the existing file
+        load_seconds = time.perf_counter() - start
+
+        query_vectors = rng.standard_normal((queries, dim), dtype=np.float32)
+        store.search(query_vectors[0], k)  # Fault the matrix into the page cache once
+        latencies = []
+        for query in query_vectors:
+            start = time.perf_counter()
+            hits = store.search(query, k)
+            latencies.append((time.perf_counter() - start) * 1000)
+        assert len(hits) == k
+
+        baseline_ms = None
+        if baseline:
+            start = time.perf_counter()
+            expected = brute_force_search(store, query_vectors[-1], k)
+            baseline_ms = (time.perf_counter() - start) * 1000
+            assert [task_id for task_id, _ in hits] == expected, "matrix search disagrees with brute force"
+        store.close()
+    return {
+        'size': size,
+        'ingest_per_sec': ingest_rate,
+        'load_seconds': load_seconds,
+        'search_p50_ms': percentile(latencies, 50),
+        'search_p99_ms': percentile(latencies, 99),
+        'brute_force_ms': baseline_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default="10000,100000,1000000")
+    parser.add_argument('--dim', type=int, default=EMBEDDING_DIM)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--baseline-max', type=int, default=100000, help="Largest size to also run the brute-force baseline at")
+    args = parser.parse_args()
+    for size in (int(size) for size in args.sizes.split(',')):
+        result = run(size, args.dim, args.queries, args.k, baseline=size <= args.baseline_max)
+        baseline = f", brute force {result['brute_force_ms']:.0f} ms" if result['brute_force_ms'] is not None else ""
+        print(f"{result['size']:>9} vectors: ingest {result['ingest_per_sec']:.0f}/s, load {result['load_seconds']:.2f}s, "
+              f"search p50 {result['search_p50_ms']:.1f} ms, p99 {result['search_p99_ms']:.1f} ms{baseline}")
+
+
+if __name__ == '__main__':
+    main()
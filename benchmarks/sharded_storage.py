@@ -0,0 +1,141 @@
+# /benchmarks/sharded_storage.py
+"""Run several shard processes against one storage server and check nothing is lost.
+
+Each shard process replays the messages a fake gateway routes to it (guilds are
+assigned to shards with Discord's (guild_id >> 22) % shard_count formula) through
+TaskIngestQueue and StorageClient, runs report reads and a cancelled stream, and
+counts the change events it receives. The run fails if a task is missing or a
+shard missed change events. A single-process AsyncTaskModel run is the baseline.
+
+Run from the repository root:  python -m benchmarks.sharded_storage --shards 4 --messages 2000
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.common import synthetic_task, temp_db_path
+from model.async_task_model import AsyncTaskModel
+from model.storage_client import StorageClient
+from model.task_ingest_queue import TaskIngestQueue
+from model.task_model import TaskModel
+
+GUILDS = [(index + 1) << 22 for index in range(64)]  # Snowflake-like ids spread over every shard
+
+
+def fake_gateway(shard_id, shard_count, messages, seed=42):
+    """Yield (guild_id, content, author, channel, language) for the messages Discord would send this shard."""
+    rng = random.Random(seed)
+    for _ in range(messages):
+        guild_id = rng.choice(GUILDS)
+        task = synthetic_task(rng)
+        if (guild_id >> 22) % shard_count == shard_id:
+            yield (guild_id,) + task
+
+
+async def run_shard(shard_id, shard_count, messages, address):
+    client = StorageClient(address)
+    events = []
+    await client.add_change_listener(events.extend)
+    queue = TaskIngestQueue(client)
+    queue.start()
+    today = datetime.now().strftime('%Y-%m-%d')
+    stored = 0
+    start = time.perf_counter()
+    for index, (guild_id, content, author, channel, language) in enumerate(fake_gateway(shard_id, shard_count, messages)):
+        await queue.put(content, author, channel, language)
+        stored += 1
+        if index % 200 == 0:
+            await client.get_tasks_by_date(today)  # Report reads interleaved with writes
+            async for _ in client.stream('iter_tasks_till_date', today, batch_size=50):
+                break  # Stop early, so the server has to drop the cursor
+    await queue.close()
+    elapsed = time.perf_counter() - start
+    client.close()
+    return stored, elapsed, events
+
+
+def shard_process(shard_id, shard_count, messages, address, results):
+    stored, elapsed, events = asyncio.run(run_shard(shard_id, shard_count, messages, address))
+    results.put((shard_id, stored, elapsed, len({change[1] for change in events if change[0] == 'inserted'})))
+
+
+async def wait_for_events(address, expected, timeout=10.0):
+    """Count tasks through the server once every shard is done."""
+    client = StorageClient(address)
+    deadline = time.monotonic() + timeout
+    while True:
+        count = len(await client.get_all_tasks())
+        if count >= expected or time.monotonic() > deadline:
+            client.close()
+            return count
+        await asyncio.sleep(0.1)
+
+
+def run_sharded(shards, messages, db_path):
+    server = subprocess.Popen([sys.executable, '-m', 'model.storage_server', '--db', db_path, '--address', '127.0.0.1:0'],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    line = server.stdout.readline()
+    while line and not line.startswith("Storage server listening"):
+        line = server.stdout.readline()  # Skip TaskModel's migration messages
+    address = line.strip().rsplit(' ', 1)[-1]
+    try:
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        start = time.perf_counter()
+        processes = [context.Process(target=shard_process, args=(shard_id, shards, messages, address, results))
+                     for shard_id in range(shards)]
+        for process in processes:
+            process.start()
+        shard_results = [results.get(timeout=300) for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        expected = sum(stored for _, stored, _, _ in shard_results)
+        total = asyncio.run(wait_for_events(address, expected))
+    finally:
+        server.terminate()
+        server.wait()
+    assert expected == messages, f"gateway routed {expected} of {messages} messages"
+    assert total == expected, f"storage has {total} tasks, shards stored {expected}"
+    for shard_id, stored, _, seen in shard_results:
+        # The server broadcasts a write's events before replying to it, so a shard has at least its own.
+        # Events for other shards' last batches may still be in flight when a shard disconnects.
+        assert seen >= stored, f"shard {shard_id} got change events for {seen} tasks, stored {stored}"
+    return elapsed, total, shard_results
+
+
+async def run_single(messages, db_path):
+    model = AsyncTaskModel(TaskModel(db_path=db_path))
+    queue = TaskIngestQueue(model)
+    queue.start()
+    start = time.perf_counter()
+    for _, content, author, channel, language in fake_gateway(0, 1, messages):
+        await queue.put(content, author, channel, language)
+    await queue.close()
+    elapsed = time.perf_counter() - start
+    model.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--shards', type=int, default=4)
+    parser.add_argument('--messages', type=int, default=2000, help="Messages sent through the fake gateway in total")
+    args = parser.parse_args()
+    with temp_db_path() as db_path:
+        single = asyncio.run(run_single(args.messages, db_path))
+    with temp_db_path() as db_path:
+        elapsed, total, shard_results = run_sharded(args.shards, args.messages, db_path)
+    print(f"single process: {args.messages} tasks in {single:.2f}s")
+    print(f"{args.shards} shards + storage server: {total} tasks in {elapsed:.2f}s (including process start-up)")
+    for shard_id, stored, shard_elapsed, seen in sorted(shard_results):
+        print(f"  shard {shard_id}: {stored} tasks in {shard_elapsed:.2f}s, change events for {seen} tasks")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# /benchmarks/sqlite_concurrency.py
+"""Measure report reads and ingest writes running at the same time, before and after the SQLite tuning.
+
+Each configuration gets an identical database. For a fixed time, one coroutine
+stores batches of tasks the way TaskIngestQueue does, while several others
+request reports (day, user and date, search, task pages) back to back, all
+through AsyncTaskModel. The configurations are:
+
+  baseline   rollback journal, default pragmas, every call on the one writer thread (the old setup)
+  wal        WAL and the tuned pragmas, still one thread and one connection
+  wal+pool   WAL, tuned pragmas and four read connections on their own threads
+
+The default pool size is one less than the number of cores, up to four, so on a
+single core the bot runs as "wal". Read threads share the GIL and the cores with
+the writer, so how much the pool gains depends on the machine.
+
+Run from the repository root:  python -m benchmarks.sqlite_concurrency --tasks 100000 --seconds 10
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import AUTHORS, CHANNELS, percentile, synthetic_task, temp_db_path
+from model.async_task_model import AsyncTaskModel
+from model.connection_manager import ConnectionManager
+from model.task_model import TaskModel
+
+CONFIGURATIONS = {
+    'baseline': dict(read_pool_size=0, pragmas={'journal_mode': 'DELETE', 'foreign_keys': 'ON'}),
+    'wal': dict(read_pool_size=0),
+    'wal+pool': dict(read_pool_size=4),
+}
+
+
+def fill(model, tasks, days, rng):
+    start = datetime(2024, 1, 1, 8)
+    rows = []
+    for index in range(tasks):
+        content, author, channel, language = synthetic_task(rng)
+        rows.append((f"{content} {index}", author, channel, str(start + timedelta(days=index * days // tasks, seconds=index % 36000)), language))
+    with contextlib.redirect_stdout(io.StringIO()):
+        for first in range(0, len(rows), 5000):
+            model.store_tasks(rows[first:first + 5000])
+    return [str((start + timedelta(days=day)).date()) for day in range(days)]
+
+
+def report_request(storage, rng, days):
+    kind = rng.randrange(4)
+    if kind == 0:
+        return storage.get_tasks_by_date(rng.choice(days))
+    if kind == 1:
+        return storage.get_tasks_by_author_and_date(rng.choice(AUTHORS), rng.choice(days))
+    if kind == 2:
+        return storage.search_tasks(rng.choice(("login bug", "deploy", "schema migration", "client")), channel=rng.choice(CHANNELS))
+    return storage.get_tasks_page(after_task_id=rng.randrange(1000))
+
+
+async def measure(storage, days, args):
+    rng = random.Random(7)
+    deadline = time.perf_counter() + args.seconds
+    latencies = []
+    written = 0
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await report_request(storage, rng, days)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def writer():
+        nonlocal written
+        while time.perf_counter() < deadline:
+            rows = []
+            for _ in range(args.write_batch):
+                content, author, channel, language = synthetic_task(rng)
+                rows.append((f"{content} live {written + len(rows)}", author, channel, str(datetime.now()), language))
+            await storage.store_tasks(rows)
+            written += len(rows)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(writer(), *(reader() for _ in range(args.readers)))
+    return latencies, written
+
+
+async def run(args):
+    rng = random.Random(42)
+    print(f"{args.tasks} tasks, {args.readers} concurrent report readers and one writer storing batches of "
+          f"{args.write_batch}, {args.seconds:.0f}s per configuration, {os.cpu_count()} CPUs")
+    for name, settings in CONFIGURATIONS.items():
+        with temp_db_path() as db_path:
+            model = TaskModel(db_path=db_path, dedup_mode='off', db=ConnectionManager(db_path, **settings))
+            days = fill(model, args.tasks, args.days, random.Random(rng.random()))
+            storage = AsyncTaskModel(model)
+            latencies, written = await measure(storage, days, args)
+            storage.close()
+        print(f"  {name:>9}: {len(latencies) / args.seconds:7.0f} reads/s (p50 {percentile(latencies, 50):6.2f} ms, "
+              f"p99 {percentile(latencies, 99):7.2f} ms), {written / args.seconds:7.0f} tasks written/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--write-batch', type=int, default=20)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
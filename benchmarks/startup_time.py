@@ -0,0 +1,57 @@
+# /benchmarks/startup_time.py
+"""Measure cold start of the bot: imports, construction and (with a token) time to the first on_ready.
+
+Without DISCORD_TOKEN only the offline part is measured. Pass --eager to load the
+models before connecting, as the bot did before lazy loading.
+Run from the repository root:  python -m benchmarks.startup_time [--eager]
+"""
+import time
+
+PROCESS_START = time.perf_counter()
+
+import argparse
+import asyncio
+import os
+
+import discord
+
+from model.async_task_model import AsyncTaskModel
+from model.task_model import TaskModel
+from view.task_view import TaskView
+from viewmodel.task_viewmodel import TaskViewModel
+from benchmarks.common import temp_db_path
+
+
+class StartupProbe(TaskView):
+    async def on_ready(self):
+        self.ready_at = time.perf_counter()
+        await self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--eager', action='store_true', help="load the NLP models before connecting")
+    args = parser.parse_args()
+    imported_at = time.perf_counter()
+
+    with temp_db_path() as db_path:
+        viewmodel = TaskViewModel()
+        if args.eager:
+            viewmodel.warm_up()
+        intents = discord.Intents.default()
+        intents.message_content = True
+        client = StartupProbe(model=AsyncTaskModel(TaskModel(db_path=db_path)), viewmodel=viewmodel, intents=intents)
+        constructed_at = time.perf_counter()
+        print(f"imports:      {imported_at - PROCESS_START:7.2f}s")
+        print(f"construction: {constructed_at - imported_at:7.2f}s")
+
+        token = os.getenv('DISCORD_TOKEN')
+        if not token:
+            print("DISCORD_TOKEN not set; skipping time to first on_ready")
+            return
+        asyncio.run(client.start(token))
+        print(f"first on_ready: {client.ready_at - PROCESS_START:7.2f}s after process start")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# /benchmarks/summarizer_backends.py
+"""Compare summarizer backends on latency, peak RSS and ROUGE-L against the fp32 baseline.
+
+Each backend runs in a fresh subprocess so its peak RSS is measured in isolation.
+Run from the repository root:
+    python -m benchmarks.summarizer_backends --configs t5-large:fp32 t5-large:int8 t5-base:fp32 t5-small:fp32 t5-large:onnx
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'task_texts.txt')
+BASELINE = 't5-large:fp32'
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding='utf-8') as f:
+        return [block.strip() for block in f.read().split('\n\n') if block.strip()]
+
+
+def rouge_l_f1(candidate, reference):
+    """ROUGE-L F1 over whitespace tokens (longest common subsequence)."""
+    a, b = candidate.lower().split(), reference.lower().split()
+    if not a or not b:
+        return 0.0
+    previous = [0] * (len(b) + 1)
+    for token in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if token == other else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision, recall = lcs / len(a), lcs / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_worker(config):
+    """Summarize the corpus with one backend and print the results as JSON."""
+    from viewmodel.task_viewmodel import TaskViewModel
+
+    model_name, backend = config.split(':')
+    viewmodel = TaskViewModel(model_name=model_name, summarizer_backend=backend)
+    start = time.perf_counter()
+    viewmodel.summarizer_backend.load()
+    load_seconds = time.perf_counter() - start
+
+    summaries, latencies = [], []
+    for text in load_corpus():
+        start = time.perf_counter()
+        summaries.append(viewmodel.summarize_with_t5(text))
+        latencies.append(time.perf_counter() - start)
+    json.dump({
+        'config': config,
+        'load_seconds': load_seconds,
+        'mean_latency_seconds': sum(latencies) / len(latencies),
+        'max_latency_seconds': max(latencies),
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # ru_maxrss is KiB on Linux
+        'summaries': summaries,
+    }, sys.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', nargs='+', default=[BASELINE, 't5-large:int8', 't5-base:fp32', 't5-small:fp32'])
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(args.worker)
+        return
+
+    configs = [BASELINE] + [config for config in args.configs if config != BASELINE]
+    results = {}
+    for config in configs:
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.summarizer_backends', '--worker', config],
+                                check=True, capture_output=True, text=True).stdout
+        results[config] = json.loads(output[output.index('{'):])  # Skip the model-loading prints
+
+    baseline = results[BASELINE]['summaries']
+    print(f"{'backend':18} {'load s':>7} {'mean s':>7} {'max s':>7} {'peak MB':>8} {'ROUGE-L':>8}")
+    for config, result in results.items():
+        rouge = sum(rouge_l_f1(s, b) for s, b in zip(result['summaries'], baseline)) / len(baseline)
+        print(f"{config:18} {result['load_seconds']:7.1f} {result['mean_latency_seconds']:7.2f} "
+              f"{result['max_latency_seconds']:7.2f} {result['peak_rss_mb']:8.0f} {rouge:8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# /model/async_task_model.py
+import asyncio
+import functools
+import time
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncTaskModel:
+    """Awaitable facade over TaskModel.
+
+    Every public TaskModel method is exposed as a coroutine that runs on a worker
+    thread, so SQLite work (including commit fsyncs) never blocks the discord.py
+    event loop. Writes run on a single dedicated writer thread, so SQLite still
+    has one writer; the methods in TaskModel.READ_METHODS run on a pool of reader
+    threads with their own connections, so reports don't wait behind ingest.
+    Each call's queueing and execution time is recorded with the model's
+    ConnectionManager.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-model")
+        readers = model.db.read_pool_size
+        # With no read pool every read uses the writer connection, so it has to stay on the writer thread
+        self._read_executor = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="task-model-read") if readers else self._executor
+
+    def __getattr__(self, name):
+        attr = getattr(self.model, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        executor = self._read_executor if name in self.model.READ_METHODS else self._executor
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self._timed(executor, name, attr, *args, **kwargs)
+
+        return call
+
+    async def run(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on the writer thread and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def _timed(self, executor, name, func, *args, **kwargs):
+        queued = time.perf_counter()
+
+        def timed_call():
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.model.db.record(name, start - queued, time.perf_counter() - start)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, timed_call)
+
+    async def stream(self, method_name, *args, batch_size=500, **kwargs):
+        """Iterate a TaskModel generator method, pulling `batch_size` rows per hop to a worker thread."""
+        rows = getattr(self.model, method_name)(*args, **kwargs)  # Generators run nothing until first pulled
+        executor = self._read_executor if method_name in self.model.READ_METHODS else self._executor
+        try:
+            while True:
+                batch = await self._timed(executor, method_name, lambda: list(islice(rows, batch_size)))
+                if not batch:
+                    return
+                for row in batch:
+                    yield row
+        finally:
+            # Release the cursor (and its borrowed connection), even if the consumer stopped early
+            await asyncio.get_running_loop().run_in_executor(executor, rows.close)
+
+    def close(self):
+        """Wait for queued calls to finish, then close the database connections."""
+        self._read_executor.shutdown(wait=True)
+        self._executor.shutdown(wait=True)
+        self.model.close()
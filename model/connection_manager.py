@@ -0,0 +1,143 @@
+# /model/connection_manager.py
+import logging
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from utils.metrics import histogram
+
+logger = logging.getLogger(__name__)
+
+CALL_SECONDS = histogram('storage_call_seconds', "Time TaskModel methods take to run", ['method'])
+WAIT_SECONDS = histogram('storage_wait_seconds', "Time TaskModel calls wait for a storage thread", ['method'])
+
+# Applied to every connection, in this order. In WAL mode readers never wait for the
+# writer, and synchronous=NORMAL only fsyncs at checkpoints, which keeps the
+# database consistent after a crash (the last commits may be lost on power failure)
+DEFAULT_PRAGMAS = {
+    'auto_vacuum': 'INCREMENTAL',  # Only takes effect on a new database; TaskModel.convert_to_incremental_vacuum converts older ones
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'foreign_keys': 'ON',  # So checklists are deleted with their task (ON DELETE CASCADE)
+    'busy_timeout': 5000,  # Milliseconds to wait for a lock held by another process
+    'cache_size': -65536,  # Negative means KiB: 64 MiB of page cache per connection
+    'mmap_size': 268435456,  # Read pages through 256 MiB of memory-mapped I/O instead of read() calls
+    'temp_store': 'MEMORY',
+}
+
+
+class ConnectionManager:
+    """One writer connection and a pool of read-only connections to one SQLite database.
+
+    Writes (and reads that must see them, such as duplicate checks inside a
+    transaction) use `writer`. Other reads borrow a connection with `read()`, so
+    reports run in parallel with each other and with ingest instead of queueing
+    behind it. Generators that keep a cursor open between batches use `stream()`,
+    which opens a connection of their own instead of holding a pooled one while
+    the consumer awaits. With `read_pool_size=0` every read uses the writer, as before.
+
+    `record()` collects per-query timings, read back with `query_stats()`.
+    """
+
+    def __init__(self, db_path, read_pool_size=4, pragmas=None, slow_query_ms=250.0, checkout_timeout=30.0):
+        self.db_path = db_path
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        # An in-memory database is private to its connection, so a pool would not see it
+        self.read_pool_size = 0 if db_path == ':memory:' else read_pool_size
+        self.slow_query_ms = slow_query_ms  # Queries slower than this are logged as warnings as they finish
+        self.checkout_timeout = checkout_timeout  # Seconds read() waits for a busy pool before giving up
+        # The writer is handed to AsyncTaskModel's writer thread, so it must not be bound to the creating thread
+        self.writer = self._connect()
+        self._readers = queue.LifoQueue()  # Idle read connections; the most recently used one has the warmest cache
+        self._opened_readers = 0
+        self._lock = threading.Lock()
+        self._stats = {}  # Query name -> [calls, total seconds, max seconds, total seconds queued]
+
+    def _connect(self, read_only=False):
+        # Queries are fixed strings, so a larger statement cache means each is parsed once per connection
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None if read_only else '',
+                               cached_statements=256)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")  # A write through a read connection is a bug; fail it loudly
+        return conn
+
+    @contextmanager
+    def read(self):
+        """Borrow a read connection for the duration of a with block."""
+        if not self.read_pool_size:
+            yield self.writer
+            return
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def stream(self):
+        """A read connection of its own for a with block that yields between batches.
+
+        A paused stream must not hold a pooled connection: the read that would
+        free one could be queued behind it on the same reader thread.
+        """
+        if not self.read_pool_size:
+            yield self.writer
+            return
+        conn = self._connect(read_only=True)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _checkout(self):
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            # Open connections lazily, so they are created after migrations have run on the writer
+            open_new = self._opened_readers < self.read_pool_size
+            if open_new:
+                self._opened_readers += 1
+        if open_new:
+            try:
+                return self._connect(read_only=True)
+            except Exception:
+                with self._lock:
+                    self._opened_readers -= 1
+                raise
+        try:
+            return self._readers.get(timeout=self.checkout_timeout)  # Every connection is busy; wait for one
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"No read connection became free within {self.checkout_timeout:g}s") from None
+
+    def record(self, name, queued, elapsed):
+        """Add one run of query `name`: seconds spent waiting for a thread, and seconds executing."""
+        with self._lock:
+            stats = self._stats.setdefault(name, [0, 0.0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+            stats[3] += queued
+        CALL_SECONDS.observe(elapsed, method=name)
+        WAIT_SECONDS.observe(queued, method=name)
+        if elapsed * 1000 >= self.slow_query_ms:
+            logger.warning("Slow query: %s took %.0f ms", name, elapsed * 1000)
+
+    def query_stats(self):
+        """Return (name, calls, total seconds, max seconds, total seconds queued) rows, most total time first."""
+        with self._lock:
+            rows = [(name,) + tuple(stats) for name, stats in self._stats.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def close(self):
+        """Close the writer and every idle read connection."""
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        self.writer.close()
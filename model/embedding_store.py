@@ -0,0 +1,226 @@
+# /model/embedding_store.py
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 768  # Size of the vectors already stored in discord_messages.db
+
+
+class EmbeddingStore:
+    """Task embeddings in discord_messages.db, searched through a memory-mapped matrix.
+
+    Each embedded task is a row of the `messages` table with its float32 vector
+    in the `embedding` BLOB. The same vectors, L2-normalized, are appended to a
+    flat float32 file in rowid order and memory-mapped, so a search is one
+    matrix-vector product over pages the OS caches instead of decoding BLOBs.
+    New vectors are appended to the file before their rows are committed, so the
+    file never misses a row; if the two disagree (a crash, a duplicate), the file
+    is rebuilt from SQLite. Vectors of deleted or archived tasks are flagged
+    `removed` and masked out of searches; once they make up `compact_share` of
+    the file it is rewritten without them, and only then are their rows deleted.
+
+    One process writes (the one running the EmbeddingStage); the others open the
+    store `read_only`. A reader never rebuilds the file, and maps it again once
+    the writer has replaced it.
+    """
+
+    def __init__(self, db_path='discord_messages.db', matrix_path='task_embeddings.f32', dim=EMBEDDING_DIM, compact_share=0.2,
+                 read_only=False):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.read_only = read_only
+        self.matrix_path = matrix_path
+        self.dim = dim
+        self.lock = threading.Lock()  # Serializes SQLite access and remapping; searches use a snapshot
+        self.ids = np.empty(0, dtype=np.int64)  # task_id of each matrix row
+        self.removed = np.zeros(0, dtype=bool)  # Matrix rows whose task is gone; skipped by search until compaction
+        self.compact_share = compact_share
+        self.matrix = None
+        self.last_rowid = 0  # Highest messages.rowid already mapped
+        self.file_id = None  # (device, inode) of the mapped file; a rebuild replaces it
+        self.create_table()
+        self.load()
+
+    def create_table(self):
+        """Create the messages table if needed and link its rows to tasks; only the writer changes the schema."""
+        if self.read_only:
+            return  # Readers start alongside the writer, so two of them migrating at once would collide
+        with self.conn:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS messages
+                                 (message_id TEXT PRIMARY KEY, content TEXT, author TEXT, channel TEXT, timestamp TEXT, embedding BLOB, language TEXT)''')
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(messages)")]
+            if 'task_id' not in columns:
+                self.conn.execute("ALTER TABLE messages ADD COLUMN task_id INTEGER")
+            if 'removed' not in columns:
+                self.conn.execute("ALTER TABLE messages ADD COLUMN removed INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_task_id ON messages (task_id)")
+
+    def _vector_rows(self, after_rowid=0, with_embedding=False, live_only=False):
+        # Only task rows with vectors of the configured size take part in search
+        columns = "rowid, task_id, removed, embedding" if with_embedding else "rowid, task_id, removed"
+        return self.conn.execute(f"SELECT {columns} FROM messages WHERE rowid > ? AND task_id IS NOT NULL "
+                                 f"AND length(embedding) = ? {'AND removed = 0 ' if live_only else ''}ORDER BY rowid",
+                                 (after_rowid, self.dim * 4))
+
+    def _mapped_rows(self, after_rowid=0):
+        try:
+            return self._vector_rows(after_rowid).fetchall()
+        except sqlite3.OperationalError:
+            if not self.read_only:
+                raise
+            return []  # The writer has not created or migrated the table yet; a later refresh maps its rows
+
+    def load(self):
+        """Map the matrix file, rebuilding it from SQLite if it does not match."""
+        with self.lock:
+            self._load()
+
+    def _load(self):
+        # Identify the file before reading it, so one replaced meanwhile is noticed by the next refresh
+        file_id = self._file_id()
+        file_rows = os.path.getsize(self.matrix_path) // (self.dim * 4) if file_id else 0
+        rows = self._mapped_rows()
+        if self.read_only:
+            if file_rows < len(rows):
+                # The writer has replaced the file but not deleted the removed rows yet
+                rows = [row for row in rows if not row[2]]
+            rows = rows[:file_rows]  # Rows past the file are being written; the next refresh maps them
+        elif file_rows != len(rows):
+            logger.info("Embedding matrix has %d rows, database has %d; rebuilding", file_rows, len(rows))
+            self._rebuild()
+            return
+        self._map(np.array([task_id for _, task_id, _ in rows], dtype=np.int64), rows[-1][0] if rows else 0,
+                  np.array([bool(removed) for _, _, removed in rows], dtype=bool), file_id)
+
+    def rebuild(self):
+        """Rewrite the matrix file from the BLOBs in SQLite."""
+        with self.lock:
+            self._rebuild()
+
+    def _check_writable(self):
+        if self.read_only:
+            raise RuntimeError(f"Embedding store {self.matrix_path} is open read-only")
+
+    def _rebuild(self):
+        self._check_writable()
+        ids, last_rowid = [], 0
+        temp_path = self.matrix_path + '.tmp'
+        with open(temp_path, 'wb') as matrix_file:
+            for rowid, task_id, _, blob in self._vector_rows(with_embedding=True, live_only=True):
+                matrix_file.write(self.normalize(np.frombuffer(blob, dtype=np.float32)).tobytes())
+                ids.append(task_id)
+                last_rowid = rowid
+        os.replace(temp_path, self.matrix_path)  # Searches still holding the old mapping keep the old file
+        # Deleted only now, so a reader loading meanwhile can still line the old file up with the table
+        with self.conn:
+            self.conn.execute("DELETE FROM messages WHERE removed = 1")
+        self._map(np.array(ids, dtype=np.int64), last_rowid, file_id=self._file_id())
+
+    def _map(self, ids, last_rowid, removed=None, file_id=None):
+        self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode='r', shape=(len(ids), self.dim)) if len(ids) else None
+        self.ids = ids
+        self.removed = removed if removed is not None else np.zeros(len(ids), dtype=bool)
+        self.last_rowid = last_rowid
+        self.file_id = file_id
+
+    def _file_id(self):
+        try:
+            stat = os.stat(self.matrix_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    @staticmethod
+    def normalize(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def max_task_id(self):
+        """Highest task_id already embedded (0 if none), the watermark for the next batch."""
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(MAX(task_id), 0) FROM messages").fetchone()[0]
+
+    def add(self, tasks, vectors):
+        """Store vectors for (task_id, content, author, channel, timestamp, language) rows and extend the matrix."""
+        if not tasks:
+            return
+        self._check_writable()
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(tasks), self.dim)
+        with self.lock:
+            with open(self.matrix_path, 'ab') as matrix_file:
+                matrix_file.write(self.normalize(vectors).tobytes())
+            try:
+                with self.conn:
+                    before = self.conn.total_changes
+                    self.conn.executemany("INSERT OR IGNORE INTO messages (message_id, content, author, channel, timestamp, embedding, language, task_id) "
+                                          "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                          [(f"task-{task_id}", content, author, channel, timestamp, vector.tobytes(), language, task_id)
+                                           for (task_id, content, author, channel, timestamp, language), vector in zip(tasks, vectors)])
+                    inserted = self.conn.total_changes - before
+            except sqlite3.Error:
+                self._rebuild()  # Drop the vectors appended for the failed batch
+                raise
+            if inserted != len(tasks):
+                self._rebuild()  # Some tasks were already embedded, so file and table no longer line up
+            else:
+                self._refresh()
+
+    def refresh(self):
+        """Map rows committed since the last load, including ones added by another process."""
+        with self.lock:
+            if self.read_only and self._file_id() != self.file_id:
+                self._load()  # The writer rebuilt the file, so row positions changed
+            else:
+                self._refresh()
+
+    def _refresh(self):
+        rows = self._mapped_rows(self.last_rowid)
+        if rows:
+            self._map(np.concatenate([self.ids, np.array([task_id for _, task_id, _ in rows], dtype=np.int64)]), rows[-1][0],
+                      np.concatenate([self.removed, np.array([bool(removed) for _, _, removed in rows], dtype=bool)]), self.file_id)
+
+    def remove(self, task_ids):
+        """Mask the vectors of deleted or archived tasks out of search; returns how many matrix rows that masked."""
+        if not task_ids:
+            return 0
+        self._check_writable()
+        task_ids = list(task_ids)
+        with self.lock:
+            with self.conn:
+                for start in range(0, len(task_ids), 500):  # Stay below SQLite's bound-parameter limit
+                    chunk = task_ids[start:start + 500]
+                    self.conn.execute(f"UPDATE messages SET removed = 1 WHERE task_id IN ({','.join('?' * len(chunk))})", chunk)
+            hit = np.isin(self.ids, task_ids) & ~self.removed
+            removed = self.removed | hit  # A new array, so a search holding the old snapshot is unaffected
+            if removed.sum() > len(self.ids) * self.compact_share:
+                self._rebuild()
+            else:
+                self.removed = removed
+            return int(hit.sum())
+
+    def search(self, query_vector, k=5, chunk_rows=131072):
+        """Return [(task_id, cosine similarity)] of the k vectors closest to query_vector, best first."""
+        self.refresh()
+        matrix, ids, removed = self.matrix, self.ids, self.removed  # Snapshot; add() and remove() may remap meanwhile
+        if matrix is None or k <= 0:
+            return []
+        query = self.normalize(query_vector).reshape(self.dim)
+        best_scores, best_rows = [], []
+        # Score a chunk at a time so a large matrix never needs a full-size temporary
+        for start in range(0, len(ids), chunk_rows):
+            scores = matrix[start:start + chunk_rows] @ query
+            scores[removed[start:start + chunk_rows]] = -np.inf
+            top = np.argpartition(scores, -k)[-k:] if len(scores) > k else np.arange(len(scores))
+            best_scores.append(scores[top])
+            best_rows.append(top + start)
+        scores, rows = np.concatenate(best_scores), np.concatenate(best_rows)
+        order = np.argsort(-scores)[:k]
+        return [(int(ids[rows[i]]), float(scores[i])) for i in order if scores[i] > -np.inf]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,152 @@
+# /model/storage_client.py
+import asyncio
+import itertools
+import json
+import logging
+
+from model.storage_server import DEFAULT_ADDRESS, decode, encode, parse_address
+from model.task_model import TaskChange
+
+logger = logging.getLogger(__name__)
+
+
+class StorageError(Exception):
+    """A TaskModel call failed inside the storage server."""
+
+
+class StorageClient:
+    """Drop-in replacement for AsyncTaskModel that talks to a StorageServer.
+
+    Every method the server serves is a coroutine here too and returns the same
+    tuples and dicts TaskModel does, stream() iterates generator methods batch by batch, and change listeners receive the same TaskChange
+    lists. Calls from one shard share a single connection and can be in flight
+    at the same time. A lost connection is re-opened on the next call.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS):
+        self.address = address
+        self.change_listeners = []
+        self._ids = itertools.count(1)
+        self._pending = {}  # Request id -> Future (calls) or Queue (streams)
+        self._reader = self._writer = None
+        self._read_task = None
+        self._connect_lock = None
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await self.call(name, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    async def call(self, method, *args, **kwargs):
+        """Run TaskModel.method(*args, **kwargs) in the storage server and return its result."""
+        future = asyncio.get_running_loop().create_future()
+        request_id = await self._request({'method': method, 'args': encode(list(args)), 'kwargs': encode(kwargs)}, future)
+        try:
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def stream(self, method_name, *args, batch_size=500, **kwargs):
+        """Iterate a TaskModel generator method; the server sends `batch_size` rows per message."""
+        queue = asyncio.Queue()
+        request_id = await self._request({'method': method_name, 'args': encode(list(args)), 'kwargs': encode(kwargs),
+                                          'stream': True, 'batch_size': batch_size}, queue)
+        done = False
+        try:
+            while True:
+                message = await queue.get()
+                if isinstance(message, Exception):
+                    raise message
+                if message.get('done'):
+                    done = True
+                    return
+                for row in message['rows']:
+                    yield decode(row)
+        finally:
+            self._pending.pop(request_id, None)
+            if not done and self._writer is not None and not self._writer.is_closing():
+                self._writer.write(json.dumps({'id': request_id, 'cancel': True}).encode('utf-8') + b"\n")  # Stop the server's cursor
+
+    async def add_change_listener(self, listener):
+        """Register listener(changes), called on the event loop with a list of TaskChange after each write."""
+        was_connected = self._writer is not None and not self._writer.is_closing()
+        self.change_listeners.append(listener)
+        await self._ensure_connected()  # A new connection subscribes by itself
+        if was_connected and len(self.change_listeners) == 1:
+            await self._subscribe()
+
+    def close(self):
+        """Drop the connection; the storage server keeps running for the other shards."""
+        if self._read_task is not None:
+            self._read_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = self._read_task = None
+
+    async def _request(self, message, waiter):
+        await self._ensure_connected()
+        request_id = next(self._ids)
+        self._pending[request_id] = waiter
+        self._writer.write(json.dumps({'id': request_id, **message}).encode('utf-8') + b"\n")
+        await self._writer.drain()
+        return request_id
+
+    async def _ensure_connected(self):
+        if self._writer is not None and not self._writer.is_closing():
+            return
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            host, port = parse_address(self.address)
+            self._reader, self._writer = await asyncio.open_connection(host, port, limit=2 ** 24)
+            self._read_task = asyncio.create_task(self._read_responses(self._reader, self._writer))
+            if self.change_listeners:
+                await self._subscribe()
+
+    async def _subscribe(self):
+        # Fire-and-forget; the reply is dropped because no request waits for its id
+        self._writer.write(json.dumps({'id': next(self._ids), 'method': 'subscribe'}).encode('utf-8') + b"\n")
+        await self._writer.drain()
+
+    async def _read_responses(self, reader, writer):
+        error = ConnectionError("Connection to the storage server was lost")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if 'event' in message:
+                    changes = [TaskChange(*change) for change in message['event']]
+                    for listener in self.change_listeners:
+                        try:
+                            listener(changes)
+                        except Exception as e:
+                            logger.error("Error in task change listener: %s", e)
+                    continue
+                waiter = self._pending.get(message.get('id'))
+                if isinstance(waiter, asyncio.Queue):
+                    waiter.put_nowait(StorageError(message['error']) if 'error' in message else message)
+                elif waiter is not None and not waiter.done():
+                    if 'error' in message:
+                        waiter.set_exception(StorageError(message['error']))
+                    else:
+                        waiter.set_result(decode(message['result']))
+        except (ConnectionError, json.JSONDecodeError) as e:
+            error = ConnectionError(f"Connection to the storage server was lost: {e}")
+        finally:
+            # Fail whatever was still waiting; the next call reconnects
+            for waiter in self._pending.values():
+                if isinstance(waiter, asyncio.Queue):
+                    waiter.put_nowait(error)
+                elif not waiter.done():
+                    waiter.set_exception(error)
+            self._pending.clear()
+            writer.close()
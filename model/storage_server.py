@@ -0,0 +1,219 @@
+# /model/storage_server.py
+"""Storage service for sharded deployments: one process owns discord_tasks.db and every shard talks to it.
+
+Run from the repository root:  python -m model.storage_server --address 127.0.0.1:8765
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from model.async_task_model import AsyncTaskModel
+from model.task_model import TaskModel
+from utils.logging_config import configure_logging
+from utils.metrics import start_metrics_server
+from viewmodel.retention_job import RetentionJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+# The TaskModel methods shards call: every read, plus the writes behind ingest, backfills, the pivot
+# stage, digests and the task display buttons. Anything else (archiving, vacuuming, dropping tables,
+# closing) is for the server's owner only; listeners are per connection (see "subscribe").
+SERVED_METHODS = TaskModel.READ_METHODS | frozenset({
+    'get_daily_digest', 'get_unfinalized_digests',
+    'store_task', 'store_tasks', 'import_tasks', 'set_translated_contents', 'save_translations',
+    'save_display_state', 'delete_display_state', 'mark_task_complete', 'delete_task',
+    'refresh_digests', 'finalize_digests', 'finalize_old_digests', 'save_digest_translations',
+})
+
+
+def parse_address(address):
+    """Split 'host:port' into (host, port)."""
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def encode(value):
+    """A JSON-ready copy of value that keeps tuples and non-string dict keys, which plain JSON turns into lists and strings."""
+    if isinstance(value, tuple):
+        return {'tuple': [encode(item) for item in value]}
+    if isinstance(value, list):
+        return [encode(item) for item in value]
+    if isinstance(value, dict):
+        return {'dict': [[encode(key), encode(item)] for key, item in value.items()]}
+    return value
+
+
+def decode(value):
+    """Inverse of encode()."""
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    if isinstance(value, dict):
+        if 'tuple' in value:
+            return tuple(decode(item) for item in value['tuple'])
+        return {decode(key): decode(item) for key, item in value['dict']}
+    return value
+
+
+class StorageServer:
+    """Serves a TaskModel over a local socket, one JSON object per line.
+
+    Requests look like {"id": 1, "method": "get_tasks_by_date", "args": [...], "kwargs": {...}}
+    and get {"id": 1, "result": ...} or {"id": 1, "error": "..."}; arguments and results
+    go through encode(), so rows arrive as the same tuples TaskModel returns. Only
+    SERVED_METHODS can be called. Requests on one
+    connection run concurrently; writes all go through AsyncTaskModel's single
+    writer thread, so SQLite still has exactly one writer. Generator methods are
+    streamed with "stream": true, and "subscribe" forwards change events.
+    """
+
+    def __init__(self, model):
+        self.model = model  # AsyncTaskModel
+        self.subscribers = set()  # StreamWriters of connections that asked for change events
+        self.server = None
+        self.loop = None
+
+    async def start(self, address=DEFAULT_ADDRESS):
+        """Listen on address ('host:port'; port 0 picks a free one) and return the bound address."""
+        self.loop = asyncio.get_running_loop()
+        await self.model.add_change_listener(self._on_changes)
+        host, port = parse_address(address)
+        self.server = await asyncio.start_server(self._serve, host, port, limit=2 ** 24)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"{host}:{port}"
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.model.close()
+
+    async def _serve(self, reader, writer):
+        streams = {}  # Request id -> cancellation flag of a running stream
+        handlers = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = json.loads(line)
+                if request.get('cancel'):
+                    if request['id'] in streams:
+                        streams[request['id']] = True
+                    continue
+                handler = asyncio.create_task(self._handle(request, writer, streams))
+                handlers.add(handler)
+                handler.add_done_callback(handlers.discard)
+        except (ConnectionError, json.JSONDecodeError) as e:
+            logger.info("Storage client disconnected: %s", e)
+        finally:
+            self.subscribers.discard(writer)
+            for handler in handlers:
+                handler.cancel()
+            writer.close()
+
+    async def _handle(self, request, writer, streams):
+        request_id, method = request.get('id'), request.get('method', '')
+        args, kwargs = decode(request.get('args', [])), decode(request.get('kwargs', {'dict': []}))
+        try:
+            if method == 'subscribe':
+                self.subscribers.add(writer)
+                await self._send(writer, {'id': request_id, 'result': True})
+            elif method not in SERVED_METHODS:
+                raise AttributeError(f"Unknown storage method '{method}'")
+            elif request.get('stream'):
+                streams[request_id] = False
+                batch_size = request.get('batch_size', 500)
+                rows = self.model.stream(method, *args, batch_size=batch_size, **kwargs)
+                try:
+                    batch = []
+                    async for row in rows:
+                        batch.append(encode(row))
+                        if len(batch) >= batch_size:
+                            await self._send(writer, {'id': request_id, 'rows': batch})  # Waits while the client is slow
+                            batch = []
+                        if streams[request_id]:
+                            break
+                    if batch and not streams[request_id]:
+                        await self._send(writer, {'id': request_id, 'rows': batch})
+                finally:
+                    del streams[request_id]
+                    await rows.aclose()  # Release the cursor now rather than when the generator is collected
+                await self._send(writer, {'id': request_id, 'done': True})
+            else:
+                result = await getattr(self.model, method)(*args, **kwargs)
+                await self._send(writer, {'id': request_id, 'result': encode(result)})
+        except ConnectionError:
+            pass
+        except Exception as e:
+            await self._send(writer, {'id': request_id, 'error': f"{type(e).__name__}: {e}"})
+
+    async def _send(self, writer, message):
+        writer.write(json.dumps(message).encode('utf-8') + b"\n")
+        await writer.drain()
+
+    def _on_changes(self, changes):
+        # Called on the storage thread after each committed write
+        self.loop.call_soon_threadsafe(self._broadcast, {'event': [list(change) for change in changes]})
+
+    def _broadcast(self, message):
+        data = json.dumps(message).encode('utf-8') + b"\n"
+        for writer in list(self.subscribers):
+            if writer.is_closing():
+                self.subscribers.discard(writer)
+            else:
+                writer.write(data)
+
+
+async def serve(db_path, address, metrics_port=None):
+    server = StorageServer(AsyncTaskModel(TaskModel(reset_table=False, db_path=db_path)))
+    bound = await server.start(address)
+    print(f"Storage server listening on {bound}", flush=True)  # Launchers read the port from stdout, so this stays a print
+    # Storage timings are recorded in this process, so it serves its own /metrics
+    metrics_server = await start_metrics_server(port=metrics_port) if metrics_port is not None else None
+    # Shards cannot archive or vacuum, so retention runs next to the database
+    retention_job = RetentionJob(server.model)
+    retention_job.start()
+    try:
+        await server.server.serve_forever()
+    finally:
+        await retention_job.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        await server.close()
+
+
+def convert_vacuum(db_path):
+    """One full VACUUM turning on incremental vacuum, for a database the bot is not using (the sharded !db_vacuum)."""
+    model = TaskModel(reset_table=False, db_path=db_path)
+    try:
+        freed = model.convert_to_incremental_vacuum()
+    finally:
+        model.close()
+    if freed is None:
+        print("Incremental vacuum is already on.")
+    else:
+        print(f"Incremental vacuum is on; the rewrite freed {freed / 2 ** 20:.1f} MiB.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--db', default='discord_tasks.db')
+    parser.add_argument('--address', default=DEFAULT_ADDRESS, help="host:port to listen on; port 0 picks a free port")
+    parser.add_argument('--metrics-port', type=int, default=None, help="Serve Prometheus metrics on this port")
+    parser.add_argument('--convert-vacuum', action='store_true', help="Turn on incremental vacuum with one full VACUUM, then exit")
+    args = parser.parse_args()
+    configure_logging()
+    if args.convert_vacuum:
+        convert_vacuum(args.db)
+        return
+    try:
+        asyncio.run(serve(args.db, args.address, args.metrics_port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# /model/task_archive.py
+import gzip
+import json
+import os
+import tempfile
+
+# Archived rows are written in the order till-date reports read them, so months merge without sorting
+_ORDER = lambda record: (record['author'], record['channel'], record['timestamp'], record['task_id'])
+_decode = json.JSONDecoder().decode  # Skips json.loads' per-call type and encoding checks
+
+
+class TaskArchive:
+    """Tasks moved out of the hot database, one gzip-compressed JSONL file per month.
+
+    Each line is one task, with its checklist, and the lines are sorted by
+    (author, channel, timestamp, task_id): the order of till-date reports. A
+    report can then stream every archived month it covers alongside the hot
+    table with one merge, holding one row per month.
+    Files are replaced atomically, so a reader never sees a half-written month.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, month):
+        return os.path.join(self.directory, f"tasks-{month}.jsonl.gz")
+
+    def add(self, month, records):
+        """Merge task records into a month's file, replacing archived copies of the same task_id; returns (tasks, bytes) of the file."""
+        merged = {record['task_id']: record for record in self._read(month)}
+        merged.update((record['task_id'], record) for record in records)
+        os.makedirs(self.directory, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, prefix=f".tasks-{month}-", suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6, mtime=0) as archive:
+                for record in sorted(merged.values(), key=_ORDER):
+                    # author leads each line, so one user's report can skip other lines without decoding them
+                    archive.write((json.dumps({'author': record['author'], **record}, ensure_ascii=False) + "\n").encode('utf-8'))
+                archive.flush()
+                os.fsync(raw.fileno())  # On disk before the rows are deleted from the hot database
+            os.replace(temp_path, self.path(month))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return len(merged), os.path.getsize(self.path(month))
+
+    def _read(self, month, author=None):
+        prefix = f'{{"author": {json.dumps(author, ensure_ascii=False)}, '.encode('utf-8') if author is not None else b''
+        found = False
+        try:
+            with gzip.open(self.path(month), 'rb') as archive:
+                for line in archive:
+                    if line.startswith(prefix):
+                        found = True
+                        yield _decode(line.decode('utf-8'))
+                    elif found:
+                        return  # Sorted by author, so the rest belong to later authors
+        except FileNotFoundError:
+            return
+
+    def _iter_month(self, month, until_day, author):
+        for record in self._read(month, author):
+            if record['day'] <= until_day and record.get('duplicate_of') is None:
+                yield (record['author'], record['channel'], record['timestamp'], record['task_id'],
+                       record['translated_content'] or record['content'], record['day'])
+
+    def month_streams(self, months, until_day, author=None):
+        """One iterator per month of (author, channel, timestamp, task_id, content, day) rows up to a day, in report order.
+
+        The rows sort as tuples, so the caller merges them with other streams of the
+        same shape in one heapq.merge. Linked near-duplicates are skipped, as in the hot table.
+        """
+        return [self._iter_month(month, until_day, author) for month in months]
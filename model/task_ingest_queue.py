@@ -0,0 +1,137 @@
+# /model/task_ingest_queue.py
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+
+from utils.metrics import histogram, span
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZES = histogram('ingest_batch_size', "Tasks written per group commit", buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000))
+
+
+class TaskIngestQueue:
+    """Buffers incoming tasks and writes them with one transaction per batch (group commit).
+
+    A batch is flushed as soon as `max_batch` tasks are pending or `max_delay` seconds
+    after the first pending task arrived, whichever comes first. `close()` flushes
+    everything still buffered, so a clean shutdown never loses a task.
+
+    A failed write is retried with exponential backoff from `retry_delay` seconds.
+    After `max_attempts` failures in a row the batch is given up; so are the
+    oldest tasks whenever more than `max_pending` wait for a failing storage.
+    Tasks given up are appended to `spill_path` in the export format of
+    `app.py --import-jsonl`, which stores them later without duplicates.
+
+    `on_commit()` is called after each batch is written, so stages reading new
+    tasks are woken once those tasks are visible to their queries.
+    """
+
+    def __init__(self, storage, max_batch=500, max_delay=0.05, max_pending=5000, max_attempts=5, retry_delay=1.0, spill_path=None,
+                 on_commit=None):
+        self.storage = storage  # AsyncTaskModel (or anything with an awaitable store_tasks)
+        self.on_commit = on_commit
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.spill_path = spill_path or os.getenv("INGEST_SPILL_PATH", "ingest_spill.jsonl")
+        self._failures = 0  # Failed writes in a row
+        self._pending = []
+        self._has_items = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flusher = None
+        self._closed = asyncio.Event()  # Also cuts a retry backoff short
+
+    def start(self):
+        """Start the background flusher on the running event loop."""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+
+    async def put(self, content, author, channel, language='unknown', message_id=None):
+        """Queue a task for storage; the timestamp is taken now, not at flush time."""
+        self._pending.append((content, author, channel, str(datetime.now()), language, message_id))
+        self._has_items.set()
+        if len(self._pending) >= self.max_batch:
+            self._batch_full.set()
+        if len(self._pending) >= self.max_pending:
+            await self.flush()  # Apply backpressure instead of growing without bound
+
+    async def flush(self):
+        """Write every pending task in one transaction. Returns False if the write failed."""
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            self._has_items.clear()
+            self._batch_full.clear()
+            if not batch:
+                return True
+            try:
+                with span('ingest.flush'):
+                    await self.storage.store_tasks(batch)
+            except Exception as e:
+                self._failures += 1
+                if self._failures >= self.max_attempts:
+                    logger.error("Error storing batch of %d tasks, giving up after %d attempts: %s", len(batch), self._failures, e)
+                    self._failures = 0
+                    await self._spill(batch)
+                else:
+                    logger.warning("Error storing batch of %d tasks (attempt %d of %d), will retry: %s",
+                                   len(batch), self._failures, self.max_attempts, e)
+                    self._pending[:0] = batch  # Keep arrival order for the retry
+                    overflow = len(self._pending) - self.max_pending
+                    if overflow > 0:
+                        logger.error("%d tasks waiting for storage, giving up the %d oldest", len(self._pending), overflow)
+                        dropped, self._pending = self._pending[:overflow], self._pending[overflow:]
+                        await self._spill(dropped)
+                if self._pending:
+                    self._has_items.set()
+                return False
+            BATCH_SIZES.observe(len(batch))
+            self._failures = 0
+            if self.on_commit is not None:
+                self.on_commit()
+            return True
+
+    async def _spill(self, tasks):
+        try:
+            await asyncio.to_thread(self._write_spill, tasks)
+        except OSError as e:
+            logger.error("Lost %d tasks, could not write them to %s: %s", len(tasks), self.spill_path, e)
+            return
+        logger.error("Wrote %d tasks to %s; store them with: python app.py --import-jsonl %s", len(tasks), self.spill_path, self.spill_path)
+
+    def _write_spill(self, tasks):
+        with open(self.spill_path, 'a', encoding='utf-8') as spill:
+            for content, author, channel, timestamp, _, message_id in tasks:
+                spill.write(json.dumps({'id': message_id, 'channel': channel, 'author': author, 'timestamp': timestamp,
+                                        'content': content}, ensure_ascii=False) + "\n")
+
+    async def close(self):
+        """Stop the flusher and persist anything still buffered, spilling it if storage keeps failing."""
+        self._closed.set()
+        if self._flusher is not None:
+            # Wake the flusher instead of cancelling it, so an in-flight batch is never abandoned
+            self._has_items.set()
+            self._batch_full.set()
+            await self._flusher
+            self._flusher = None
+        if not await self.flush() and self._pending:
+            pending, self._pending = self._pending, []
+            await self._spill(pending)
+
+    async def _run(self):
+        while not self._closed.is_set():
+            await self._has_items.wait()
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), timeout=self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+            if not await self.flush() and self._failures:
+                try:  # Back off before retrying a failed batch
+                    await asyncio.wait_for(self._closed.wait(), timeout=self.retry_delay * 2 ** (self._failures - 1))
+                except asyncio.TimeoutError:
+                    pass
@@ -1,33 +1,111 @@
 # /model/task_model.py
+import heapq
+import json
+import logging
+import os
+import re
 import sqlite3
-from datetime import datetime
+from collections import namedtuple
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from model.connection_manager import ConnectionManager
+from model.task_archive import TaskArchive
+from model.translation_cache import TranslationCache
+from utils.metrics import counter, span
+from utils.minhash import BAND_COUNT, band_keys, jaccard, shingles
+
+logger = logging.getLogger(__name__)
+
+TASKS_STORED = counter('tasks_stored_total', "Tasks written by store_tasks and imports, by outcome", ['outcome'])
+
+# Emitted to change listeners after a write commits; kind is 'inserted', 'deleted' or 'updated'
+TaskChange = namedtuple('TaskChange', ['kind', 'task_id'])
+
+# A double-quoted phrase or a bare word (optionally ending in * for a prefix search)
+_SEARCH_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def build_fts_query(text):
+    """Turn user input into a safe FTS5 query: words and "quoted phrases" must all match, word* is a prefix.
+
+    Every term is quoted, so characters FTS5 treats as syntax (-, :, parentheses) are searched literally.
+    """
+    terms = []
+    for phrase, word in _SEARCH_TERM.findall(text):
+        if phrase.strip():
+            terms.append(f'"{phrase.strip()}"')
+        elif word:
+            prefix = word.endswith('*')
+            word = word.rstrip('*').replace('"', '')
+            if word:
+                terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+DEDUP_MODES = ('link', 'suppress', 'off')
+_BAND_COLUMNS = [f"dedup_band{band}" for band in range(BAND_COUNT)]
+
 
 class TaskModel:
-    def __init__(self, reset_table=False):
-        self.conn = sqlite3.connect('discord_tasks.db')
-        self.c = self.conn.cursor()
+    # Methods that only read committed rows; they use a pooled read connection, and AsyncTaskModel runs them off the writer thread
+    READ_METHODS = frozenset({
+        'find_near_duplicate', 'get_import_checkpoint', 'get_untranslated_tasks', 'get_translation_watermark', 'get_all_tasks',
+        'get_tasks_after', 'get_tasks_by_ids', 'search_tasks', 'get_tasks_page', 'get_display_state', 'get_digest_languages',
+        'get_checklists_by_task_id', 'get_tasks_by_date', 'get_tasks_by_author', 'get_tasks_by_author_and_date',
+        'get_todays_tasks_by_author', 'get_tasks_by_author_till_date', 'get_tasks_till_date', 'iter_tasks_till_date',
+        'get_query_stats', 'get_storage_sizes',
+    })
+
+    def __init__(self, reset_table=False, db_path='discord_tasks.db', dedup_mode=None, dedup_window_hours=None, dedup_similarity=0.7,
+                 read_pool_size=None, db=None, archive_dir=None):
+        # A WAL-mode writer plus a pool of read connections; pass `db` to use other settings
+        if db is None:
+            if read_pool_size is None:
+                # Reader threads only pay off on spare cores; the writer thread and the event loop need one
+                read_pool_size = int(os.getenv("SQLITE_READ_POOL_SIZE", min(4, (os.cpu_count() or 1) - 1)))
+            db = ConnectionManager(db_path, read_pool_size=read_pool_size, slow_query_ms=float(os.getenv("SQLITE_SLOW_QUERY_MS", "250")))
+        self.db = db
+        self.conn = db.writer  # Every write, and reads that must see the current transaction
+        self.change_listeners = []  # Callables receiving a list of TaskChange after each committed write
+        # Near-duplicates of a task by the same author within the window are linked to it or not stored at all
+        self.dedup_mode = dedup_mode or os.getenv("DEDUP_MODE", "link")
+        if self.dedup_mode not in DEDUP_MODES:
+            raise ValueError(f"Unknown DEDUP_MODE {self.dedup_mode!r}, expected one of {', '.join(DEDUP_MODES)}")
+        self.dedup_window = timedelta(hours=float(dedup_window_hours or os.getenv("DEDUP_WINDOW_HOURS", "24")))
+        self.dedup_similarity = dedup_similarity  # Jaccard similarity of word shingles that counts as a repeat
+        # Tasks past their channel's retention window move to monthly files here (see archive_expired_tasks)
+        self.archive = TaskArchive(archive_dir or os.getenv("TASK_ARCHIVE_DIR") or f"{os.path.splitext(db.db_path)[0]}_archive")
+        # Only this process writes the translation cache, through the writer; shards and NLP workers open it read-only
+        self.translation_cache = TranslationCache(db.db_path, conn=db.writer)
         if reset_table:
             self.drop_table_if_exists()  # Call the method to drop the table if it exists (optional)
         self.create_table()
         self.create_checklist_table()  # Create the checklist table
+        self.migrate()  # Bring older databases up to the current schema version
         
     def drop_table_if_exists(self):
         """Drop the tasks table if it already exists."""
-        self.c.execute("DROP TABLE IF EXISTS tasks")
-        self.c.execute("DROP TABLE IF EXISTS checklists")
+        self.conn.execute("DROP TABLE IF EXISTS checklists")  # Before tasks, so its cascade has nothing to delete
+        self.conn.execute("DROP TABLE IF EXISTS tasks")
+        self.conn.execute("DROP TABLE IF EXISTS tasks_fts")
+        self.conn.execute("DROP TABLE IF EXISTS daily_digests")
+        self.conn.execute("DROP TABLE IF EXISTS digest_translations")
+        self.conn.execute("DROP TABLE IF EXISTS import_checkpoints")
+        self.conn.execute("DROP TABLE IF EXISTS task_archives")
+        self.conn.execute("PRAGMA user_version = 0")  # Recreated tables start from the base schema again
         self.conn.commit()
-        print("Dropped the tasks table if it existed.")    
+        logger.info("Dropped the task tables")
 
     def create_table(self):
         """Create the table to store tasks."""
-        self.c.execute('''CREATE TABLE IF NOT EXISTS tasks
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS tasks
                           (task_id INTEGER PRIMARY KEY AUTOINCREMENT, content TEXT, author TEXT, channel TEXT, timestamp TEXT, language TEXT)''')
         self.conn.commit()
         
         
     def create_checklist_table(self):
         """Create a checklist table for storing checklist items."""
-        self.c.execute('''
+        self.conn.execute('''
             CREATE TABLE IF NOT EXISTS checklists (
                 checklist_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 task_id INTEGER,
@@ -40,68 +118,558 @@ class TaskModel:
         ''')
         self.conn.commit()    
 
+    def migrate(self):
+        """Apply pending schema migrations, tracked with SQLite's user_version pragma."""
+        # Each entry upgrades the schema by one version; append new migrations, never reorder them
+        migrations = [self._migrate_add_day_column, self._migrate_add_translated_content, self._migrate_add_status,
+                      self._migrate_add_display_state, self._migrate_add_fulltext_index, self._migrate_add_dedup_bands,
+                      self._migrate_add_daily_digests, self._migrate_add_message_ids, self._migrate_add_task_archives,
+                      self._migrate_split_digest_triggers, self._migrate_add_browse_index,
+                      self._migrate_add_stream_order_index]
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for target_version, migration in enumerate(migrations[version:], start=version + 1):
+            with self.conn:
+                self.conn.execute("BEGIN")  # Make the DDL part of the transaction too, so a failed step rolls back fully
+                migration()
+                self.conn.execute(f"PRAGMA user_version = {target_version}")
+            logger.info("Migrated task database to schema version %d", target_version)
+
+    def _migrate_add_day_column(self):
+        """v1: store the calendar day next to the timestamp and index it for report queries."""
+        self.conn.execute("ALTER TABLE tasks ADD COLUMN day TEXT")
+        self.conn.execute("UPDATE tasks SET day = date(timestamp)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_author_day ON tasks (author, day)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_day_author_channel ON tasks (day, author, channel)")
+
+    def _migrate_add_translated_content(self):
+        """v2: keep a pivot-language copy of each task so reports never translate at read time."""
+        self.conn.execute("ALTER TABLE tasks ADD COLUMN translated_content TEXT")
+        # Partial index: finding rows that still need translating stays cheap however big the table gets
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_untranslated ON tasks (task_id) WHERE translated_content IS NULL")
+
+    def _migrate_add_status(self):
+        """v3: add the status column that mark_task_complete updates."""
+        self.conn.execute("ALTER TABLE tasks ADD COLUMN status TEXT DEFAULT 'active'")
+
+    def _migrate_add_display_state(self):
+        """v4: remember which message shows the task browser in each guild channel."""
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS display_state
+                             (guild_id INTEGER, channel_id INTEGER, message_id INTEGER, first_task_id INTEGER,
+                              stale_message_ids TEXT DEFAULT '', updated_at TEXT,
+                              PRIMARY KEY (guild_id, channel_id))''')
+
+    def _migrate_add_fulltext_index(self):
+        """v5: FTS5 index over task text, kept in sync with tasks by triggers."""
+        # External content: the index stores only tokens and reads the text back from tasks
+        self.conn.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5
+                             (content, translated_content, content='tasks', content_rowid='task_id',
+                              tokenize='unicode61 remove_diacritics 2')""")
+        self.conn.execute("""CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+                                 INSERT INTO tasks_fts (rowid, content, translated_content) VALUES (new.task_id, new.content, new.translated_content);
+                             END""")
+        self.conn.execute("""CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                                 INSERT INTO tasks_fts (tasks_fts, rowid, content, translated_content) VALUES ('delete', old.task_id, old.content, old.translated_content);
+                             END""")
+        self.conn.execute("""CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF content, translated_content ON tasks BEGIN
+                                 INSERT INTO tasks_fts (tasks_fts, rowid, content, translated_content) VALUES ('delete', old.task_id, old.content, old.translated_content);
+                                 INSERT INTO tasks_fts (rowid, content, translated_content) VALUES (new.task_id, new.content, new.translated_content);
+                             END""")
+        self.conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")  # Index the tasks stored so far
+
+    def _migrate_add_dedup_bands(self):
+        """v6: MinHash band keys for finding near-duplicate tasks, and a link from each duplicate to its original."""
+        for column in _BAND_COLUMNS + ['duplicate_of']:
+            self.conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} INTEGER")
+        # One index per band: similar tasks very likely share a band key, so candidates are index lookups
+        for band, column in enumerate(_BAND_COLUMNS):
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_tasks_author_band{band} ON tasks (author, {column})")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_duplicate_of ON tasks (duplicate_of) WHERE duplicate_of IS NOT NULL")
+        # Key the tasks stored so far; existing rows are left unlinked
+        rows = self.conn.execute("SELECT task_id, content FROM tasks").fetchall()
+        self.conn.executemany(f"UPDATE tasks SET {' = ?, '.join(_BAND_COLUMNS)} = ? WHERE task_id = ?",
+                              (band_keys(shingles(content or '')) + [task_id] for task_id, content in rows))
+
+    def _migrate_add_daily_digests(self):
+        """v7: per-(day, author, channel) report digests, marked dirty by triggers and rebuilt on demand."""
+        # content and its translations are JSON lists of task lines in task_id order
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS daily_digests
+                             (day TEXT, author TEXT, channel TEXT, content TEXT DEFAULT '[]', task_count INTEGER DEFAULT 0,
+                              summary TEXT, dirty INTEGER DEFAULT 1, finalized INTEGER DEFAULT 0, updated_at TEXT,
+                              PRIMARY KEY (day, author, channel))''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_digests_dirty ON daily_digests (day) WHERE dirty = 1")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_digests_unfinalized ON daily_digests (day) WHERE finalized = 0")
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS digest_translations
+                             (day TEXT, author TEXT, channel TEXT, language TEXT, content TEXT, summary TEXT,
+                              PRIMARY KEY (day, author, channel, language))''')
+        mark_dirty = ("INSERT INTO daily_digests (day, author, channel) VALUES ({0}.day, {0}.author, {0}.channel) "
+                      "ON CONFLICT (day, author, channel) DO UPDATE SET dirty = 1;")
+        self.conn.execute(f"""CREATE TRIGGER IF NOT EXISTS daily_digests_insert AFTER INSERT ON tasks BEGIN
+                                  {mark_dirty.format('new')}
+                              END""")
+        self.conn.execute(f"""CREATE TRIGGER IF NOT EXISTS daily_digests_delete AFTER DELETE ON tasks BEGIN
+                                  {mark_dirty.format('old')}
+                              END""")
+        self.conn.execute(f"""CREATE TRIGGER IF NOT EXISTS daily_digests_update
+                              AFTER UPDATE OF content, translated_content, duplicate_of ON tasks BEGIN
+                                  {mark_dirty.format('new')}
+                              END""")
+        # Build digests for the tasks stored so far; days already over are never summarized, so upgrading never runs T5 over all history
+        today, updated_at = datetime.now().strftime('%Y-%m-%d'), str(datetime.now())
+        rows = self.conn.execute("SELECT day, author, channel, COALESCE(translated_content, content) FROM tasks "
+                                 "WHERE day IS NOT NULL AND duplicate_of IS NULL ORDER BY day, author, channel, task_id")
+        for (day, author, channel), group in groupby(rows, key=lambda row: row[:3]):
+            contents = [row[3] for row in group]
+            self.conn.execute("INSERT OR REPLACE INTO daily_digests (day, author, channel, content, task_count, dirty, finalized, updated_at) "
+                              "VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+                              (day, author, channel, json.dumps(contents), len(contents), day < today, updated_at))
+
+    def _migrate_add_message_ids(self):
+        """v8: the Discord message each task came from, so history imports and live ingest never store a message twice."""
+        self.conn.execute("ALTER TABLE tasks ADD COLUMN message_id INTEGER")
+        self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_message_id ON tasks (message_id) WHERE message_id IS NOT NULL")
+        # Where each history import (a channel, or an export file) got to, committed together with its tasks
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS import_checkpoints
+                             (source TEXT PRIMARY KEY, position TEXT, imported INTEGER DEFAULT 0, updated_at TEXT)''')
+
+    def _migrate_add_task_archives(self):
+        """v9: the monthly archive files holding tasks past their retention window, committed with the deletes."""
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS task_archives
+                             (month TEXT PRIMARY KEY, task_count INTEGER, bytes INTEGER, updated_at TEXT)''')
+        # Without it, every deleted task's ON DELETE CASCADE scans the whole checklists table
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_checklists_task_id ON checklists (task_id)")
+
+    def _migrate_split_digest_triggers(self):
+        """v10: a pivot translation marks its digest dirty = 2, which rebuilds the text but keeps the summary and finalized flag."""
+        # A translated copy says the same thing, so past days are not summarized again when history is translated
+        self.conn.execute("DROP TRIGGER IF EXISTS daily_digests_update")
+        self.conn.execute("""CREATE TRIGGER daily_digests_update AFTER UPDATE OF content, duplicate_of ON tasks BEGIN
+                                  INSERT INTO daily_digests (day, author, channel) VALUES (new.day, new.author, new.channel)
+                                  ON CONFLICT (day, author, channel) DO UPDATE SET dirty = 1;
+                              END""")
+        self.conn.execute("""CREATE TRIGGER daily_digests_translate AFTER UPDATE OF translated_content ON tasks BEGIN
+                                  INSERT INTO daily_digests (day, author, channel) VALUES (new.day, new.author, new.channel)
+                                  ON CONFLICT (day, author, channel) DO UPDATE SET dirty = CASE WHEN dirty = 1 THEN 1 ELSE 2 END;
+                              END""")
+        self.conn.execute("DROP INDEX IF EXISTS idx_daily_digests_dirty")
+        self.conn.execute("CREATE INDEX idx_daily_digests_dirty ON daily_digests (day) WHERE dirty > 0")
+
+    def _migrate_add_browse_index(self):
+        """v11: index the tasks the task browser lists, so a page never steps over repeats and completed tasks."""
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_browse ON tasks (task_id) WHERE duplicate_of IS NULL AND status = 'active'")
+
+    def _migrate_add_stream_order_index(self):
+        """v12: index tasks in the order iter_tasks_till_date streams them, so SQLite never sorts the whole report first."""
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_stream_order ON tasks (author, channel, timestamp, task_id) "
+                          "WHERE duplicate_of IS NULL")
+
+    def add_change_listener(self, listener):
+        """Register listener(changes) to be called with a list of TaskChange after each write.
+
+        Listeners run on the thread that performed the write (AsyncTaskModel's writer
+        thread), so they must hand work over to their own thread or event loop.
+        """
+        self.change_listeners.append(listener)
+
+    def _emit_changes(self, kind, task_ids):
+        if not task_ids or not self.change_listeners:
+            return
+        changes = [TaskChange(kind, task_id) for task_id in task_ids]
+        for listener in self.change_listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                logger.error("Error in task change listener: %s", e)
+
         
+    def find_near_duplicate(self, content, author, timestamp):
+        """Return the task_id of an earlier task by `author` within the dedup window that `content` nearly repeats, or None."""
+        features = shingles(content or '')
+        with self.db.read() as conn:
+            return self._find_near_duplicate(features, band_keys(features), author, timestamp, conn)
+
+    def _find_near_duplicate(self, features, keys, author, timestamp, conn=None):
+        # Inside store_tasks this runs on the writer, so earlier rows of the same batch are candidates too
+        conn = conn or self.conn
+        if not features:
+            return None
+        try:
+            since = str(datetime.fromisoformat(timestamp) - self.dedup_window)
+        except ValueError:
+            return None
+        # One (author, band) index probe per band; a UNION keeps SQLite from scanning all of the author's rows instead
+        probes = " UNION ".join(f"SELECT task_id, content FROM tasks WHERE author = ? AND {column} = ? "
+                                f"AND timestamp >= ? AND timestamp <= ? AND duplicate_of IS NULL" for column in _BAND_COLUMNS)
+        candidates = conn.execute(f"{probes} ORDER BY task_id",
+                                  [value for key in keys for value in (author, key, since, timestamp)])
+        for task_id, candidate in candidates:  # Band keys only suggest candidates; the shingle sets decide
+            if jaccard(features, shingles(candidate or '')) >= self.dedup_similarity:
+                return task_id
+        return None
+
+    def _insert_task(self, content, author, channel, timestamp, language, dedup=True, message_id=None):
+        """Insert one task inside the caller's transaction; returns (task_id, duplicate_of), task_id None if not stored."""
+        if message_id is not None and self.conn.execute("SELECT 1 FROM tasks WHERE message_id = ?", (message_id,)).fetchone():
+            return None, None  # Already stored, by live ingest or an earlier import
+        features = shingles(content or '')
+        keys = band_keys(features)
+        duplicate_of = None
+        if dedup and self.dedup_mode != 'off':
+            with span('storage.near_duplicate_check'):
+                duplicate_of = self._find_near_duplicate(features, keys, author, timestamp)
+            if duplicate_of is not None and self.dedup_mode == 'suppress':
+                return None, duplicate_of
+        cursor = self.conn.execute(f"INSERT OR IGNORE INTO tasks (content, author, channel, timestamp, language, day, "
+                                   f"{', '.join(_BAND_COLUMNS)}, duplicate_of, message_id) VALUES ({', '.join('?' * (8 + BAND_COUNT))})",
+                                   [content, author, channel, timestamp, language, timestamp[:10]] + keys + [duplicate_of, message_id])
+        return cursor.lastrowid, duplicate_of
+
     def store_task(self,content, author, channel, language='unknown'):
         """Store the task into the database with an auto-incrementing task ID."""
         timestamp = str(datetime.now())  # Capture the current timestamp
-        self.c.execute("INSERT OR IGNORE INTO tasks (content, author, channel, timestamp, language) VALUES (?, ?, ?, ?, ?)",
-              (content, author, channel, timestamp, language))
-        self.conn.commit()
-        print(f"Stored task from {author} in {channel}: \n {content} [Language: {language}]")   
+        with self.conn:
+            # Tasks added explicitly through the modal are never treated as repeats
+            task_id, _ = self._insert_task(content, author, channel, timestamp, language, dedup=False)
+        self._emit_changes('inserted', [task_id])
+        TASKS_STORED.inc(outcome='stored')
+        logger.debug("Stored task from %s in %s: %s [Language: %s]", author, channel, content, language)
+
+    def store_tasks(self, rows):
+        """Store a batch of (content, author, channel, timestamp, language[, message_id]) rows in a single transaction.
+
+        Each row is checked against the author's recent tasks, including earlier rows
+        of the same batch; near-duplicates are linked or suppressed per `dedup_mode`.
+        Rows whose message_id is already stored are skipped.
+        """
+        last_task_id = self.conn.execute("SELECT COALESCE(MAX(task_id), 0) FROM tasks").fetchone()[0]
+        with self.conn:  # One commit (and one fsync) for the whole batch, rolled back on error
+            _, duplicates = self._insert_tasks(rows)
+        if duplicates:
+            action = "not stored" if self.dedup_mode == 'suppress' else "linked to earlier tasks"
+            logger.debug("Stored batch of %d tasks, %d near-duplicates %s", len(rows), duplicates, action)
+        else:
+            logger.debug("Stored batch of %d tasks", len(rows))
+        self._emit_inserted_since(last_task_id)
 
+    def _insert_tasks(self, rows):
+        # Inside the caller's transaction; returns (tasks inserted, near-duplicates found)
+        outcomes = {'stored': 0, 'linked': 0, 'suppressed': 0, 'already_stored': 0}
+        for content, author, channel, timestamp, language, *message_id in rows:
+            task_id, duplicate_of = self._insert_task(content, author, channel, timestamp, language,
+                                                      message_id=message_id[0] if message_id else None)
+            if task_id is None:
+                outcomes['already_stored' if duplicate_of is None else 'suppressed'] += 1
+            else:
+                outcomes['stored' if duplicate_of is None else 'linked'] += 1
+        for outcome, count in outcomes.items():
+            if count:
+                TASKS_STORED.inc(count, outcome=outcome)
+        return outcomes['stored'] + outcomes['linked'], outcomes['linked'] + outcomes['suppressed']
 
+    def _emit_inserted_since(self, last_task_id):
+        if self.change_listeners:
+            # Only this thread writes, so every id above the previous maximum came from the last batch
+            new_ids = [row[0] for row in self.conn.execute("SELECT task_id FROM tasks WHERE task_id > ?", (last_task_id,))]
+            self._emit_changes('inserted', new_ids)
+
+    def import_tasks(self, source, rows, position):
+        """Store a batch of imported history rows and advance the source's checkpoint to `position`, atomically.
+
+        Rows are as for store_tasks, with a message_id. Returns how many tasks were stored.
+        """
+        last_task_id = self.conn.execute("SELECT COALESCE(MAX(task_id), 0) FROM tasks").fetchone()[0]
+        with self.conn:
+            stored, _ = self._insert_tasks(rows)
+            self.conn.execute("INSERT INTO import_checkpoints (source, position, imported, updated_at) VALUES (?, ?, ?, ?) "
+                              "ON CONFLICT (source) DO UPDATE SET position = excluded.position, "
+                              "imported = imported + excluded.imported, updated_at = excluded.updated_at",
+                              (source, str(position), stored, str(datetime.now())))
+        self._emit_inserted_since(last_task_id)
+        return stored
+
+    def get_import_checkpoint(self, source):
+        """Return (position, imported) of a history import, or None if it never ran."""
+        with self.db.read() as conn:
+            return conn.execute("SELECT position, imported FROM import_checkpoints WHERE source = ?", (source,)).fetchone()
+
+
+
+    def get_untranslated_tasks(self, limit=100, after_task_id=0):
+        """Return up to `limit` (task_id, content, language) rows after `after_task_id` that have no pivot-language copy yet."""
+        # Linked near-duplicates never reach a report, so they are not worth translating
+        with self.db.read() as conn:
+            return conn.execute("SELECT task_id, content, language FROM tasks WHERE translated_content IS NULL AND duplicate_of IS NULL "
+                                "AND task_id > ? ORDER BY task_id LIMIT ?", (after_task_id, limit)).fetchall()
+
+    def get_translation_watermark(self):
+        """The task_id the live pivot stage starts after: the newest translated task, or the newest task if none is translated.
+
+        Older untranslated rows are history, translated only by an explicit backfill.
+        """
+        with self.db.read() as conn:
+            row = conn.execute("SELECT MAX(task_id) FROM tasks WHERE translated_content IS NOT NULL").fetchone()
+            if row[0] is None:
+                row = conn.execute("SELECT MAX(task_id) FROM tasks").fetchone()
+        return row[0] or 0
+
+    def set_translated_contents(self, rows):
+        """Store pivot-language copies from (translated_content, task_id) rows in one transaction."""
+        with self.conn:
+            self.conn.executemany("UPDATE tasks SET translated_content = ? WHERE task_id = ?", rows)
 
     def mark_task_complete(self, task_id):
         """Mark the task as completed."""
-        self.c.execute("UPDATE tasks SET status = 'completed' WHERE task_id = ?", (task_id,))
-        self.conn.commit()
+        with self.conn:
+            updated = self.conn.execute("UPDATE tasks SET status = 'completed' WHERE task_id = ?", (task_id,)).rowcount
+        self._emit_changes('updated', [task_id] if updated else [])
 
     def delete_task(self, task_name):
         """Delete the task from the database."""
-        self.c.execute("DELETE FROM tasks WHERE content = ?", (task_name,))
-        self.conn.commit()
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks WHERE content = ?", (task_name,))
 
     def get_all_tasks(self):
         """Retrieve all tasks from the database."""
-        self.c.execute("SELECT * FROM tasks WHERE status = 'active'")
-        return self.c.fetchall()
+        with self.db.read() as conn:
+            return conn.execute("SELECT * FROM tasks WHERE status = 'active'").fetchall()
     
     
     def delete_task(self, content):
         """Delete a task and its associated checklists by task content."""
-        self.c.execute("DELETE FROM tasks WHERE content = ?", (content,))
-        self.conn.commit()
+        task_ids = [row[0] for row in self.conn.execute("SELECT task_id FROM tasks WHERE content = ?", (content,)).fetchall()]
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks WHERE content = ?", (content,))  # Checklists go with it (ON DELETE CASCADE)
+            self._promote_duplicates(task_ids)
+        self._emit_changes('deleted', task_ids)
+
+    def _promote_duplicates(self, deleted_ids):
+        # The oldest remaining duplicate of a deleted task takes its place in reports
+        for deleted_id in deleted_ids:
+            row = self.conn.execute("SELECT MIN(task_id) FROM tasks WHERE duplicate_of = ?", (deleted_id,)).fetchone()
+            if row[0] is not None:
+                self.conn.execute("UPDATE tasks SET duplicate_of = NULL WHERE task_id = ?", (row[0],))
+                self.conn.execute("UPDATE tasks SET duplicate_of = ? WHERE duplicate_of = ?", (row[0], deleted_id))
 
     def get_all_tasks(self):
         """Retrieve all tasks from the database."""
-        self.c.execute("SELECT * FROM tasks")
-        return self.c.fetchall()
+        with self.db.read() as conn:
+            return conn.execute("SELECT task_id, content, author, channel, timestamp, language FROM tasks").fetchall()
     
+    def get_tasks_after(self, task_id, limit=100):
+        """Return up to `limit` (task_id, content, author, channel, timestamp, language) rows with a higher task_id, skipping near-duplicates."""
+        with self.db.read() as conn:
+            return conn.execute("SELECT task_id, content, author, channel, timestamp, language FROM tasks "
+                                "WHERE task_id > ? AND duplicate_of IS NULL ORDER BY task_id LIMIT ?", (task_id, limit)).fetchall()
+
+    def get_tasks_by_ids(self, task_ids):
+        """Return the (task_id, content, author, channel, timestamp, language) rows that still exist for task_ids."""
+        rows = []
+        task_ids = list(task_ids)
+        with self.db.read() as conn:
+            for start in range(0, len(task_ids), 500):  # Stay below SQLite's bound-parameter limit
+                chunk = task_ids[start:start + 500]
+                rows += conn.execute(f"SELECT task_id, COALESCE(translated_content, content), author, channel, timestamp, language "
+                                     f"FROM tasks WHERE task_id IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+        return rows
+
+    def search_tasks(self, text, channel=None, author=None, date_from=None, date_to=None, limit=10, offset=0):
+        """Full-text search, best matches (bm25) first.
+
+        Returns (rows, has_next) with rows of (task_id, snippet, author, channel, day);
+        the snippet marks matched words in **bold**. Dates are 'YYYY-MM-DD', inclusive.
+        """
+        query = build_fts_query(text)
+        if not query:
+            return [], False
+        sql = ["SELECT t.task_id, snippet(tasks_fts, -1, '**', '**', '…', 16), t.author, t.channel, t.day "
+               "FROM tasks_fts JOIN tasks t ON t.task_id = tasks_fts.rowid WHERE tasks_fts MATCH ? AND t.duplicate_of IS NULL"]
+        params = [query]
+        for condition, value in (("t.channel = ?", channel), ("t.author = ?", author),
+                                 ("t.day >= ?", date_from), ("t.day <= ?", date_to)):
+            if value:
+                sql.append(f"AND {condition}")
+                params.append(value)
+        sql.append("ORDER BY bm25(tasks_fts), t.task_id LIMIT ? OFFSET ?")
+        params += [limit + 1, offset]  # One extra row tells whether there is a next page
+        try:
+            with self.db.read() as conn:
+                rows = conn.execute(" ".join(sql), params).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.info("Invalid search query %r: %s", query, e)
+            return [], False
+        return rows[:limit], len(rows) > limit
+
+    def get_tasks_page(self, after_task_id=None, before_task_id=None, limit=10):
+        """Keyset-paginate active tasks by task_id, skipping near-duplicates; returns (rows, has_previous, has_next).
+
+        Pass `after_task_id` for the page after it, `before_task_id` for the page before it,
+        or neither for the first page. Only `limit` + 1 rows are read, whatever the table size.
+        """
+        columns = "task_id, content, author, channel, timestamp, language"
+        # Forced onto the partial index: the planner picks the primary key, which steps over every repeat and completed task
+        listed = "duplicate_of IS NULL AND status = 'active'"
+        with self.db.read() as conn:
+            if before_task_id is not None:
+                rows = conn.execute(f"SELECT {columns} FROM tasks INDEXED BY idx_tasks_browse WHERE task_id < ? AND {listed} ORDER BY task_id DESC LIMIT ?",
+                                    (before_task_id, limit + 1)).fetchall()
+                has_previous = len(rows) > limit
+                rows = rows[:limit][::-1]
+                has_next = bool(rows) and conn.execute(f"SELECT EXISTS (SELECT 1 FROM tasks INDEXED BY idx_tasks_browse WHERE task_id > ? AND {listed})",
+                                                       (rows[-1][0],)).fetchone()[0] == 1
+            else:
+                rows = conn.execute(f"SELECT {columns} FROM tasks INDEXED BY idx_tasks_browse WHERE task_id > ? AND {listed} ORDER BY task_id LIMIT ?",
+                                    (after_task_id or 0, limit + 1)).fetchall()
+                has_next = len(rows) > limit
+                rows = rows[:limit]
+                has_previous = bool(rows) and conn.execute(f"SELECT EXISTS (SELECT 1 FROM tasks INDEXED BY idx_tasks_browse WHERE task_id < ? AND {listed})",
+                                                           (rows[0][0],)).fetchone()[0] == 1
+        return rows, has_previous, has_next
+
+    def get_display_state(self, guild_id, channel_id):
+        """Return (message_id, first_task_id, stale_message_ids) for a channel's task browser, or None."""
+        with self.db.read() as conn:
+            row = conn.execute("SELECT message_id, first_task_id, stale_message_ids FROM display_state WHERE guild_id = ? AND channel_id = ?",
+                               (guild_id, channel_id)).fetchone()
+        if row is None:
+            return None
+        message_id, first_task_id, stale = row
+        return message_id, first_task_id, [int(message_id) for message_id in stale.split(',') if message_id]
+
+    def save_display_state(self, guild_id, channel_id, message_id, first_task_id, stale_message_ids=()):
+        """Insert or replace the task browser state of one channel."""
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO display_state (guild_id, channel_id, message_id, first_task_id, stale_message_ids, updated_at) "
+                              "VALUES (?, ?, ?, ?, ?, ?)",
+                              (guild_id, channel_id, message_id, first_task_id, ','.join(map(str, stale_message_ids)), str(datetime.now())))
+
+    def delete_display_state(self, guild_id, channel_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM display_state WHERE guild_id = ? AND channel_id = ?", (guild_id, channel_id))
+
+    def refresh_digests(self, day=None):
+        """Rebuild the dirty digests of one day (or of every day); returns how many were rebuilt.
+
+        Only groups whose tasks changed since their last build are read again, so
+        this stays cheap while tasks keep arriving for today. Groups whose tasks only
+        got their pivot translation (dirty = 2) keep their summary, finalized flag and
+        report translations, so translating history never summarizes it again.
+        """
+        if day is None:
+            rows = self.conn.execute("SELECT day, author, channel, dirty FROM daily_digests WHERE dirty > 0").fetchall()
+        else:
+            rows = self.conn.execute("SELECT day, author, channel, dirty FROM daily_digests WHERE day = ? AND dirty > 0", (day,)).fetchall()
+        if not rows:
+            return 0
+        updated_at = str(datetime.now())
+        with self.conn:
+            for *key, dirty in rows:
+                key = tuple(key)
+                contents = [row[0] for row in self.conn.execute("SELECT COALESCE(translated_content, content) FROM tasks "
+                                                                "WHERE day = ? AND author = ? AND channel = ? AND duplicate_of IS NULL "
+                                                                "ORDER BY task_id", key)]
+                if dirty == 2 and contents:
+                    # Same tasks in the pivot language; updated_at stays, so a summary being computed still lands
+                    self.conn.execute("UPDATE daily_digests SET content = ?, task_count = ?, dirty = 0 WHERE day = ? AND author = ? AND channel = ?",
+                                      (json.dumps(contents), len(contents)) + key)
+                    continue
+                # Summaries and translations of the old contents no longer apply
+                self.conn.execute("DELETE FROM digest_translations WHERE day = ? AND author = ? AND channel = ?", key)
+                if contents:
+                    self.conn.execute("UPDATE daily_digests SET content = ?, task_count = ?, summary = NULL, dirty = 0, "
+                                      "finalized = 0, updated_at = ? WHERE day = ? AND author = ? AND channel = ?",
+                                      (json.dumps(contents), len(contents), updated_at) + key)
+                else:
+                    self.conn.execute("DELETE FROM daily_digests WHERE day = ? AND author = ? AND channel = ?", key)
+        return len(rows)
+
+    def get_daily_digest(self, day, author=None, language=None):
+        """Return the digest of a day as (author, channel, contents, summary, translated contents, translated summary) rows.
+
+        Contents are lists of task lines. The translated fields come from
+        digest_translations for `language`, and are None when not stored yet.
+        """
+        self.refresh_digests(day)
+        sql = ("SELECT d.author, d.channel, d.content, d.summary, t.content, t.summary FROM daily_digests d "
+               "LEFT JOIN digest_translations t ON t.day = d.day AND t.author = d.author AND t.channel = d.channel AND t.language = ? "
+               "WHERE d.day = ?")
+        params = [language, day]
+        if author is not None:
+            sql += " AND d.author = ?"
+            params.append(author)
+        rows = self.conn.execute(sql + " ORDER BY d.author, d.channel", params).fetchall()
+        return [(author, channel, json.loads(contents), summary, json.loads(translated) if translated is not None else None,
+                 translated_summary) for author, channel, contents, summary, translated, translated_summary in rows]
+
+    def save_digest_translations(self, day, language, rows):
+        """Store translations of a day's digests from (author, channel, contents, summary) rows."""
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO digest_translations (day, author, channel, language, content, summary) "
+                                  "SELECT ?, ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM daily_digests "
+                                  "WHERE day = ? AND author = ? AND channel = ? AND dirty = 0)",
+                                  [(day, author, channel, language, json.dumps(contents), summary, day, author, channel)
+                                   for author, channel, contents, summary in rows])
+
+    def save_translations(self, source, target, translations):
+        """Store {text: translation} pairs that a read-only TranslationCache handed over."""
+        self.translation_cache.put_many(source, target, translations)
+
+    def get_unfinalized_digests(self, before_day, limit=100):
+        """Return up to `limit` (day, author, channel, contents, updated_at) digests of days before `before_day` not yet summarized."""
+        self.refresh_digests()
+        rows = self.conn.execute("SELECT day, author, channel, content, updated_at FROM daily_digests "
+                                 "WHERE finalized = 0 AND day < ? ORDER BY day LIMIT ?", (before_day, limit)).fetchall()
+        return [(day, author, channel, json.loads(contents), updated_at) for day, author, channel, contents, updated_at in rows]
+
+    def finalize_old_digests(self, before_day):
+        """Mark the digests of days before `before_day` final without a summary, as the v7 migration did for history.
+
+        Keeps an import of old history from queueing every imported day for T5. Returns how many were marked.
+        """
+        self.refresh_digests()
+        with self.conn:
+            return self.conn.execute("UPDATE daily_digests SET finalized = 1 WHERE finalized = 0 AND day < ?", (before_day,)).rowcount
+
+    def finalize_digests(self, rows):
+        """Store summaries from (summary, day, author, channel, updated_at) rows and mark those digests final.
+
+        A digest rebuilt after it was read has a newer updated_at and is left for the next pass.
+        Returns how many digests were finalized.
+        """
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany("UPDATE daily_digests SET summary = ?, finalized = 1 "
+                                  "WHERE day = ? AND author = ? AND channel = ? AND updated_at = ? AND dirty = 0", rows)
+        return self.conn.total_changes - before
+
+    def get_digest_languages(self, since_day):
+        """Languages reports were translated into since `since_day`."""
+        with self.db.read() as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT language FROM digest_translations WHERE day >= ?", (since_day,))]
+
     def add_checklist_item(self, task_id, content, author):
         """Add a new checklist item linked to a task."""
         timestamp = str(datetime.now())
-        self.c.execute("INSERT INTO checklists (task_id, content, author, timestamp) VALUES (?, ?, ?, ?)",
-                       (task_id, content, author, timestamp))
-        self.conn.commit()
+        with self.conn:
+            self.conn.execute("INSERT INTO checklists (task_id, content, author, timestamp) VALUES (?, ?, ?, ?)",
+                              (task_id, content, author, timestamp))
 
     def get_checklists_by_task_id(self, task_id):
         """Get all checklist items for a specific task by its ID."""
-        self.c.execute("SELECT checklist_id, content, is_completed FROM checklists WHERE task_id = ?", (task_id,))
-        return self.c.fetchall()
+        with self.db.read() as conn:
+            return conn.execute("SELECT checklist_id, content, is_completed FROM checklists WHERE task_id = ?", (task_id,)).fetchall()
     
     def toggle_checklist_status(self, checklist_id, task_id):
         """Toggle the completion status of a checklist item."""
-        self.c.execute("SELECT is_completed FROM checklists WHERE checklist_id = ? AND task_id = ?", (checklist_id, task_id))
-        status = self.c.fetchone()
+        status = self.conn.execute("SELECT is_completed FROM checklists WHERE checklist_id = ? AND task_id = ?", (checklist_id, task_id)).fetchone()
         if status:
             new_status = not status[0]
-            self.c.execute("UPDATE checklists SET is_completed = ? WHERE checklist_id = ?", (new_status, checklist_id))
-            self.conn.commit()
+            with self.conn:
+                self.conn.execute("UPDATE checklists SET is_completed = ? WHERE checklist_id = ?", (new_status, checklist_id))
     
     def get_tasks_by_date(self,query_date):
         """Retrieve all tasks for all users on a specific date."""
-        self.c.execute("SELECT content, author, channel FROM tasks WHERE date(timestamp) = ?", (query_date,))
-        tasks = self.c.fetchall()
+        with self.db.read() as conn:
+            tasks = conn.execute("SELECT COALESCE(translated_content, content), author, channel FROM tasks WHERE day = ? AND duplicate_of IS NULL",
+                                 (query_date,)).fetchall()
 
         # Group tasks by author and channel
         grouped_tasks = {}
@@ -118,8 +686,9 @@ class TaskModel:
     
     def get_tasks_by_author(self, author):
         """Retrieve all tasks for a specific user, sorted by date."""
-        self.c.execute("SELECT content, channel, timestamp FROM tasks WHERE author = ? ORDER BY timestamp ASC", (author,))
-        tasks = self.c.fetchall()
+        with self.db.read() as conn:
+            tasks = conn.execute("SELECT COALESCE(translated_content, content), channel, timestamp FROM tasks WHERE author = ? AND duplicate_of IS NULL "
+                                 "ORDER BY timestamp ASC", (author,)).fetchall()
 
         grouped_tasks = {}
         for task in tasks:
@@ -135,8 +704,9 @@ class TaskModel:
     
     def get_tasks_by_author_and_date(self, author, query_date):
         """Retrieve all tasks for a specific user on a specific date, including the date information."""
-        self.c.execute("SELECT content, channel, date(timestamp) FROM tasks WHERE author = ? AND date(timestamp) = ?", (author, query_date))
-        tasks = self.c.fetchall()
+        with self.db.read() as conn:
+            tasks = conn.execute("SELECT COALESCE(translated_content, content), channel, day FROM tasks WHERE author = ? AND day = ? AND duplicate_of IS NULL",
+                                 (author, query_date)).fetchall()
 
         grouped_tasks = {}
         for task in tasks:
@@ -150,20 +720,21 @@ class TaskModel:
 
         return grouped_tasks
 
+    def get_todays_tasks_by_author(self, author):
+        """Retrieve all tasks for a specific user for the current day."""
+        return self.get_tasks_by_author_and_date(author, datetime.now().strftime('%Y-%m-%d'))
+
 
     def get_tasks_by_author_till_date(self, author, query_date):
         """Retrieve all tasks for a specific user up to a specified date."""
-        print(f"Fetching tasks for author: {author} till date: {query_date}")  # Debug: Print function inputs
-        
-        self.c.execute("SELECT content, channel, date(timestamp) FROM tasks WHERE author = ? AND date(timestamp) <= ? ORDER BY timestamp ASC", 
-                       (author, query_date))
-        tasks = self.c.fetchall()
-        print(f"Raw tasks fetched from database: {tasks}")  # Debug: Print raw fetched tasks
+        with self.db.read() as conn:
+            tasks = conn.execute("SELECT COALESCE(translated_content, content), channel, day FROM tasks WHERE author = ? AND day <= ? AND duplicate_of IS NULL "
+                                 "ORDER BY timestamp ASC", (author, query_date)).fetchall()
+        logger.debug("Fetched %d tasks for %s till %s", len(tasks), author, query_date)
 
         grouped_tasks = {}
         for task in tasks:
             content, channel, date = task
-            print(f"Processing task: Content='{content}', Channel='{channel}', Date='{date}'")  # Debug: Print each task detail
 
             # Format the date to DD/MM/YYYY format
             formatted_date = datetime.strptime(date, '%Y-%m-%d').strftime('%d/%m/%Y')
@@ -171,14 +742,14 @@ class TaskModel:
             if channel not in grouped_tasks:
                 grouped_tasks[channel] = []
             grouped_tasks[channel].append((content, formatted_date))  # Append a tuple instead of two separate arguments
-            
-        print(f"Grouped tasks by channel: {grouped_tasks}") 
+
         return grouped_tasks
     
     def get_tasks_till_date(self, query_date):
         """Retrieve all tasks for all users till a specific date."""
-        self.c.execute("SELECT content, author, channel FROM tasks WHERE date(timestamp) <= ?", (query_date,))
-        tasks = self.c.fetchall()
+        with self.db.read() as conn:
+            tasks = conn.execute("SELECT COALESCE(translated_content, content), author, channel FROM tasks WHERE day <= ? AND duplicate_of IS NULL",
+                                 (query_date,)).fetchall()
 
         # Group tasks by author and channel
         grouped_tasks = {}
@@ -192,5 +763,175 @@ class TaskModel:
 
         return grouped_tasks  # Return tasks grouped by author and channel
 
+    def iter_tasks_till_date(self, query_date, author=None, batch_size=500):
+        """Yield (author, channel, content, day) rows up to a date, ordered for grouping by author and channel.
+
+        Rows are read from a dedicated cursor `batch_size` at a time, so memory stays
+        constant however much history matches. Pass `author` to limit it to one user.
+        Archived months the date covers are merged in, in the same order.
+        The generator reads through a connection of its own, open until it is exhausted or closed.
+        """
+        with self.db.stream() as conn:
+            months = [row[0] for row in conn.execute("SELECT month FROM task_archives WHERE month <= ? ORDER BY month", (query_date[:7],))]
+            # Selected in sort order, so the rows merge with archived ones as plain tuples. The index is named so
+            # rows come out in index order whatever the statistics say; a sort would hold every matching row first
+            if author is None:
+                cursor = conn.execute("SELECT author, channel, timestamp, task_id, COALESCE(translated_content, content), day "
+                                      "FROM tasks INDEXED BY idx_tasks_stream_order "
+                                      "WHERE day <= ? AND duplicate_of IS NULL ORDER BY author, channel, timestamp, task_id", (query_date,))
+            else:
+                cursor = conn.execute("SELECT author, channel, timestamp, task_id, COALESCE(translated_content, content), day "
+                                      "FROM tasks INDEXED BY idx_tasks_stream_order "
+                                      "WHERE author = ? AND day <= ? AND duplicate_of IS NULL ORDER BY channel, timestamp, task_id", (author, query_date))
+
+            def hot_rows():
+                while rows := cursor.fetchmany(batch_size):
+                    yield from rows
+
+            try:
+                if not months:
+                    for author_name, channel, _, _, content, day in hot_rows():
+                        yield author_name, channel, content, day
+                    return
+                previous_id = None
+                for author_name, channel, _, task_id, content, day in heapq.merge(*self.archive.month_streams(months, query_date, author), hot_rows()):
+                    # A crash between writing an archive and deleting its rows leaves a task in both for a moment
+                    if task_id != previous_id:
+                        yield author_name, channel, content, day
+                    previous_id = task_id
+            finally:
+                cursor.close()
+
+    def _expired_condition(self, default_cutoff, channel_cutoffs):
+        terms, params = [], []
+        for channel, cutoff in channel_cutoffs.items():
+            if cutoff:
+                terms.append("(channel = ? AND day < ?)")
+                params += [channel, cutoff]
+        if default_cutoff:
+            terms.append(f"(channel NOT IN ({','.join('?' * len(channel_cutoffs))}) AND day < ?)")
+            params += list(channel_cutoffs) + [default_cutoff]
+        if not terms:
+            return None, []
+        # The outer bound lets SQLite range-scan the day index instead of the whole table
+        return f"day < ? AND ({' OR '.join(terms)})", [max(filter(None, [default_cutoff, *channel_cutoffs.values()]))] + params
+
+    def archive_expired_tasks(self, default_cutoff, channel_cutoffs=None):
+        """Move the oldest month of tasks past their channel's cutoff to the archive; returns (month, tasks moved) or None.
+
+        A cutoff is the first day kept ('YYYY-MM-DD'), or None to keep everything.
+        `channel_cutoffs` maps channels to their own; `default_cutoff` applies to
+        every other channel. The month's file is written and synced before its
+        rows are deleted, and the deletes commit with the task_archives row, so a
+        crash loses nothing. Call it until it returns None; each call holds the
+        writer for one month only.
+        """
+        condition, params = self._expired_condition(default_cutoff, channel_cutoffs or {})
+        if condition is None:
+            return None
+        oldest = self.conn.execute(f"SELECT MIN(day) FROM tasks WHERE {condition}", params).fetchone()[0]
+        if oldest is None:
+            return None
+        month = oldest[:7]
+        year, month_number = int(month[:4]), int(month[5:])
+        next_month = f"{year + month_number // 12:04d}-{month_number % 12 + 1:02d}"
+        condition = f"{condition} AND day >= ? AND day < ?"
+        params += [f"{month}-01", f"{next_month}-01"]
+        self.refresh_digests()  # Digests of the archived days keep serving day reports, so bring them up to date first
+
+        records = [{'task_id': row[0], 'content': row[1], 'translated_content': row[2], 'author': row[3], 'channel': row[4],
+                    'timestamp': row[5], 'day': row[6], 'language': row[7], 'status': row[8], 'duplicate_of': row[9],
+                    'message_id': row[10], 'checklists': []}
+                   for row in self.conn.execute("SELECT task_id, content, translated_content, author, channel, timestamp, day, language, "
+                                                f"status, duplicate_of, message_id FROM tasks WHERE {condition}", params)]
+        by_id = {record['task_id']: record for record in records}
+        task_ids = list(by_id)
+        for start in range(0, len(task_ids), 500):  # Stay below SQLite's bound-parameter limit
+            chunk = task_ids[start:start + 500]
+            for row in self.conn.execute(f"SELECT task_id, content, is_completed, timestamp, author FROM checklists "
+                                         f"WHERE task_id IN ({','.join('?' * len(chunk))}) ORDER BY checklist_id", chunk):
+                by_id[row[0]]['checklists'].append({'content': row[1], 'is_completed': bool(row[2]), 'timestamp': row[3], 'author': row[4]})
+        task_count, size = self.archive.add(month, records)
+
+        with self.conn:
+            for start in range(0, len(task_ids), 500):
+                chunk = task_ids[start:start + 500]
+                self.conn.execute(f"DELETE FROM tasks WHERE task_id IN ({','.join('?' * len(chunk))})", chunk)  # Checklists cascade
+            # Repeats kept longer in another channel stay linked: the archived original still stands for them in till-date reports
+            # The delete trigger marked these groups dirty; they were current, and have no hot tasks left to rebuild from
+            self.conn.execute(f"DELETE FROM daily_digests WHERE {condition} AND dirty > 0 AND task_count = 0", params)
+            self.conn.execute(f"UPDATE daily_digests SET dirty = 0 WHERE {condition}", params)
+            self.conn.execute("INSERT OR REPLACE INTO task_archives (month, task_count, bytes, updated_at) VALUES (?, ?, ?, ?)",
+                              (month, task_count, size, str(datetime.now())))
+        self._emit_changes('deleted', task_ids)
+        logger.info("Archived %d tasks from %s to %s", len(task_ids), month, self.archive.path(month))
+        return month, len(task_ids)
+
+    def vacuum_free_pages(self, max_pages=2000):
+        """Give up to `max_pages` free pages back to the filesystem; returns (pages freed, free pages left).
+
+        Frees nothing on a database created before incremental vacuum was turned
+        on, until convert_to_incremental_vacuum has been run.
+        """
+        free_before = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return 0, free_before
+        # execute() steps a statement without result columns once, which frees one page; executescript runs it to the end
+        self.conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)})")
+        freed = free_before - self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if freed:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()  # Otherwise the WAL keeps the space the file gave back
+        return freed, self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def convert_to_incremental_vacuum(self):
+        """Turn on incremental vacuum for a database created without it; returns bytes freed, or None if already on.
+
+        This is one full VACUUM: it rewrites the whole file and blocks every write
+        until it is done, so it only runs when an admin asks for it (!db_vacuum).
+        """
+        if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return None
+        pages_before = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.conn.execute("VACUUM")
+        freed = max(0, pages_before - self.conn.execute("PRAGMA page_count").fetchone()[0])  # Auto-vacuum adds pointer-map pages
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        logger.info("Converted %s to incremental vacuum, freeing %d pages", self.db.db_path, freed)
+        return freed * self.conn.execute("PRAGMA page_size").fetchone()[0]
+
+    def get_storage_sizes(self):
+        """Return a dict of what the database and its archive take up.
+
+        'tables' holds (name, rows, bytes) with indexes and full-text shadow tables
+        counted under their table, largest first; bytes are None where SQLite was
+        built without the dbstat table. Also 'file_bytes', 'free_bytes', 'wal_bytes',
+        'mmap_bytes', 'incremental_vacuum' and 'archives' as (month, tasks, bytes) rows.
+        """
+        with self.db.read() as conn:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            names = [row[0] for row in conn.execute("SELECT name FROM sqlite_schema WHERE type = 'table' AND name NOT LIKE 'sqlite_%' "
+                                                    "AND name NOT LIKE 'tasks_fts_%'")]
+            try:
+                # Shadow tables of tasks_fts are named tasks_fts_data, tasks_fts_idx, ...
+                sizes = dict(conn.execute("SELECT CASE WHEN s.tbl_name LIKE 'tasks_fts_%' THEN 'tasks_fts' ELSE s.tbl_name END, "
+                                          "SUM(d.pgsize) FROM dbstat d JOIN sqlite_schema s ON s.name = d.name GROUP BY 1").fetchall())
+            except sqlite3.OperationalError:
+                sizes = {}
+            tables = [(name, conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0], sizes.get(name)) for name in names]
+            archives = conn.execute("SELECT month, task_count, bytes FROM task_archives ORDER BY month").fetchall()
+            file_pages = conn.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        wal_path = f"{self.db.db_path}-wal"
+        return {'tables': sorted(tables, key=lambda table: table[2] or 0, reverse=True),
+                'file_bytes': file_pages * page_size, 'free_bytes': free_pages * page_size,
+                'wal_bytes': os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+                'mmap_bytes': int(self.db.pragmas.get('mmap_size', 0)), 'incremental_vacuum': auto_vacuum == 2,
+                'archives': archives}
 
+    def get_query_stats(self):
+        """Return (method, calls, total seconds, max seconds, total seconds queued) rows, most total time first."""
+        return self.db.query_stats()
 
+    def close(self):
+        self.db.close()
@@ -0,0 +1,89 @@
+# /model/translation_cache.py
+import hashlib
+import sqlite3
+import threading
+import time
+
+
+class TranslationCache:
+    """Persistent translation cache keyed by (source, target, text hash), stored next to the tasks.
+
+    The cache holds at most `max_entries` rows; the least recently used ones are
+    evicted first. It is shared by the report threads, so access is serialized.
+
+    A `read_only` cache never writes the database: lookups leave the LRU order
+    alone, and new translations go to `on_put(source, target, translations)`,
+    which hands them to the process that owns the database (see
+    TaskModel.save_translations). The owner passes its writer as `conn`, so the
+    database keeps a single write connection.
+    """
+
+    def __init__(self, db_path='discord_tasks.db', max_entries=50000, read_only=False, on_put=None, conn=None):
+        self.read_only = read_only
+        self.on_put = on_put
+        if conn is not None:
+            self.conn = conn  # Owned and closed by the caller
+            self.create_table()
+        elif read_only:
+            # The owner of the database has created the table already
+            self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.create_table()
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self._entries = self.conn.execute("SELECT COUNT(*) FROM translation_cache").fetchone()[0]
+
+    def create_table(self):
+        """Create the translation cache table and the index used for eviction."""
+        with self.conn:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS translation_cache
+                                 (source TEXT, target TEXT, text_hash TEXT, translation TEXT, last_used REAL,
+                                  PRIMARY KEY (source, target, text_hash))''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_translation_cache_last_used ON translation_cache (last_used)")
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, source, target, texts):
+        """Return {text: translation} for every text already cached, refreshing their LRU position."""
+        hashes = {self.text_hash(text): text for text in texts}
+        if not hashes:
+            return {}
+        found = {}
+        with self.lock, self.conn:
+            hash_list = list(hashes)
+            for start in range(0, len(hash_list), 500):  # Stay below SQLite's bound-parameter limit
+                chunk = hash_list[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT text_hash, translation FROM translation_cache WHERE source = ? AND target = ? "
+                    f"AND text_hash IN ({','.join('?' * len(chunk))})", (source, target, *chunk)).fetchall()
+                found.update((hashes[text_hash], translation) for text_hash, translation in rows)
+            if found and not self.read_only:
+                now = time.time()
+                self.conn.executemany("UPDATE translation_cache SET last_used = ? WHERE source = ? AND target = ? AND text_hash = ?",
+                                      [(now, source, target, self.text_hash(text)) for text in found])
+        return found
+
+    def put_many(self, source, target, translations):
+        """Store {text: translation} pairs (or pass them to on_put if read-only) and evict the oldest entries beyond max_entries."""
+        if not translations:
+            return
+        if self.read_only:
+            if self.on_put is not None:
+                self.on_put(source, target, translations)
+            return
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO translation_cache (source, target, text_hash, translation, last_used) VALUES (?, ?, ?, ?, ?)",
+                                  [(source, target, self.text_hash(text), translation, now) for text, translation in translations.items()])
+            self._entries += len(translations)
+            if self._entries > self.max_entries:
+                # INSERT OR REPLACE may have overwritten rows, so recount before evicting
+                self._entries = self.conn.execute("SELECT COUNT(*) FROM translation_cache").fetchone()[0]
+                overflow = self._entries - int(self.max_entries * 0.9)  # Evict with slack so the next puts don't recount
+                if self._entries > self.max_entries:
+                    self.conn.execute("DELETE FROM translation_cache WHERE rowid IN "
+                                      "(SELECT rowid FROM translation_cache ORDER BY last_used LIMIT ?)", (overflow,))
+                    self._entries -= overflow
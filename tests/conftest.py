@@ -0,0 +1,38 @@
+# /tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# Modules import each other from the repository root, as app.py runs them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.task_model import TaskModel  # noqa: E402
+
+
+@pytest.fixture
+def make_storage(tmp_path):
+    """Factory opening storage on files in tmp_path; everything it opened is closed after the test.
+
+    make_storage(**options) is a TaskModel on tasks.db with a read pool of one connection;
+    make_storage(EmbeddingStore, **options) is an embedding store on messages.db and tasks.f32.
+    """
+    opened = []
+
+    def make(factory=TaskModel, **options):
+        if factory is TaskModel:
+            defaults = {'db_path': str(tmp_path / 'tasks.db'), 'read_pool_size': 1, 'archive_dir': str(tmp_path / 'archive')}
+        else:
+            defaults = {'db_path': str(tmp_path / 'messages.db'), 'matrix_path': str(tmp_path / 'tasks.f32')}
+        storage = factory(**{**defaults, **options})
+        opened.append(storage)
+        return storage
+    yield make
+    for storage in reversed(opened):
+        storage.close()
+
+
+@pytest.fixture
+def task_model(make_storage):
+    """A TaskModel on a fresh database file, with a read pool of one connection."""
+    return make_storage()
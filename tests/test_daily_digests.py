@@ -0,0 +1,107 @@
+# /tests/test_daily_digests.py
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from viewmodel.daily_digest_job import DailyDigestJob
+
+TODAY = datetime.now().strftime('%Y-%m-%d')
+PAST_DAY = (datetime.now() - timedelta(days=3)).strftime('%Y-%m-%d')
+OLD_DAY = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+
+
+def digest_row(model, day):
+    return model.conn.execute("SELECT content, summary, finalized, dirty FROM daily_digests WHERE day = ?", (day,)).fetchone()
+
+
+def finalize_past_day(model):
+    model.store_tasks([("fix the login page", 'alice', 'back', f"{PAST_DAY} 10:00:00", 'en'),
+                       ("réparer la base", 'alice', 'back', f"{PAST_DAY} 11:00:00", 'fr')])
+    (day, author, channel, _, updated_at), = model.get_unfinalized_digests(TODAY)
+    assert model.finalize_digests([("Login and database fixes.", day, author, channel, updated_at)]) == 1
+
+
+def test_translation_keeps_summary_of_finalized_day(task_model):
+    finalize_past_day(task_model)
+    task_id = task_model.conn.execute("SELECT task_id FROM tasks WHERE language = 'fr'").fetchone()[0]
+    task_model.set_translated_contents([("repair the database", task_id)])
+
+    assert task_model.get_unfinalized_digests(TODAY) == []
+    content, summary, finalized, dirty = digest_row(task_model, PAST_DAY)
+    assert json.loads(content) == ["fix the login page", "repair the database"]
+    assert (summary, finalized, dirty) == ("Login and database fixes.", 1, 0)
+
+
+def test_content_change_summarizes_day_again(task_model):
+    finalize_past_day(task_model)
+    with task_model.conn:
+        task_model.conn.execute("UPDATE tasks SET content = 'fix the signup page' WHERE language = 'en'")
+
+    assert [row[:3] for row in task_model.get_unfinalized_digests(TODAY)] == [(PAST_DAY, 'alice', 'back')]
+    _, summary, finalized, _ = digest_row(task_model, PAST_DAY)
+    assert (summary, finalized) == (None, 0)
+
+
+def test_translation_of_content_changed_day_keeps_it_dirty(task_model):
+    finalize_past_day(task_model)
+    task_id = task_model.conn.execute("SELECT task_id FROM tasks WHERE language = 'fr'").fetchone()[0]
+    with task_model.conn:
+        task_model.conn.execute("UPDATE tasks SET content = 'réparer le cache' WHERE task_id = ?", (task_id,))
+    task_model.set_translated_contents([("repair the cache", task_id)])
+
+    assert digest_row(task_model, PAST_DAY)[3] == 1
+    assert len(task_model.get_unfinalized_digests(TODAY)) == 1
+
+
+class FakeViewModel:
+    def __init__(self):
+        self.summarized = []
+
+    async def summarize_channel_tasks(self, channel, contents):
+        self.summarized.append(contents)
+        return "summary"
+
+
+class AwaitableStorage:
+    """Awaitable facade over a TaskModel, as AsyncTaskModel is."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def __getattr__(self, name):
+        method = getattr(self.model, name)
+
+        async def call(*args):
+            return method(*args)
+        return call
+
+
+def test_finalize_summarizes_only_recent_days(task_model):
+    task_model.store_tasks([("old history", 'bob', 'back', f"{OLD_DAY} 09:00:00", 'en'),
+                            ("recent work", 'bob', 'back', f"{PAST_DAY} 09:00:00", 'en')])
+    viewmodel = FakeViewModel()
+    job = DailyDigestJob(AwaitableStorage(task_model), viewmodel, summary_days=7)
+
+    assert asyncio.run(job.finalize(TODAY)) == [PAST_DAY]
+    assert viewmodel.summarized == [["recent work"]]
+    assert digest_row(task_model, OLD_DAY)[1:3] == (None, 1)
+
+
+class FakePool:
+    def __init__(self):
+        self.calls = []
+
+    async def run(self, method_name, *args):
+        self.calls.append((method_name, args))
+        return [f"summary of {channel}" for channel, _ in args[0]]
+
+
+def test_finalize_summarizes_in_the_nlp_pool(task_model):
+    task_model.store_tasks([("recent work", 'bob', 'back', f"{PAST_DAY} 09:00:00", 'en')])
+    viewmodel, pool = FakeViewModel(), FakePool()
+    job = DailyDigestJob(AwaitableStorage(task_model), viewmodel, nlp_pool=pool)
+
+    assert asyncio.run(job.finalize(TODAY)) == [PAST_DAY]
+    assert pool.calls == [('summarize_channels', ([('back', ["recent work"])],))]
+    assert viewmodel.summarized == []
+    assert digest_row(task_model, PAST_DAY)[1:3] == ("summary of back", 1)
@@ -0,0 +1,124 @@
+# /tests/test_embedding_store.py
+import asyncio
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from model.embedding_store import EmbeddingStore  # noqa: E402
+from model.task_model import TaskChange  # noqa: E402
+from viewmodel.embedding_stage import EmbeddingStage  # noqa: E402
+
+DIM = 8
+
+
+def vector(task_id):
+    # Task n points mostly along axis n % DIM, so a query along an axis ranks its tasks first
+    values = np.full(DIM, 0.01, dtype=np.float32)
+    values[task_id % DIM] = 1.0 + task_id / 100
+    return values
+
+
+def task_rows(task_ids):
+    return [(task_id, f"task {task_id}", 'alice', 'back', '2024-06-12 10:00:00', 'en') for task_id in task_ids]
+
+
+def axis(index):
+    query = np.zeros(DIM, dtype=np.float32)
+    query[index] = 1.0
+    return query
+
+
+def test_search_ranks_closest_vectors_first(make_storage):
+    store = make_storage(EmbeddingStore, dim=DIM)
+    ids = list(range(1, 33))
+    store.add(task_rows(ids), [vector(task_id) for task_id in ids])
+    assert [task_id for task_id, _ in store.search(axis(3), k=4)] == [27, 19, 11, 3]  # Longer along the axis, closer to it
+    assert store.max_task_id() == 32
+
+
+def test_removed_tasks_leave_search_results(make_storage):
+    store = make_storage(EmbeddingStore, dim=DIM, compact_share=0.5)
+    ids = list(range(1, 33))
+    store.add(task_rows(ids), [vector(task_id) for task_id in ids])
+    assert store.remove([11, 19, 99]) == 2
+    hits = store.search(axis(3), k=4)
+    assert [task_id for task_id, _ in hits[:2]] == [27, 3]
+    assert store.conn.execute("SELECT COUNT(*) FROM messages WHERE task_id IN (11, 19) AND removed = 0").fetchone()[0] == 0
+
+
+def test_search_never_returns_only_removed_rows(make_storage):
+    store = make_storage(EmbeddingStore, dim=DIM, compact_share=1.0)
+    store.add(task_rows([1, 2]), [vector(1), vector(2)])
+    store.remove([1, 2])
+    assert store.search(axis(1), k=5) == []
+
+
+def test_compaction_and_reload_drop_removed_rows(make_storage, tmp_path):
+    store = make_storage(EmbeddingStore, dim=DIM, compact_share=0.25)
+    ids = list(range(1, 17))
+    store.add(task_rows(ids), [vector(task_id) for task_id in ids])
+    store.remove([1, 2, 3])  # Below the share: masked only
+    assert len(store.ids) == 16 and store.removed.sum() == 3
+    store.remove([4, 5])  # Past it: the file is rewritten without them
+    assert sorted(store.ids) == list(range(6, 17)) and not store.removed.any()
+    assert store.conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 11  # Compaction deleted the rows
+    store.remove([6])
+
+    reopened = make_storage(EmbeddingStore, dim=DIM)
+    assert sorted(reopened.ids[~reopened.removed]) == list(range(7, 17))
+    assert {task_id for task_id, _ in reopened.search(axis(7), k=3)} <= set(range(7, 17))
+
+
+def test_read_only_store_follows_the_writer(make_storage):
+    writer = make_storage(EmbeddingStore, dim=DIM, compact_share=0.25)
+    reader = make_storage(EmbeddingStore, dim=DIM, read_only=True)
+    assert reader.search(axis(3)) == []  # No file yet
+    ids = list(range(1, 17))
+    writer.add(task_rows(ids), [vector(task_id) for task_id in ids])
+    assert [task_id for task_id, _ in reader.search(axis(3), k=2)] == [11, 3]
+
+    writer.remove([11])  # Masked in the writer only; the reader still finds it until the file is rewritten
+    assert [task_id for task_id, _ in reader.search(axis(3), k=2)] == [11, 3]
+    writer.remove([1, 2, 4, 5])  # Past the share: the file is replaced, and the reader maps the new one
+    assert reader.search(axis(3), k=2)[0][0] == 3
+    assert sorted(reader.ids) == sorted(writer.ids) and 11 not in reader.ids
+    with pytest.raises(RuntimeError):
+        reader.add(task_rows([20]), [vector(20)])
+
+
+def test_read_only_store_leaves_the_schema_to_the_writer(make_storage):
+    reader = make_storage(EmbeddingStore, dim=DIM, read_only=True)  # Opened before the writer has created anything
+    assert reader.search(axis(3)) == []
+    assert reader.conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+    writer = make_storage(EmbeddingStore, dim=DIM)
+    writer.add(task_rows([3]), [vector(3)])
+    assert [task_id for task_id, _ in reader.search(axis(3), k=1)] == [3]
+
+
+def test_read_only_store_lines_up_a_file_replaced_before_its_rows_are_deleted(make_storage):
+    writer = make_storage(EmbeddingStore, dim=DIM, compact_share=1.0)
+    ids = list(range(1, 9))
+    writer.add(task_rows(ids), [vector(task_id) for task_id in ids])
+    writer.remove([2, 3])
+    # The state between the writer's os.replace and its DELETE: the file holds live rows only
+    with open(writer.matrix_path, 'wb') as matrix_file:
+        matrix_file.write(writer.normalize([vector(task_id) for task_id in ids if task_id not in (2, 3)]).tobytes())
+    reader = make_storage(EmbeddingStore, dim=DIM, read_only=True)
+    assert list(reader.ids) == [1, 4, 5, 6, 7, 8]
+    assert reader.search(axis(4), k=1)[0][0] == 4
+
+
+def test_stage_removes_deleted_and_archived_tasks(make_storage):
+    store = make_storage(EmbeddingStore, dim=DIM, compact_share=1.0)
+    store.add(task_rows([1, 2, 3]), [vector(1), vector(2), vector(3)])
+    stage = EmbeddingStage(storage=None, embedding_store=store, viewmodel=None)
+
+    async def run():
+        stage.loop = asyncio.get_running_loop()
+        stage.on_changes([TaskChange('deleted', 2), TaskChange('updated', 3), TaskChange('inserted', 4)])
+        await asyncio.sleep(0)
+        return await stage.remove_deleted()
+
+    assert asyncio.run(run()) == 1
+    assert {task_id for task_id, _ in store.search(axis(2), k=3)} == {1, 3}
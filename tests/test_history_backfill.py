@@ -0,0 +1,134 @@
+# /tests/test_history_backfill.py
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from model.async_task_model import AsyncTaskModel
+from viewmodel.history_backfill import HistoryBackfill
+
+START = datetime(2024, 6, 3, 9, 0, tzinfo=timezone.utc)
+WORDS = "deploy review migrate refactor document test profile benchmark release patch".split()
+
+
+class FakeViewModel:
+    def preprocess_and_identify(self, texts):
+        return [(text.strip(), 'en') for text in texts]
+
+
+class FakeChannel:
+    """Serves channel.history() from a list of messages, like discord.py, optionally failing partway through."""
+
+    def __init__(self, messages, fail_after=None):
+        self.id, self.name, self.guild = 42, 'back', SimpleNamespace(id=7)
+        self.messages = messages
+        self.fail_after = fail_after  # Raise after yielding this many messages, like a dropped connection
+
+    async def history(self, limit=None, after=None, before=None, oldest_first=True):
+        for served, message in enumerate(message for message in self.messages if after is None or message.id > after.id):
+            if served == self.fail_after:
+                raise ConnectionResetError("connection lost")
+            yield message
+
+
+class Author:
+    def __init__(self, name, bot=False):
+        self.name, self.bot = name, bot
+
+    def __str__(self):
+        return self.name
+
+
+def message(number, author='alice#1000', content=None, bot=False):
+    return SimpleNamespace(id=1000 + number, content=content or f"{WORDS[number % 10]} task number {number}",
+                           author=Author(author, bot), created_at=START + timedelta(minutes=number))
+
+
+@pytest.fixture
+def storage(task_model):
+    storage = AsyncTaskModel(task_model)
+    yield storage
+    storage.close()
+
+
+def stored_ids(model):
+    return [row[0] for row in model.conn.execute("SELECT message_id FROM tasks ORDER BY message_id")]
+
+
+def format_local(value):
+    return value.astimezone().replace(tzinfo=None).isoformat(sep=' ', timespec='microseconds')
+
+
+def test_channel_import_skips_bots_and_commands(task_model, storage):
+    messages = [message(0), message(1, content="!report today"), message(2, bot=True), message(3, content="<@99> today"), message(4)]
+    backfill = HistoryBackfill(storage, FakeViewModel(), batch_size=2)
+    assert asyncio.run(backfill.import_channels([FakeChannel(messages)], bot_user_id=99)) == {'back': 2}
+    assert stored_ids(task_model) == [1000, 1004]
+    assert task_model.conn.execute("SELECT author, channel, timestamp FROM tasks WHERE message_id = 1000").fetchone() == \
+        ('alice#1000', 'back', format_local(START))
+
+
+def test_interrupted_channel_import_resumes_after_last_batch(task_model, storage):
+    messages = [message(number) for number in range(25)]
+    backfill = HistoryBackfill(storage, FakeViewModel(), batch_size=10)
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(backfill.import_channel(FakeChannel(messages, fail_after=15)))
+    assert stored_ids(task_model) == [1000 + number for number in range(10)]  # Only the committed batch
+
+    resumed = FakeChannel(messages)
+    assert asyncio.run(backfill.import_channel(resumed)) == 15
+    assert stored_ids(task_model) == [1000 + number for number in range(25)]
+    assert task_model.get_import_checkpoint("discord:7:42") == ('1024', 25)
+    assert asyncio.run(backfill.import_channel(resumed)) == 0
+
+
+def write_export(path, messages):
+    with open(path, 'w', encoding='utf-8') as export:
+        for item in messages:
+            export.write(json.dumps({'id': str(item.id), 'channel': 'back', 'author': str(item.author), 'bot': item.author.bot,
+                                     'timestamp': item.created_at.isoformat(), 'content': item.content}) + "\n")
+        export.write("\n")
+
+
+def test_jsonl_import_and_reimport(task_model, storage, tmp_path):
+    path = tmp_path / 'export.jsonl'
+    write_export(path, [message(number) for number in range(12)] + [message(12, bot=True), message(13, content="!digest")])
+    backfill = HistoryBackfill(storage, FakeViewModel(), batch_size=5)
+    assert asyncio.run(backfill.import_jsonl(str(path))) == 12
+    assert asyncio.run(backfill.import_jsonl(str(path))) == 0  # Resumes at the end of the file
+
+    # A fresh checkpoint (a copy of the file) still stores each message once
+    copy = tmp_path / 'copy.jsonl'
+    copy.write_bytes(path.read_bytes())
+    assert asyncio.run(backfill.import_jsonl(str(copy))) == 0
+    assert stored_ids(task_model) == [1000 + number for number in range(12)]
+
+
+def test_interrupted_jsonl_import_resumes(task_model, storage, tmp_path):
+    path = tmp_path / 'export.jsonl'
+    write_export(path, [message(number) for number in range(12)])
+    batches = []
+
+    def interrupt():
+        batches.append(1)
+        if len(batches) == 2:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        asyncio.run(HistoryBackfill(storage, FakeViewModel(), batch_size=5, on_batch=interrupt).import_jsonl(str(path)))
+    assert len(stored_ids(task_model)) == 10
+
+    assert asyncio.run(HistoryBackfill(storage, FakeViewModel(), batch_size=5).import_jsonl(str(path))) == 2
+    assert stored_ids(task_model) == [1000 + number for number in range(12)]
+
+
+def test_history_already_stored_live_is_skipped(task_model, storage, tmp_path):
+    messages = [message(number) for number in range(6)]
+    backfill = HistoryBackfill(storage, FakeViewModel(), batch_size=4)
+    asyncio.run(backfill.import_channel(FakeChannel(messages)))
+    path = tmp_path / 'export.jsonl'
+    write_export(path, messages + [message(6)])
+    assert asyncio.run(backfill.import_jsonl(str(path))) == 1
+    assert stored_ids(task_model) == [1000 + number for number in range(7)]
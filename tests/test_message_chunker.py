@@ -0,0 +1,54 @@
+# /tests/test_message_chunker.py
+from utils.message_chunker import DISCORD_MESSAGE_LIMIT, MessageChunker
+
+
+def chunk(text, max_length=DISCORD_MESSAGE_LIMIT):
+    chunker = MessageChunker(max_length)
+    messages = chunker.add_text(text)
+    last = chunker.flush()
+    return messages + ([last] if last else [])
+
+
+def test_short_text_is_one_message():
+    assert chunk("User: alice\n• fix login") == ["User: alice\n• fix login"]
+
+
+def test_lines_fill_messages_up_to_the_limit_without_breaking():
+    lines = [f"• task number {i:03d} " + "x" * 81 for i in range(100)]  # 100 lines of 99 characters
+    messages = chunk("\n".join(lines))
+    assert all(len(message) <= DISCORD_MESSAGE_LIMIT for message in messages)
+    assert [line for message in messages for line in message.split("\n")] == lines
+    assert len(messages[0]) == 20 * 99 + 19  # 20 lines and their newlines fit exactly; the 21st does not
+
+
+def test_a_line_exactly_at_the_limit_is_kept_whole():
+    line = "y" * DISCORD_MESSAGE_LIMIT
+    assert chunk(f"a\n{line}\nb") == ["a", line, "b"]
+
+
+def test_long_line_is_split_at_words():
+    line = " ".join(f"word{i}" for i in range(30))
+    messages = chunk(line, max_length=40)
+    assert all(len(message) <= 40 for message in messages)
+    assert " ".join(messages) == line
+
+
+def test_only_words_longer_than_the_limit_are_cut():
+    messages = chunk("short " + "z" * 25 + " end", max_length=10)
+    assert messages == ["short", "z" * 10, "z" * 10, "zzzzz end"]
+
+
+def test_add_returns_messages_as_soon_as_they_fill():
+    chunker = MessageChunker(max_length=10)
+    assert chunker.add("12345") == []
+    assert chunker.add("1234") == []  # 5 + newline + 4 = 10 still fits
+    assert chunker.add("x") == ["12345\n1234"]
+    assert chunker.flush() == "x"
+
+
+def test_whitespace_only_messages_are_never_produced():
+    chunker = MessageChunker()
+    chunker.add("")
+    chunker.add("   ")
+    assert chunker.flush() is None
+    assert chunk("\n\n") == []
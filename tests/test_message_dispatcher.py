@@ -0,0 +1,104 @@
+# /tests/test_message_dispatcher.py
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from view.message_dispatcher import MessageDispatcher
+
+
+class FakeMessage:
+    def __init__(self, channel, content=None, age=timedelta(0)):
+        self.channel, self.content = channel, content
+        self.created_at = datetime.now(timezone.utc) - age
+
+    async def delete(self):
+        self.channel.deleted.append(self)
+
+
+class FakeChannel:
+    """Records what the dispatcher sends and deletes, in call order."""
+
+    def __init__(self, channel_id=1, fail_with=None):
+        self.id = channel_id
+        self.fail_with = fail_with
+        self.sent, self.deleted, self.bulk_calls = [], [], []
+        self.call_times = []
+
+    async def send(self, content=None, **kwargs):
+        self.call_times.append(time.monotonic())
+        if self.fail_with is not None:
+            raise self.fail_with
+        await asyncio.sleep(0)
+        message = FakeMessage(self, content)
+        self.sent.append((content, kwargs))
+        return message
+
+    async def delete_messages(self, messages):
+        self.bulk_calls.append(list(messages))
+        self.deleted.extend(messages)
+
+
+def test_adjacent_texts_are_merged_in_order():
+    async def run():
+        dispatcher, channel = MessageDispatcher(capacity=1, rate=1000.0), FakeChannel()
+        results = await asyncio.gather(*(dispatcher.send_text(channel, f"line {number}") for number in range(5)))
+        return channel, results
+
+    channel, results = asyncio.run(run())
+    assert [content for content, _ in channel.sent] == ["line 0\nline 1\nline 2\nline 3\nline 4"]
+    assert all(result is results[0] for result in results)
+
+
+def test_merged_messages_stay_within_the_limit():
+    async def run():
+        dispatcher, channel = MessageDispatcher(capacity=1, rate=1000.0, max_length=25), FakeChannel()
+        await dispatcher.send_chunks(channel, ["x" * 10 for _ in range(6)])
+        return channel
+
+    sent = [content for content, _ in asyncio.run(run()).sent]
+    assert "\n".join(sent) == "\n".join("x" * 10 for _ in range(6))
+    assert all(len(content) <= 25 for content in sent)
+
+
+def test_embeds_are_never_merged():
+    async def run():
+        dispatcher, channel = MessageDispatcher(capacity=1, rate=1000.0), FakeChannel()
+        await asyncio.gather(dispatcher.send_text(channel, "a"), dispatcher.send(channel, embed='E'), dispatcher.send_text(channel, "b"))
+        return channel
+
+    assert asyncio.run(run()).sent == [("a", {}), (None, {'embed': 'E'}), ("b", {})]
+
+
+def test_calls_are_paced_per_channel():
+    async def run():
+        dispatcher = MessageDispatcher(capacity=2, rate=50.0)
+        busy, quiet = FakeChannel(1), FakeChannel(2)
+        await asyncio.gather(*(dispatcher.send(busy, f"{number}") for number in range(6)), dispatcher.send(quiet, "hi"))
+        return busy, quiet
+
+    busy, quiet = asyncio.run(run())
+    assert busy.call_times[-1] - busy.call_times[0] >= 4 / 50 * 0.9  # Burst of two, then 50 calls a second
+    assert quiet.call_times[0] - busy.call_times[0] < 0.02  # Another channel does not wait behind it
+
+
+def test_deletes_use_bulk_delete_for_recent_messages():
+    async def run():
+        dispatcher, channel = MessageDispatcher(capacity=5, rate=1000.0), FakeChannel()
+        recent = [FakeMessage(channel) for _ in range(3)]
+        old = [FakeMessage(channel, age=timedelta(days=20))]
+        await dispatcher.delete_messages(channel, recent + old)
+        return dispatcher, channel, recent, old
+
+    dispatcher, channel, recent, old = asyncio.run(run())
+    assert channel.bulk_calls == [recent]
+    assert channel.deleted == recent + old
+    assert dispatcher.counters['deleted'] == 4
+
+
+def test_send_errors_reach_every_merged_caller():
+    async def run():
+        dispatcher, channel = MessageDispatcher(capacity=1, rate=1000.0), FakeChannel(fail_with=RuntimeError("forbidden"))
+        return await asyncio.gather(*(dispatcher.send_text(channel, f"{number}") for number in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
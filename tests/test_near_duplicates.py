@@ -0,0 +1,74 @@
+# /tests/test_near_duplicates.py
+import pytest
+
+from utils.minhash import BAND_COUNT, band_keys, jaccard, shingles
+
+LINE = "fix the login redirect on the staging api before the release review"
+REPEAT = LINE + " again"  # Every shingle of LINE plus one word and one pair
+SIMILARITY = jaccard(shingles(LINE), shingles(REPEAT))
+AUTHOR = 'alice#1000'
+TIME = '2024-06-12 10:00:00.000001'
+
+
+def stored(model):
+    return model.conn.execute("SELECT task_id, content, duplicate_of FROM tasks ORDER BY task_id").fetchall()
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert shingles("Fix the API!") == shingles("fix, the api") == {'fix', 'the', 'api', 'fix the', 'the api'}
+    assert band_keys(shingles("Fix the API!")) == band_keys(shingles("fix, the api"))
+
+
+@pytest.mark.parametrize('threshold, linked', [(SIMILARITY, True), (SIMILARITY + 1e-9, False)])
+def test_similarity_threshold_is_inclusive(make_storage, threshold, linked):
+    model = make_storage(read_pool_size=0, dedup_mode='link', dedup_similarity=threshold)
+    model.store_tasks([(LINE, AUTHOR, 'back', TIME, 'en'), (REPEAT, AUTHOR, 'front', '2024-06-12 11:00:00.000001', 'en')])
+    assert [row[2] for row in stored(model)] == [None, 1 if linked else None]
+
+
+def test_repeat_is_linked_and_left_out_of_reports(make_storage):
+    model = make_storage(read_pool_size=0, dedup_mode='link')
+    model.store_tasks([(LINE, AUTHOR, 'back', TIME, 'en'), (REPEAT.upper() + "!", AUTHOR, 'front', '2024-06-12 11:00:00.000001', 'en')])
+    assert [row[2] for row in stored(model)] == [None, 1]
+    assert model.get_tasks_by_date('2024-06-12') == {AUTHOR: {'back': [LINE]}}
+
+
+def test_suppress_mode_does_not_store_repeat(make_storage):
+    model = make_storage(read_pool_size=0, dedup_mode='suppress')
+    model.store_tasks([(LINE, AUTHOR, 'back', TIME, 'en'), (REPEAT, AUTHOR, 'front', '2024-06-12 11:00:00.000001', 'en')])
+    assert [row[1] for row in stored(model)] == [LINE]
+
+
+def test_off_mode_stores_everything(make_storage):
+    model = make_storage(read_pool_size=0, dedup_mode='off')
+    model.store_tasks([(LINE, AUTHOR, 'back', TIME, 'en'), (LINE, AUTHOR, 'back', TIME, 'en')])
+    assert [row[2] for row in stored(model)] == [None, None]
+
+
+@pytest.mark.parametrize('author, timestamp, expected', [
+    (AUTHOR, '2024-06-13 09:59:59.000001', 1),      # Inside the 24 hour window
+    (AUTHOR, '2024-06-13 10:00:01.000001', None),   # Just past it
+    ('bob#1001', '2024-06-12 11:00:00.000001', None),  # Another author's line is never a repeat
+    (AUTHOR, '2024-06-12 09:00:00.000001', None),   # An older line does not repeat a newer one
+])
+def test_author_and_time_window(make_storage, author, timestamp, expected):
+    model = make_storage(read_pool_size=0, dedup_mode='link', dedup_window_hours=24)
+    model.store_tasks([(LINE, AUTHOR, 'back', TIME, 'en')])
+    assert model.find_near_duplicate(REPEAT, author, timestamp) == expected
+
+
+def test_different_lines_are_not_linked(make_storage):
+    model = make_storage(read_pool_size=0, dedup_mode='link')
+    model.store_tasks([(LINE, AUTHOR, 'back', TIME, 'en'),
+                       ("write tests for the invoice dashboard export", AUTHOR, 'back', '2024-06-12 11:00:00.000001', 'en')])
+    assert [row[2] for row in stored(model)] == [None, None]
+
+
+def test_texts_without_words_are_never_repeats(make_storage):
+    assert jaccard(shingles("!!!"), shingles("???")) == 0.0
+    assert band_keys(shingles("...")) == [None] * BAND_COUNT
+    model = make_storage(read_pool_size=0, dedup_mode='suppress')
+    model.store_tasks([("!!!", AUTHOR, 'back', TIME, 'en'), ("???", AUTHOR, 'back', '2024-06-12 10:01:00.000001', 'en'),
+                       ("", AUTHOR, 'back', '2024-06-12 10:02:00.000001', 'en')])
+    assert [row[1:] for row in stored(model)] == [("!!!", None), ("???", None), ("", None)]
+    assert model.find_near_duplicate("?!", AUTHOR, '2024-06-12 10:03:00.000001') is None
@@ -0,0 +1,104 @@
+# /tests/test_pivot_translation.py
+import asyncio
+
+import pytest
+
+pytest.importorskip('deep_translator')
+
+from model.async_task_model import AsyncTaskModel  # noqa: E402
+from viewmodel.pivot_translation_stage import PivotTranslationStage  # noqa: E402
+from viewmodel.task_viewmodel import TaskViewModel  # noqa: E402
+
+
+class FakeTranslator:
+    """Upper-cases text; rejects 'arz' when created, as deep_translator does, and fails every 'de' request."""
+
+    def __init__(self, source='auto', target='en'):
+        if source == 'arz':
+            raise ValueError("arz is not supported")
+        self.source = source
+
+    def translate(self, text):
+        if self.source == 'de':
+            raise RuntimeError("request rejected")
+        return text.upper()
+
+
+def store(task_model, rows):
+    task_model.store_tasks([(content, "alice#1", "back", f"2024-08-01 10:00:0{i}.000001", language)
+                            for i, (content, language) in enumerate(rows)])
+
+
+def translations(task_model):
+    return dict(task_model.conn.execute("SELECT content, translated_content FROM tasks").fetchall())
+
+
+def run_stage(task_model, call):
+    model = AsyncTaskModel(task_model)
+    stage = PivotTranslationStage(model, TaskViewModel(translator_factory=FakeTranslator), retry_delay=0)
+    try:
+        return asyncio.run(call(stage))
+    finally:
+        model._read_executor.shutdown(wait=True)
+        model._executor.shutdown(wait=True)
+
+
+def test_failing_language_does_not_block_the_others(task_model):
+    store(task_model, [("bonjour", 'fr'), ("hallo welt", 'de'), ("salut", 'fr'), ("marhaba", 'arz')])
+    run_stage(task_model, lambda stage: stage.backfill())
+    assert translations(task_model) == {"bonjour": "BONJOUR", "salut": "SALUT", "marhaba": "marhaba", "hallo welt": None}
+
+
+def test_rows_failing_alone_are_stored_untranslated_after_max_attempts(task_model):
+    store(task_model, [("bonjour", 'fr'), ("hallo welt", 'de')])
+
+    async def attempts(stage):
+        for _ in range(stage.max_attempts):
+            await stage.backfill()
+
+    run_stage(task_model, attempts)
+    assert translations(task_model) == {"bonjour": "BONJOUR", "hallo welt": "hallo welt"}
+
+
+def test_translator_outage_leaves_rows_pending(task_model):
+    store(task_model, [("hallo welt", 'de')])
+
+    async def attempts(stage):
+        for _ in range(5):
+            with pytest.raises(RuntimeError):
+                await stage.backfill()
+
+    run_stage(task_model, attempts)
+    assert translations(task_model) == {"hallo welt": None}
+
+
+def test_live_stage_leaves_history_to_the_explicit_backfill(task_model):
+    store(task_model, [("ancien", 'fr'), ("historique", 'fr')])  # Stored before the stage existed
+    watermark = task_model.get_translation_watermark()
+    store(task_model, [("nouveau", 'fr')])
+
+    run_stage(task_model, lambda stage: stage.backfill(watermark))
+    assert translations(task_model) == {"ancien": None, "historique": None, "nouveau": "NOUVEAU"}
+    assert task_model.get_translation_watermark() == 3  # A restart resumes after the last translated task
+
+    run_stage(task_model, lambda stage: stage.backfill())
+    assert translations(task_model) == {"ancien": "ANCIEN", "historique": "HISTORIQUE", "nouveau": "NOUVEAU"}
+
+
+def test_first_live_task_is_translated_when_nothing_was_translated_before(task_model):
+    store(task_model, [("ancien", 'fr')])
+
+    async def live(stage):
+        stage.start()
+        while stage._watermark is None:
+            await asyncio.sleep(0.01)
+        store(task_model, [("nouveau", 'fr')])
+        stage.notify()  # As the ingest queue does once the batch is committed
+        for _ in range(200):
+            if translations(task_model)["nouveau"]:
+                break
+            await asyncio.sleep(0.01)
+        await stage.close()
+
+    run_stage(task_model, live)
+    assert translations(task_model) == {"ancien": None, "nouveau": "NOUVEAU"}
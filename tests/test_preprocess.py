@@ -0,0 +1,47 @@
+# /tests/test_preprocess.py
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.preprocess import build_corpus, legacy_process
+from utils.preprocess import MessagePreprocessor
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('11/08/2024', '2024-08-11'),
+    ('29/02/2024', '2024-02-29'),
+    ('29/02/2023', None),
+    ('11-08-2024', None),
+    ('1/8/2024', None),
+    ('11/08/20245', None),
+])
+def test_parse_date(text, expected):
+    assert MessagePreprocessor.parse_date(text) == expected
+
+
+@pytest.mark.parametrize('message, expected', [
+    ("<@123> fix the login bug today", ("fix the login bug today", 'today', False)),
+    ("<@!987>  report   till 11/08/2024", ("report till 11/08/2024", '2024-08-11', True)),
+    ("<@&555> yesterday's tasks", ("yesterdays tasks", 'yesterday', False)),
+    ("tasks for 11082024", ("tasks for 11082024", '2024-08-11', False)),
+    ("tasks for 31/02/2024", ("tasks for 31/02/2024", None, False)),
+    ("tasks for 11-08-2024", ("tasks for 11-08-2024", None, False)),
+    ("hierarchy still ok 🚀", ("hierarchy still ok", 'yesterday', True)),
+    ("", ("", None, False)),
+])
+def test_process(message, expected):
+    relative = {'today': 0, 'yesterday': -1}
+    now = datetime(2024, 8, 11, 12, 0)
+    content, day, is_till = expected
+    if day in relative:
+        day = (now + timedelta(days=relative[day])).strftime('%Y-%m-%d')
+    assert MessagePreprocessor().process(message, now)[:3] == (content, day, is_till)
+
+
+def test_process_matches_original_implementation():
+    corpus = build_corpus(20000, random.Random(11))
+    engine = MessagePreprocessor()
+    mismatches = [(message, legacy_process(message), engine.process(message)[:3]) for message in corpus
+                  if legacy_process(message) != engine.process(message)[:3]]
+    assert mismatches == []
@@ -0,0 +1,22 @@
+# /tests/test_read_pool.py
+import asyncio
+
+from model.async_task_model import AsyncTaskModel
+
+
+def test_paused_stream_does_not_starve_other_reads(task_model):
+    task_model.store_tasks([(f"task {i}", "alice#1", "back", f"2024-08-{1 + i % 28:02d} 10:00:00.000001", 'en') for i in range(50)])
+    model = AsyncTaskModel(task_model)
+
+    async def run():
+        rows = model.stream('iter_tasks_till_date', '2024-08-31', batch_size=10)
+        first = await rows.__anext__()  # The stream is now paused between batches
+        page, _, _ = await asyncio.wait_for(model.get_tasks_page(limit=5), timeout=5)
+        rest = [row async for row in rows]
+        return first, page, rest
+
+    first, page, rest = asyncio.run(run())
+    assert first[0] == "alice#1"
+    assert len(page) == 5
+    assert len(rest) == 49
+    model.close()
@@ -0,0 +1,74 @@
+# /tests/test_report_query_plans.py
+import random
+import re
+
+import pytest
+
+from model.task_model import TaskModel
+
+QUERY_DAY = '2024-03-12'
+QUERY_AUTHOR = 'user1'
+
+# (report method, arguments, pattern the plan of its tasks query must match)
+REPORT_QUERIES = [
+    ('get_tasks_by_date', (QUERY_DAY,), r"SEARCH tasks USING INDEX idx_tasks_day_author_channel \(day=\?\)"),
+    ('get_tasks_by_author', (QUERY_AUTHOR,), r"SEARCH tasks USING INDEX idx_tasks_author_\w+ \(author=\?"),
+    ('get_tasks_by_author_and_date', (QUERY_AUTHOR, QUERY_DAY), r"SEARCH tasks USING INDEX idx_tasks_\w+ \((day=\? AND author=\?|author=\? AND day=\?)\)"),
+    ('get_tasks_by_author_till_date', (QUERY_AUTHOR, QUERY_DAY), r"SEARCH tasks USING INDEX idx_tasks_author_day \(author=\? AND day<\?\)"),
+    ('get_tasks_till_date', (QUERY_DAY,), r"SEARCH tasks USING INDEX idx_tasks_\w+ \((ANY\(author\) AND )?day<\?\)"),
+    ('get_daily_digest', (QUERY_DAY,), r"SEARCH tasks USING INDEX idx_tasks_day_author_channel \(day=\? AND author=\? AND channel=\?\)"),
+    ('get_tasks_page', (5000,), r"SEARCH tasks USING INDEX idx_tasks_browse \(task_id[<>]\?\)"),
+    ('get_tasks_page', (None, 5000), r"SEARCH tasks USING INDEX idx_tasks_browse \(task_id[<>]\?\)"),
+]
+
+
+@pytest.fixture(scope='module')
+def report_model(tmp_path_factory):
+    """A year of tasks by 50 authors, analyzed so the planner sees realistic statistics."""
+    path = tmp_path_factory.mktemp('plans')
+    model = TaskModel(db_path=str(path / 'tasks.db'), read_pool_size=0, archive_dir=str(path / 'archive'), dedup_mode='off')
+    rng = random.Random(3)
+    model.store_tasks([(f"task {i}", f"user{i % 50}", rng.choice(['back', 'front', 'database']),
+                        f"2024-{rng.randint(1, 12):02d}-{rng.randint(10, 28)} 10:00:00.000001", 'en') for i in range(20000)])
+    model.conn.execute("ANALYZE")
+    yield model
+    model.close()
+
+
+def task_query_plans(model, method, args):
+    """EXPLAIN QUERY PLAN of every SELECT on tasks the report method runs."""
+    statements = []
+    model.conn.set_trace_callback(statements.append)  # read_pool_size=0 runs every query on the writer
+    try:
+        result = getattr(model, method)(*args)
+        if method.startswith('iter_'):
+            list(result)
+    finally:
+        model.conn.set_trace_callback(None)
+    return [" | ".join(row[3] for row in model.conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+            for sql in statements if re.match(r"\s*SELECT .* FROM tasks\b", sql, re.S)]
+
+
+@pytest.mark.parametrize('method, args, expected', REPORT_QUERIES, ids=[f"{method}{args}" for method, args, _ in REPORT_QUERIES])
+def test_report_query_uses_index(report_model, method, args, expected):
+    plans = task_query_plans(report_model, method, args)
+    assert plans, f"{method} ran no query on tasks"
+    for plan in plans:
+        assert re.search(expected, plan), plan
+        assert "SCAN tasks" not in plan
+
+
+# Streamed reports must come out of an index in order: a TEMP B-TREE would hold every matching row before the first batch
+STREAM_QUERIES = [
+    ('iter_tasks_till_date', (QUERY_DAY,), r"^SCAN tasks USING INDEX idx_tasks_stream_order$"),
+    ('iter_tasks_till_date', (QUERY_DAY, QUERY_AUTHOR), r"^SEARCH tasks USING INDEX idx_tasks_stream_order \(author=\?\)$"),
+]
+
+
+@pytest.mark.parametrize('method, args, expected', STREAM_QUERIES, ids=[f"{method}{args}" for method, args, _ in STREAM_QUERIES])
+def test_streamed_report_needs_no_sort(report_model, method, args, expected):
+    plans = task_query_plans(report_model, method, args)
+    assert plans, f"{method} ran no query on tasks"
+    for plan in plans:
+        assert re.search(expected, plan), plan
+        assert "TEMP B-TREE" not in plan
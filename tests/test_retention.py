@@ -0,0 +1,70 @@
+# /tests/test_retention.py
+import asyncio
+import sqlite3
+from datetime import datetime
+
+from model.async_task_model import AsyncTaskModel
+from viewmodel.retention_job import RetentionJob
+
+TODAY = datetime(2024, 6, 30)
+
+
+class RecordingStorage:
+    """Counts the storage calls a RetentionJob makes."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        async def call(*args):
+            self.calls.append(name)
+            return None if name == 'archive_expired_tasks' else (0, 0)
+        return call
+
+
+def store_months(model):
+    model.store_tasks([(f"task {month} {number} " + "details " * 100, 'alice', channel, f"2024-{month:02d}-{10 + number % 10} 10:00:00.000001", 'en')
+                       for channel in ('back', 'database') for month in range(1, 7) for number in range(100)])
+
+
+def test_disabled_retention_makes_no_storage_calls():
+    storage = RecordingStorage()
+    job = RetentionJob(storage, default_days=0, channel_days={'back': 0})
+
+    async def run():
+        job.start()
+        return job._worker, await job.run_once(TODAY)
+
+    assert asyncio.run(run()) == (None, ({}, 0))
+    assert storage.calls == []
+
+
+def test_expired_months_are_archived_and_vacuumed(task_model):
+    store_months(task_model)
+    storage = AsyncTaskModel(task_model)
+    job = RetentionJob(storage, default_days=60, channel_days={'database': 0})
+    archived, freed = asyncio.run(job.run_once(TODAY))
+    assert archived == {f"2024-{month:02d}": 100 for month in range(1, 5)}
+    assert freed > 0
+    assert task_model.conn.execute("SELECT MIN(day) FROM tasks WHERE channel = 'back'").fetchone()[0] == '2024-05-10'
+    assert task_model.conn.execute("SELECT MIN(day) FROM tasks WHERE channel = 'database'").fetchone()[0] == '2024-01-10'
+    storage.close()
+
+
+def test_older_database_is_converted_only_on_request(make_storage, tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)  # A database created before auto_vacuum was set
+    conn.execute("CREATE TABLE filler (data BLOB)")
+    conn.executemany("INSERT INTO filler VALUES (zeroblob(4000))", [()] * 500)
+    conn.commit()
+    conn.execute("DELETE FROM filler")
+    conn.commit()
+    conn.close()
+    model = make_storage(db_path=path, read_pool_size=0)
+    assert model.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+    freed, left = model.vacuum_free_pages()
+    assert freed == 0 and left >= 400  # Left for SQLite to reuse, no full VACUUM behind the admin's back
+
+    assert model.convert_to_incremental_vacuum() >= 400 * 4096
+    assert model.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert model.convert_to_incremental_vacuum() is None
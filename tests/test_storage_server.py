@@ -0,0 +1,138 @@
+# /tests/test_storage_server.py
+import asyncio
+
+import pytest
+
+from model.async_task_model import AsyncTaskModel
+from model.storage_client import StorageClient, StorageError
+from model.storage_server import SERVED_METHODS, StorageServer
+from model.task_model import TaskChange, TaskModel
+
+DAY = '2024-06-12'
+
+
+def run_with_server(tmp_path, scenario, clients=2):
+    """Start a StorageServer on a free port, connect `clients` StorageClients and run scenario(model, *clients)."""
+    async def run():
+        model = TaskModel(db_path=str(tmp_path / 'tasks.db'), read_pool_size=1, archive_dir=str(tmp_path / 'archive'))
+        server = StorageServer(AsyncTaskModel(model))
+        address = await server.start('127.0.0.1:0')
+        shards = [StorageClient(address) for _ in range(clients)]
+        try:
+            return await asyncio.wait_for(scenario(model, *shards), timeout=10)
+        finally:
+            for shard in shards:
+                shard.close()
+            await asyncio.sleep(0.05)  # Let the server see the disconnects before it stops
+            await server.close()
+    return asyncio.run(run())
+
+
+def rows(author, count, first=0):
+    return [(f"{author} task {number}", author, 'back', f"{DAY} 10:{number:02d}:00.000001", 'en') for number in range(first, first + count)]
+
+
+def test_writes_from_every_shard_are_read_by_every_shard(tmp_path):
+    async def scenario(model, first, second):
+        await asyncio.gather(first.store_tasks(rows('alice', 20)), second.store_tasks(rows('bob', 20)),
+                             first.store_tasks(rows('carol', 5)))
+        return await first.get_tasks_by_date(DAY), await second.get_tasks_by_author_and_date('bob', DAY)
+
+    by_date, bob = run_with_server(tmp_path, scenario)
+    assert {author: len(channels['back']) for author, channels in by_date.items()} == {'alice': 20, 'bob': 20, 'carol': 5}
+    assert [content for content, _ in bob['back']] == [f"bob task {number}" for number in range(20)]
+
+
+def test_change_events_reach_every_subscribed_shard(tmp_path):
+    async def scenario(model, writer, first, second):
+        received = {'first': [], 'second': []}
+        await first.add_change_listener(received['first'].extend)
+        await second.add_change_listener(received['second'].extend)
+        await asyncio.sleep(0.05)  # The subscribe request is fire-and-forget
+        await writer.store_tasks(rows('alice', 3))
+        task_id = (await writer.get_all_tasks())[0][0]
+        await writer.mark_task_complete(task_id)
+        for _ in range(100):
+            if len(received['first']) == len(received['second']) == 4:
+                break
+            await asyncio.sleep(0.01)
+        return received, task_id
+
+    received, task_id = run_with_server(tmp_path, scenario, clients=3)
+    expected = [TaskChange('inserted', task_id + number) for number in range(3)] + [TaskChange('updated', task_id)]
+    assert received['first'] == received['second'] == expected
+
+
+def test_streams_interleave_with_calls_and_can_stop_early(tmp_path):
+    async def scenario(model, first, second):
+        await first.store_tasks(rows('alice', 50))
+        stream = first.stream('iter_tasks_till_date', DAY, batch_size=7)
+        head = [await stream.__anext__() for _ in range(10)]
+        page, _, _ = await second.get_tasks_page(limit=5)  # Another shard reads while the stream is open
+        await stream.aclose()
+        everything = [row async for row in second.stream('iter_tasks_till_date', DAY, batch_size=7)]
+        return head, page, everything
+
+    head, page, everything = run_with_server(tmp_path, scenario)
+    assert len(page) == 5
+    assert [tuple(row) for row in head] == [tuple(row) for row in everything[:10]]
+    assert len(everything) == 50
+
+
+# The reads the view and viewmodel make, with arguments that hit the rows written in the round-trip test
+VIEW_READS = [
+    ('get_tasks_page', (), {'limit': 3}),
+    ('get_tasks_by_author', ('alice',), {}),
+    ('get_tasks_by_ids', ([1, 2, 40],), {}),
+    ('search_tasks', ('task',), {'author': 'bob', 'limit': 5}),
+    ('get_display_state', (1, 2), {}),
+    ('get_import_checkpoint', ('history.jsonl',), {}),
+    ('get_untranslated_tasks', (), {'limit': 5}),
+    ('get_translation_watermark', (), {}),
+    ('get_tasks_after', (3,), {'limit': 4}),
+    ('get_daily_digest', (DAY,), {'language': 'fr'}),
+    ('get_digest_languages', (DAY,), {}),
+    ('get_unfinalized_digests', ('2099-01-01',), {}),
+    ('get_storage_sizes', (), {}),
+]
+
+
+def test_reads_return_what_the_model_returns(tmp_path):
+    async def scenario(model, shard, _):
+        await shard.store_tasks(rows('alice', 4) + [(content, 'bob', 'front', timestamp, 'fr') for content, _, _, timestamp, _ in rows('bob', 3)])
+        await shard.import_tasks('history.jsonl', [("old task", 'carol', 'back', f"{DAY} 09:00:00.000001", 'en', 555)], 12)
+        await shard.set_translated_contents([("alice task zero", 1)])
+        await shard.save_display_state(1, 2, 100, 1, [7, 8])
+        await shard.refresh_digests(DAY)
+        await shard.save_digest_translations(DAY, 'fr', [('alice', 'back', ["tâche"], None)])
+        results = {}
+        for method, args, kwargs in VIEW_READS:
+            results[method] = await shard.call(method, *args, **kwargs), getattr(model, method)(*args, **kwargs)
+        streamed = [row async for row in shard.stream('iter_tasks_till_date', DAY, batch_size=3)]
+        stats = await shard.get_query_stats()
+        return results, streamed, list(model.iter_tasks_till_date(DAY)), stats
+
+    results, streamed, expected_stream, stats = run_with_server(tmp_path, scenario)
+    for method, (served, direct) in results.items():
+        assert served == direct, method  # Tuples stay tuples, and dicts keep their keys
+    assert all(isinstance(task, tuple) for task in results['get_tasks_page'][0][0])  # format_task_line checks this
+    assert streamed == expected_stream and isinstance(streamed[0], tuple)
+    assert stats and all(isinstance(row, tuple) and isinstance(row[0], str) for row in stats)
+
+
+def test_errors_and_unserved_methods(tmp_path):
+    async def scenario(model, first, second):
+        with pytest.raises(StorageError, match="Unknown storage method"):
+            await first.close_everything()
+        for method in ('drop_table_if_exists', 'archive_expired_tasks', 'vacuum_free_pages', 'convert_to_incremental_vacuum', 'close'):
+            with pytest.raises(StorageError, match=f"Unknown storage method '{method}'"):
+                await first.call(method)
+        with pytest.raises(StorageError, match="TypeError"):
+            await second.get_tasks_by_date()
+        return await second.get_tasks_by_date(DAY)  # The connection survives a failed call
+
+    assert run_with_server(tmp_path, scenario) == {}
+
+
+def test_every_served_method_exists():
+    assert all(callable(getattr(TaskModel, method, None)) for method in SERVED_METHODS)
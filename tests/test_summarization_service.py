@@ -0,0 +1,47 @@
+# /tests/test_summarization_service.py
+import asyncio
+import gc
+import threading
+
+from viewmodel.summarization_service import SummarizationService
+
+
+def test_running_batches_are_referenced_until_done():
+    release = threading.Event()
+    calls = []
+
+    def summarize_batch(texts, max_length):
+        calls.append(list(texts))
+        release.wait(5)
+        return [text.upper() for text in texts]
+
+    service = SummarizationService(summarize_batch, max_wait=0.01)
+
+    async def run():
+        requests = asyncio.gather(*(service.summarize(f"task {i}") for i in range(3)))
+        while not calls:
+            await asyncio.sleep(0.01)
+        assert len(service._batches) == 1  # Only the service holds the batch task
+        gc.collect()
+        release.set()
+        summaries = await requests
+        await asyncio.sleep(0)
+        return summaries
+
+    assert asyncio.run(run()) == ["TASK 0", "TASK 1", "TASK 2"]
+    assert calls == [["task 0", "task 1", "task 2"]]
+    assert not service._batches
+
+
+def test_batch_errors_reach_every_request():
+    def summarize_batch(texts, max_length):
+        raise RuntimeError("model not loaded")
+
+    service = SummarizationService(summarize_batch, max_wait=0.01)
+
+    async def run():
+        return await asyncio.gather(service.summarize("a"), service.summarize("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [str(result) for result in results] == ["model not loaded"] * 2
+    assert not service._inflight
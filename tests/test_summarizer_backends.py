@@ -0,0 +1,55 @@
+# /tests/test_summarizer_backends.py
+import os
+import sys
+import types
+
+import pytest
+
+from viewmodel.summarizer_backends import OnnxSummarizerBackend, create_summarizer_backend
+
+
+class FakeOrtModel:
+    """Stands in for optimum's ORTModelForSeq2SeqLM, recording what each load did."""
+
+    calls = []
+
+    def __init__(self, source):
+        self.source = source
+
+    @classmethod
+    def from_pretrained(cls, name_or_path, export=False):
+        cls.calls.append((name_or_path, export))
+        if not export:
+            assert os.path.isfile(os.path.join(name_or_path, 'config.json'))
+        return cls(name_or_path)
+
+    def save_pretrained(self, path):
+        os.makedirs(path)
+        with open(os.path.join(path, 'config.json'), 'w') as config:
+            config.write('{}')
+
+
+@pytest.fixture
+def fake_onnx_stack(monkeypatch):
+    FakeOrtModel.calls = []
+    monkeypatch.setitem(sys.modules, 'optimum', types.ModuleType('optimum'))
+    monkeypatch.setitem(sys.modules, 'optimum.onnxruntime', types.SimpleNamespace(ORTModelForSeq2SeqLM=FakeOrtModel))
+    monkeypatch.setitem(sys.modules, 'transformers', types.SimpleNamespace(
+        T5Tokenizer=types.SimpleNamespace(from_pretrained=lambda name: f"tokenizer of {name}")))
+
+
+def test_onnx_export_happens_once(fake_onnx_stack, tmp_path):
+    first = OnnxSummarizerBackend('google/t5-small', export_dir=str(tmp_path)).load()
+    export_path = str(tmp_path / 'google--t5-small')
+    assert FakeOrtModel.calls == [('google/t5-small', True), (export_path, False)]
+    assert first.model.source == export_path and first.tokenizer == "tokenizer of google/t5-small"
+
+    FakeOrtModel.calls = []
+    OnnxSummarizerBackend('google/t5-small', export_dir=str(tmp_path)).load()
+    assert FakeOrtModel.calls == [(export_path, False)]
+    assert os.listdir(tmp_path) == ['google--t5-small']  # No temporary export left behind
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_summarizer_backend('fp16', 't5-small')
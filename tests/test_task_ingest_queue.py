@@ -0,0 +1,119 @@
+# /tests/test_task_ingest_queue.py
+import asyncio
+import json
+
+from model.async_task_model import AsyncTaskModel
+from model.task_ingest_queue import TaskIngestQueue
+from viewmodel.history_backfill import HistoryBackfill
+
+
+class FlakyStorage:
+    """store_tasks fails `failures` times, then stores batches in memory."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.attempts = 0
+        self.batches = []
+
+    async def store_tasks(self, batch):
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise OSError("database is locked")
+        self.batches.append(batch)
+
+
+class FakeViewModel:
+    def preprocess_and_identify(self, texts):
+        return [(text, 'en') for text in texts]
+
+
+def spilled(path):
+    with open(path, encoding='utf-8') as spill:
+        return [json.loads(line) for line in spill]
+
+
+def put_tasks(queue, numbers):
+    return asyncio.gather(*(queue.put(f"task {number}", 'alice', 'back', 'en', 1000 + number) for number in numbers))
+
+
+def test_failed_batch_is_retried_in_order(tmp_path):
+    storage = FlakyStorage(failures=2)
+    queue = TaskIngestQueue(storage, max_delay=0.01, retry_delay=0.01, spill_path=str(tmp_path / 'spill.jsonl'))
+
+    async def run():
+        queue.start()
+        await put_tasks(queue, range(3))
+        while not storage.batches:
+            await asyncio.sleep(0.01)
+        await queue.close()
+
+    asyncio.run(run())
+    assert storage.attempts == 3
+    assert [task[0] for batch in storage.batches for task in batch] == ["task 0", "task 1", "task 2"]
+    assert not (tmp_path / 'spill.jsonl').exists()
+
+
+def test_on_commit_runs_only_after_the_batch_is_stored(tmp_path):
+    storage = FlakyStorage(failures=1)
+    stored_at_commit = []
+    queue = TaskIngestQueue(storage, max_delay=0.01, retry_delay=0.01, spill_path=str(tmp_path / 'spill.jsonl'),
+                            on_commit=lambda: stored_at_commit.append(len(storage.batches)))
+
+    async def run():
+        queue.start()
+        await put_tasks(queue, range(2))
+        while not storage.batches:
+            await asyncio.sleep(0.01)
+        await queue.close()
+
+    asyncio.run(run())
+    assert stored_at_commit == [1]  # Not after the failed attempt
+
+
+def test_batch_is_spilled_after_max_attempts(tmp_path):
+    storage = FlakyStorage(failures=3)
+    queue = TaskIngestQueue(storage, max_delay=0.01, max_attempts=3, retry_delay=0.01, spill_path=str(tmp_path / 'spill.jsonl'))
+
+    async def run():
+        queue.start()
+        await put_tasks(queue, range(2))
+        while storage.attempts < 3:
+            await asyncio.sleep(0.01)
+        await put_tasks(queue, [2])  # Storage is back
+        await queue.close()
+
+    asyncio.run(run())
+    assert [record['content'] for record in spilled(tmp_path / 'spill.jsonl')] == ["task 0", "task 1"]
+    assert [task[0] for batch in storage.batches for task in batch] == ["task 2"]
+
+
+def test_buffer_stays_bounded_while_storage_fails(tmp_path):
+    storage = FlakyStorage(failures=100)
+    queue = TaskIngestQueue(storage, max_batch=1000, max_delay=10.0, max_pending=5, max_attempts=100,
+                            spill_path=str(tmp_path / 'spill.jsonl'))
+
+    async def run():
+        for number in range(12):
+            await queue.put(f"task {number}", 'alice', 'back', 'en', 1000 + number)
+            assert len(queue._pending) <= queue.max_pending
+
+    asyncio.run(run())
+    assert [record['id'] for record in spilled(tmp_path / 'spill.jsonl')] == list(range(1000, 1007))  # The 5 newest still wait
+
+
+def test_close_spills_what_storage_refuses_and_the_spill_imports(tmp_path, task_model):
+    spill_path = str(tmp_path / 'spill.jsonl')
+    queue = TaskIngestQueue(FlakyStorage(failures=100), spill_path=spill_path)
+
+    async def run():
+        await put_tasks(queue, range(3))
+        await queue.close()
+        storage = AsyncTaskModel(task_model)
+        try:
+            stored = await HistoryBackfill(storage, FakeViewModel()).import_jsonl(spill_path)
+            return stored, [row[0] for row in task_model.conn.execute("SELECT message_id FROM tasks ORDER BY message_id")]
+        finally:
+            storage.close()
+
+    assert asyncio.run(run()) == (3, [1000, 1001, 1002])
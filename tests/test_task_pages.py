@@ -0,0 +1,25 @@
+# /tests/test_task_pages.py
+
+
+def store_numbered(task_model, count):
+    task_model.store_tasks([(f"task number {i} for the sprint", 'alice', 'back', f"2024-08-{1 + i % 28:02d} 10:00:00.000001", 'en')
+                            for i in range(count)])
+    return [row[0] for row in task_model.conn.execute("SELECT task_id FROM tasks ORDER BY task_id")]
+
+
+def test_pages_skip_completed_tasks_and_repeats(task_model):
+    task_ids = store_numbered(task_model, 12)
+    for task_id in task_ids[:4]:
+        task_model.mark_task_complete(task_id)
+    task_model.store_tasks([("task number 5 for the sprint", 'alice', 'front', "2024-08-06 11:00:00.000001", 'en')])  # A repeat
+    assert task_model.conn.execute("SELECT COUNT(*) FROM tasks WHERE duplicate_of IS NOT NULL").fetchone()[0] == 1
+
+    rows, has_previous, has_next = task_model.get_tasks_page(limit=5)
+    assert [row[0] for row in rows] == task_ids[4:9]
+    assert (has_previous, has_next) == (False, True)
+    rows, has_previous, has_next = task_model.get_tasks_page(after_task_id=rows[-1][0], limit=5)
+    assert [row[0] for row in rows] == task_ids[9:]
+    assert (has_previous, has_next) == (True, False)  # The repeat after them does not count as a next page
+    rows, has_previous, has_next = task_model.get_tasks_page(before_task_id=task_ids[9], limit=5)
+    assert [row[0] for row in rows] == task_ids[4:9]
+    assert (has_previous, has_next) == (False, True)  # Only completed tasks come before the first page
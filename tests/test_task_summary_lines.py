@@ -0,0 +1,55 @@
+# /tests/test_task_summary_lines.py
+import asyncio
+
+import pytest
+
+pytest.importorskip('deep_translator')
+
+from utils.message_chunker import MessageChunker  # noqa: E402
+from viewmodel.task_viewmodel import TaskViewModel  # noqa: E402
+
+ROWS = [('alice', 'back', 'fix login', '2024-06-12'),
+        ('alice', 'back', 'review the cache patch', '2024-06-13'),
+        ('alice', 'front', 'restyle the header', '2024-06-13'),
+        ('bob', 'database', 'add the missing index', '2024-06-11')]
+
+
+async def stream(rows):
+    for row in rows:
+        yield row
+
+
+def summary_lines(rows, include_date=True):
+    async def collect():
+        return [line async for line in TaskViewModel().stream_task_summary_lines(stream(rows), include_date)]
+    return asyncio.run(collect())
+
+
+def test_streamed_lines_match_format_task_summary():
+    viewmodel = TaskViewModel()
+    expected = []
+    for author in ('alice', 'bob'):
+        by_channel = {}
+        for row_author, channel, content, day in ROWS:
+            if row_author == author:
+                by_channel.setdefault(channel, []).append((content, day))
+        expected.append(viewmodel.format_task_summary(author, by_channel, include_date=True))
+    assert "\n".join(summary_lines(ROWS)) == "\n".join(expected)
+
+
+def test_lines_group_by_author_and_channel():
+    assert summary_lines(ROWS[:3], include_date=False) == [
+        "", "User: alice", "", "back:", "• fix login", "• review the cache patch", "", "front:", "• restyle the header"]
+    assert summary_lines(ROWS[3:])[-1] == "• [11/06/2024] add the missing index"
+    assert summary_lines([]) == []
+
+
+def test_streamed_report_fits_discord_messages():
+    rows = [(f"user{i // 200}", 'back', f"task {i} " + "detail " * 20, '2024-06-12') for i in range(600)]
+    chunker = MessageChunker()
+    messages = []
+    for line in summary_lines(rows):
+        messages += chunker.add(line)
+    messages.append(chunker.flush())
+    assert all(len(message) <= 2000 for message in messages)
+    assert sum(message.count("• ") for message in messages) == 600
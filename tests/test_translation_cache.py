@@ -0,0 +1,33 @@
+# /tests/test_translation_cache.py
+import sqlite3
+
+import pytest
+
+from model.translation_cache import TranslationCache
+
+
+def test_read_only_cache_hands_new_translations_to_the_writer(task_model, tmp_path):
+    handed = []
+    cache = TranslationCache(str(tmp_path / 'tasks.db'), read_only=True, on_put=lambda *args: handed.append(args))
+    cache.put_many('fr', 'en', {'bonjour': 'hello'})
+    assert handed == [('fr', 'en', {'bonjour': 'hello'})]
+    assert cache.get_many('fr', 'en', ['bonjour']) == {}  # Nothing was written by the reader
+
+    task_model.save_translations(*handed[0])
+    assert cache.get_many('fr', 'en', ['bonjour', 'salut']) == {'bonjour': 'hello'}
+    with pytest.raises(sqlite3.OperationalError):
+        cache.conn.execute("DELETE FROM translation_cache")
+
+
+def test_read_only_lookups_leave_the_lru_order_alone(task_model, tmp_path):
+    task_model.save_translations('fr', 'en', {'bonjour': 'hello'})
+    before = task_model.translation_cache.conn.execute("SELECT last_used FROM translation_cache").fetchone()[0]
+    TranslationCache(str(tmp_path / 'tasks.db'), read_only=True).get_many('fr', 'en', ['bonjour'])
+    assert task_model.translation_cache.conn.execute("SELECT last_used FROM translation_cache").fetchone()[0] == before
+
+
+def test_owner_writes_through_the_model_writer(task_model):
+    assert task_model.translation_cache.conn is task_model.conn
+    task_model.save_translations('fr', 'en', {'salut': 'hi'})
+    with task_model.db.read() as conn:
+        assert conn.execute("SELECT translation FROM translation_cache").fetchall() == [('hi',)]
@@ -0,0 +1,14 @@
+# /utils/logging_config.py
+import logging
+import os
+
+
+def configure_logging(level=None):
+    """Send log records to stderr with timestamps, at LOG_LEVEL (default INFO).
+
+    Modules log through logging.getLogger(__name__) with %-style arguments, so a
+    record below the level is dropped before its message is formatted. Set
+    LOG_LEVEL=DEBUG to see per-message and per-task details.
+    """
+    logging.basicConfig(level=(level or os.getenv("LOG_LEVEL", "INFO")).upper(),
+                        format="%(asctime)s %(levelname)-7s %(name)s: %(message)s")
@@ -0,0 +1,66 @@
+# /utils/message_chunker.py
+
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+class MessageChunker:
+    """Packs lines into Discord-sized messages without breaking lines or words.
+
+    Feed lines with add(); every message that fills up is returned right away, so a
+    report can be sent while its rows are still being read. Call flush() at the end
+    for the last partial message. A single line longer than the limit is split at
+    word boundaries, and only a word longer than the limit is cut.
+    """
+
+    def __init__(self, max_length=DISCORD_MESSAGE_LIMIT):
+        self.max_length = max_length
+        self._lines = []
+        self._length = 0
+
+    def add(self, line):
+        """Add one line; returns the list of messages completed by it (usually empty)."""
+        ready = []
+        for piece in self._split_long_line(line):
+            added_length = len(piece) + (1 if self._lines else 0)  # Newline joining it to the previous line
+            if self._length + added_length > self.max_length:
+                message = self.flush()
+                if message:
+                    ready.append(message)
+                added_length = len(piece)
+            self._lines.append(piece)
+            self._length += added_length
+        return ready
+
+    def add_text(self, text):
+        """Add every line of a block of text; returns the messages completed by it."""
+        ready = []
+        for line in text.split("\n"):
+            ready.extend(self.add(line))
+        return ready
+
+    def flush(self):
+        """Return the pending message (None if empty) and start a new one."""
+        message = "\n".join(self._lines)
+        self._lines, self._length = [], 0
+        # Discord rejects messages that are empty or only whitespace
+        return message if message.strip() else None
+
+    def _split_long_line(self, line):
+        if len(line) <= self.max_length:
+            return [line]
+        pieces, current = [], ""
+        for word in line.split(" "):
+            while len(word) > self.max_length:
+                if current:
+                    pieces.append(current)
+                    current = ""
+                pieces.append(word[:self.max_length])
+                word = word[self.max_length:]
+            candidate = f"{current} {word}" if current else word
+            if len(candidate) > self.max_length:
+                pieces.append(current)
+                candidate = word
+            current = candidate
+        if current:
+            pieces.append(current)
+        return pieces
@@ -0,0 +1,46 @@
+# /utils/minhash.py
+import hashlib
+import re
+import struct
+from functools import lru_cache
+
+BAND_COUNT = 4
+ROWS_PER_BAND = 4  # Minhashes combined into each band key
+_HASH_COUNT = BAND_COUNT * ROWS_PER_BAND
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=65536)
+def _feature_hashes(feature):
+    # One 64-byte digest gives the feature's value under each of the 16 hash functions (32 bits each)
+    return struct.unpack(f'>{_HASH_COUNT}I', hashlib.blake2b(feature.encode('utf-8'), digest_size=4 * _HASH_COUNT).digest())
+
+
+def shingles(text):
+    """The words and word pairs of a text, lowercased; the set near-duplicates are compared on."""
+    words = _TOKEN_PATTERN.findall(text.lower())
+    return set(words) | {f"{first} {second}" for first, second in zip(words, words[1:])}
+
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0  # A text without words (only punctuation or emoji) repeats nothing
+    return len(first & second) / len(first | second)
+
+
+def band_keys(features):
+    """One signed 64-bit key per band for a shingle set (fits SQLite INTEGER).
+
+    Two sets with Jaccard similarity s share at least one key with probability
+    1 - (1 - s ** ROWS_PER_BAND) ** BAND_COUNT: about 95% at s = 0.85, 3% at s = 0.3.
+    An empty set gets NULL keys, so texts without words never share a band.
+    """
+    if not features:
+        return [None] * BAND_COUNT
+    minimums = [min(column) for column in zip(*map(_feature_hashes, features))]
+    keys = []
+    for band in range(BAND_COUNT):
+        rows = minimums[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f'>{ROWS_PER_BAND}I', *rows), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
@@ -0,0 +1,53 @@
+# /utils/profiler.py
+import cProfile
+import os
+import pstats
+import time
+from datetime import datetime
+
+
+class ProfilerToggle:
+    """cProfile that can be switched on and off at runtime, e.g. from a bot command.
+
+    It profiles the thread that calls start(), which for a command is the event
+    loop: on_message, report formatting and everything awaited there. The storage
+    and NLP threads are not included. To sample every thread without restarting,
+    attach py-spy instead (`py-spy record --pid <pid>`); worker threads are named
+    after their pool (task-model, task-model-read, ...), so they are easy to tell apart.
+    """
+
+    def __init__(self, output_dir='.'):
+        self.output_dir = output_dir
+        self._profile = None
+        self._started_at = None
+
+    @property
+    def running(self):
+        return self._profile is not None
+
+    def start(self):
+        """Start profiling; returns False if it was already running."""
+        if self.running:
+            return False
+        self._profile = cProfile.Profile()
+        self._started_at = time.monotonic()
+        self._profile.enable()
+        return True
+
+    def stop(self, limit=15):
+        """Stop profiling and save the stats; returns (path of the .prof file, seconds profiled, top functions).
+
+        Top functions are (cumulative seconds, own seconds, calls, 'file:line(function)'),
+        most cumulative time first. Open the file with `python -m pstats` or snakeviz.
+        """
+        if not self.running:
+            return None
+        self._profile.disable()
+        elapsed = time.monotonic() - self._started_at
+        path = os.path.join(self.output_dir, f"profile-{datetime.now():%Y%m%d-%H%M%S}.prof")
+        self._profile.dump_stats(path)
+        stats = pstats.Stats(self._profile).stats
+        self._profile = self._started_at = None
+        top = sorted(((cumulative, own, calls, f"{os.path.basename(file)}:{line}({function})")
+                      for (file, line, function), (_, calls, own, cumulative, _) in stats.items()), reverse=True)
+        return path, elapsed, top[:limit]
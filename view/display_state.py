@@ -0,0 +1,83 @@
+# /view/display_state.py
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+
+class DisplayState:
+    """Task browser state of one (guild_id, channel_id): which message shows it and which page."""
+
+    def __init__(self, key, message_id=None, first_task_id=None, stale_message_ids=None):
+        self.key = key
+        self.message_id = message_id
+        self.first_task_id = first_task_id  # task_id bounds of the page currently shown
+        self.last_task_id = None  # Not persisted; known once the page has been read again
+        self.has_next = False
+        self.stale_message_ids = stale_message_ids or []  # Superseded displays still to delete
+
+
+class DisplayStateRegistry:
+    """Per-(guild, channel) task browser state, with one asyncio lock per key.
+
+    At most `max_entries` states are kept in memory; the least recently used
+    idle ones are evicted and read back from SQLite the next time their channel
+    is touched, so memory stays bounded however many guilds use the bot.
+    Always go through locked(), so two commands in the same channel cannot
+    interleave their edits while different channels never wait on each other.
+    """
+
+    def __init__(self, model, max_entries=256):
+        self.model = model
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> DisplayState, least recently used first
+        self.locks = {}  # key -> asyncio.Lock
+        self.lock_users = {}  # key -> coroutines holding or waiting for the lock; such keys are never evicted
+
+    @staticmethod
+    def key_for(guild, channel):
+        return (guild.id if guild else 0, channel.id)  # DMs have no guild
+
+    @asynccontextmanager
+    async def locked(self, key):
+        """Hold key's lock and yield its DisplayState (None if the channel has no task browser)."""
+        lock = self.locks.setdefault(key, asyncio.Lock())
+        self.lock_users[key] = self.lock_users.get(key, 0) + 1
+        try:
+            async with lock:
+                state = self.entries.get(key)
+                if state is None:
+                    row = await self.model.get_display_state(*key)
+                    if row is not None:
+                        state = self.entries[key] = DisplayState(key, *row)
+                if state is not None:
+                    self.entries.move_to_end(key)
+                yield state
+        finally:
+            self.lock_users[key] -= 1
+            if not self.lock_users[key]:
+                del self.lock_users[key]
+            self._evict()
+
+    async def save(self, state):
+        """Persist a state (call while holding its lock) and keep it in memory."""
+        self.entries[state.key] = state
+        self.entries.move_to_end(state.key)
+        await self.model.save_display_state(*state.key, state.message_id, state.first_task_id, state.stale_message_ids)
+
+    async def discard(self, key):
+        """Forget a channel's task browser, e.g. after its message was deleted."""
+        self.entries.pop(key, None)
+        await self.model.delete_display_state(*key)
+
+    def states(self):
+        """States currently in memory; evicted channels are refreshed when next used."""
+        return list(self.entries.values())
+
+    def _evict(self):
+        for key in list(self.entries):
+            if len(self.entries) <= self.max_entries:
+                break
+            if key not in self.lock_users:
+                del self.entries[key]
+        for key in [key for key in self.locks if key not in self.lock_users and key not in self.entries]:
+            del self.locks[key]
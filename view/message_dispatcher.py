@@ -0,0 +1,209 @@
+# /view/message_dispatcher.py
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from utils.message_chunker import DISCORD_MESSAGE_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# Discord allows roughly 5 messages per 5 seconds per channel, and only bulk-deletes
+# between 2 and 100 messages that are less than 14 days old.
+CHANNEL_BURST = 5
+CHANNEL_RATE = 1.0  # Tokens (API calls) regained per second
+BULK_DELETE_MAX = 100
+BULK_DELETE_MAX_AGE = timedelta(days=14)
+
+
+class TokenBucket:
+    """Allows `capacity` calls at once, then `rate` calls per second."""
+
+    def __init__(self, capacity=CHANNEL_BURST, rate=CHANNEL_RATE):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        self._refill()
+        while self.tokens < 1:
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+            self._refill()
+        self.tokens -= 1
+
+
+class _Outbound:
+    """One queued API call and the futures of everyone waiting on it."""
+
+    def __init__(self, kind, payload, kwargs=None):
+        self.kind = kind  # 'text', 'send' or 'delete'
+        self.payload = payload
+        self.kwargs = kwargs or {}
+        self.futures = [asyncio.get_running_loop().create_future()]
+        self.enqueued_at = time.monotonic()
+
+
+class MessageDispatcher:
+    """Per-channel outbound queues for everything the bot sends or deletes.
+
+    Each channel gets its own queue, drained by a worker task behind a token
+    bucket, so a long report paces itself instead of running into Discord's rate
+    limits, and reports in different channels no longer wait on each other.
+    Adjacent plain-text messages queued for the same channel are merged into one
+    message while they fit in `max_length`, and deletions go through bulk delete.
+    """
+
+    def __init__(self, capacity=CHANNEL_BURST, rate=CHANNEL_RATE, max_length=DISCORD_MESSAGE_LIMIT):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_length = max_length
+        self.queues = {}  # channel id -> deque of _Outbound
+        self.buckets = {}  # channel id -> TokenBucket
+        self.workers = {}  # channel id -> worker task, only while the queue has work
+        self.max_queue_depth = 0  # Deepest any single channel queue has been
+        self.wait_times = deque(maxlen=1000)  # Seconds between enqueue and the API call, most recent calls
+        self.counters = {'calls': 0, 'messages': 0, 'coalesced': 0, 'deleted': 0, 'bulk_deletes': 0, 'errors': 0}
+
+    async def send_text(self, channel, text):
+        """Queue a plain-text message; resolves to the Discord message that carried it."""
+        return await self._enqueue(channel, _Outbound('text', text))
+
+    async def send(self, channel, content=None, **kwargs):
+        """Queue a message with embeds, views or files; these are never merged."""
+        return await self._enqueue(channel, _Outbound('send', content, kwargs))
+
+    async def send_chunks(self, channel, chunks):
+        """Queue several messages at once and wait until all of them are sent."""
+        pending = [self._enqueue(channel, _Outbound('text', chunk)) for chunk in chunks if chunk]
+        return await asyncio.gather(*pending)
+
+    async def delete_messages(self, channel, messages):
+        """Queue deletion of messages from one channel, bulk-deleting where Discord allows it."""
+        if messages:
+            await self._enqueue(channel, _Outbound('delete', list(messages)))
+
+    def queue_depth(self, channel=None):
+        """Calls waiting to be made, for one channel or for all of them."""
+        if channel is not None:
+            return len(self.queues.get(channel.id, ()))
+        return sum(len(queue) for queue in self.queues.values())
+
+    def stats(self):
+        """Queue depth, wait-time percentiles and call counters."""
+        waits = sorted(self.wait_times)
+
+        def pct(p):
+            return waits[min(len(waits) - 1, int(p / 100 * len(waits)))] if waits else 0.0
+
+        return {'queue_depth': self.queue_depth(), 'max_queue_depth': self.max_queue_depth, 'busy_channels': len(self.workers),
+                'wait_p50_seconds': pct(50), 'wait_p99_seconds': pct(99), **self.counters}
+
+    def format_stats(self):
+        """Human-readable version of stats() for the bot's stats command."""
+        stats = self.stats()
+        return (f"Outbound queue: {stats['queue_depth']} calls waiting in {stats['busy_channels']} channels "
+                f"(deepest so far: {stats['max_queue_depth']})\n"
+                f"Wait: p50 {stats['wait_p50_seconds']:.2f}s, p99 {stats['wait_p99_seconds']:.2f}s\n"
+                f"Calls: {stats['calls']} ({stats['messages']} messages, {stats['coalesced']} merged, "
+                f"{stats['deleted']} deleted in {stats['bulk_deletes']} bulk calls, {stats['errors']} errors)")
+
+    async def close(self):
+        """Let every queued call finish."""
+        workers = list(self.workers.values())
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _enqueue(self, channel, outbound):
+        queue = self.queues.setdefault(channel.id, deque())
+        queue.append(outbound)
+        self.max_queue_depth = max(self.max_queue_depth, len(queue))
+        if channel.id not in self.workers:
+            self.workers[channel.id] = asyncio.create_task(self._drain(channel))
+        return await outbound.futures[0]
+
+    async def _drain(self, channel):
+        queue = self.queues[channel.id]
+        bucket = self.buckets.setdefault(channel.id, TokenBucket(self.capacity, self.rate))
+        try:
+            while queue:
+                await bucket.acquire()  # Wait for a token first, so more text can pile up and be merged
+                outbound = queue.popleft()
+                if outbound.kind == 'text':
+                    self._coalesce(outbound, queue)
+                self.wait_times.append(time.monotonic() - outbound.enqueued_at)
+                try:
+                    result = await self._call(channel, outbound, bucket)
+                except Exception as e:
+                    self.counters['errors'] += 1
+                    for future in outbound.futures:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for future in outbound.futures:
+                        if not future.done():
+                            future.set_result(result)
+        finally:
+            del self.workers[channel.id]
+            if not queue:
+                del self.queues[channel.id]
+
+    def _coalesce(self, outbound, queue):
+        # Merge the text messages queued right behind this one while the result fits in one message
+        while queue and queue[0].kind == 'text':
+            merged = f"{outbound.payload}\n{queue[0].payload}"
+            if len(merged) > self.max_length:
+                break
+            follower = queue.popleft()
+            outbound.payload = merged
+            outbound.futures.extend(follower.futures)
+            self.counters['coalesced'] += 1
+
+    async def _call(self, channel, outbound, bucket):
+        if outbound.kind == 'delete':
+            return await self._delete(channel, outbound.payload, bucket)
+        self.counters['calls'] += 1
+        self.counters['messages'] += 1
+        if outbound.kind == 'text':
+            return await channel.send(outbound.payload)
+        return await channel.send(outbound.payload, **outbound.kwargs)
+
+    async def _delete(self, channel, messages, bucket):
+        cutoff = datetime.now(timezone.utc) - BULK_DELETE_MAX_AGE
+        recent = [msg for msg in messages if msg.created_at > cutoff]
+        old = [msg for msg in messages if msg.created_at <= cutoff]
+        first_call = True
+        for start in range(0, len(recent), BULK_DELETE_MAX):
+            batch = recent[start:start + BULK_DELETE_MAX]
+            if len(batch) == 1:
+                old.extend(batch)  # Bulk delete needs at least two messages
+                continue
+            if not first_call:
+                await bucket.acquire()
+            first_call = False
+            self.counters['calls'] += 1
+            self.counters['bulk_deletes'] += 1
+            try:
+                await channel.delete_messages(batch)
+                self.counters['deleted'] += len(batch)
+            except Exception as e:
+                # Bulk delete fails as a whole if any message is already gone, so retry one by one
+                logger.warning("Bulk delete failed, deleting individually: %s", e)
+                old.extend(batch)
+        for msg in old:
+            if not first_call:
+                await bucket.acquire()
+            first_call = False
+            self.counters['calls'] += 1
+            try:
+                await msg.delete()
+                self.counters['deleted'] += 1
+            except Exception as e:
+                logger.debug("Could not delete message %s: %s", getattr(msg, 'id', '?'), e)  # Usually already deleted
@@ -0,0 +1,75 @@
+# /view/task_display_controller.py
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TaskDisplayController:
+    """Keeps the task browsers of every channel in sync with TaskModel change events.
+
+    Every committed add, delete or complete reaches on_changes() from the storage
+    thread. Changes that cannot affect a page on screen are dropped; the rest are
+    coalesced per display, so a burst of mutations within `debounce` seconds costs
+    one page read and one Discord edit per affected display instead of one per mutation.
+    """
+
+    def __init__(self, task_view, debounce=0.5):
+        self.task_view = task_view
+        self.debounce = debounce
+        self.loop = None
+        self.pending = set()  # Display keys touched by a change since their last refresh
+        self.flush_task = None
+        self.refresh_count = 0  # Discord edits issued
+        self.dropped_count = 0  # Changes that did not touch the visible page
+
+    def start(self):
+        """Bind to the running event loop; call from setup_hook."""
+        self.loop = asyncio.get_running_loop()
+
+    def on_changes(self, changes):
+        """TaskModel change listener; runs on the storage thread, so hop onto the event loop."""
+        loop = self.loop  # close() may clear it from the event loop thread meanwhile
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._record, changes)
+
+    @staticmethod
+    def is_visible(state, change):
+        """True if the change can alter the page `state` is currently showing."""
+        if state.message_id is None:
+            return False
+        if state.first_task_id is None:
+            return change.kind == 'inserted'  # The display shows "no tasks", so any new task changes it
+        if change.kind == 'inserted':
+            # New tasks get the highest ids, so they only show up on (or extend past) the last page
+            return not state.has_next
+        last_task_id = state.last_task_id if state.last_task_id is not None else float('inf')  # Unknown until re-read
+        return state.first_task_id <= change.task_id <= last_task_id
+
+    def _record(self, changes):
+        touched = {state.key for state in self.task_view.display_states.states()
+                   if any(self.is_visible(state, change) for change in changes)}
+        if not touched:
+            self.dropped_count += len(changes)
+            return
+        self.pending |= touched
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        # Wait out the burst, then refresh each touched display once; changes arriving meanwhile trigger one more round
+        while self.pending:
+            await asyncio.sleep(self.debounce)
+            keys, self.pending = self.pending, set()
+            for key in keys:
+                try:
+                    await self.task_view.refresh_task_display(key)
+                    self.refresh_count += 1
+                except Exception as e:
+                    logger.warning("Error refreshing task display %s: %s", key, e)
+
+    def close(self):
+        """Stop listening and drop any refresh still waiting for its debounce window."""
+        self.loop = None
+        if self.flush_task and not self.flush_task.done():
+            self.flush_task.cancel()
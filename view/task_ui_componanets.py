@@ -22,42 +22,9 @@ class AddTaskModal(Modal):
     async def on_submit(self, interaction):
         """Handle the form submission and add the task to the database."""
         task_name = self.task_name.value
-        self.task_view.model.store_task(task_name, str(interaction.user), interaction.channel.name)
+        await self.task_view.model.store_task(task_name, str(interaction.user), interaction.channel.name)
         await interaction.response.send_message(f"Task '{task_name}' added successfully!", ephemeral=True)
-
-        # Automatically update the task display after adding
-        await self.update_task_display(interaction)
-
-    async def update_task_display(self, interaction):
-        """Update the task display after deletion or completion."""
-        tasks = self.task_view.model.get_all_tasks()
-        embeds = self.task_view.build_task_embed(tasks)
-        
-        # Handle empty embeds gracefully
-        if not embeds:
-            await interaction.response.send_message("No tasks to display.", ephemeral=True)
-            return
-
-        # Use only the first embed for editing the main message, if it exists
-        if self.task_view.task_display_message:
-            # If there are multiple embeds, handle them separately
-            await self.task_view.task_display_message.edit(embed=embeds[0])
-
-            # Remove any additional messages beyond the first one
-            await self.delete_additional_task_messages(interaction)
-
-            # Send new messages for additional embeds if they exist
-            for embed in embeds[1:]:
-                msg = await interaction.channel.send(embed=embed)
-                self.task_view.additional_task_messages.append(msg)
-        else:
-            # If no main display message, create a new one
-            self.task_view.task_display_message = await interaction.channel.send(embed=embeds[0])
-
-            # Send additional embeds, if any, and store references
-            for embed in embeds[1:]:
-                msg = await interaction.channel.send(embed=embed)
-                self.task_view.additional_task_messages.append(msg)
+        # The task display picks the change up from the model's change events
 
      
 
@@ -72,22 +39,14 @@ class TaskButtons(View):
     @discord.ui.button(label="✅ Mark Complete", style=discord.ButtonStyle.green)
     async def complete_task(self, interaction: discord.Interaction, button: Button):
         """Mark the task as completed."""
-        self.task_view.model.mark_task_complete(self.task_id)
+        await self.task_view.model.mark_task_complete(self.task_id)
         await interaction.response.send_message(f"Task '{self.task_name}' marked as completed!", ephemeral=True)
-        await self.update_task_display(interaction)
 
     @discord.ui.button(label="🗑️ Delete Task", style=discord.ButtonStyle.red)
     async def delete_task(self, interaction: discord.Interaction, button: Button):
         """Delete the task."""
-        self.task_view.model.delete_task(self.task_name)
+        await self.task_view.model.delete_task(self.task_name)
         await interaction.response.send_message(f"Task '{self.task_name}' deleted successfully!", ephemeral=True)
-        await self.update_task_display(interaction)
-
-    async def update_task_display(self, interaction):
-        """Update the task display after deletion or completion."""
-        tasks = self.task_view.model.get_all_tasks()
-        embed = self.task_view.build_task_embed(tasks)
-        await interaction.message.edit(embed=embed)
 
             
 class TaskViewButtons(View):
@@ -100,25 +59,126 @@ class TaskViewButtons(View):
     @discord.ui.button(label="Delete Task", style=discord.ButtonStyle.red)
     async def delete_task(self, interaction: discord.Interaction, button: Button):
         """Delete the task and update the display."""
-        self.task_view.model.delete_task(self.task_name)
+        await self.task_view.model.delete_task(self.task_name)
         await interaction.response.send_message(f"Task '{self.task_name}' deleted successfully!", ephemeral=True)
-        
-        # Update the task display after deletion
-        tasks = self.task_view.model.get_all_tasks()
-        embeds = self.task_view.build_task_embed(tasks)  # Ensure we get the list of embeds
-
-        if embeds:  # Check if the list of embeds is not empty
-            # If task_display_message exists, edit it with the first embed
-            if self.task_view.task_display_message:
-                await self.task_view.task_display_message.edit(embed=embeds[0])  # Update with the first embed
-                
-                # For additional embeds, send them as new messages
-                for embed in embeds[1:]:
-                    await interaction.channel.send(embed=embed)
+        # The task display picks the change up from the model's change events
+
+
+class TaskBrowserView(View):
+    """One embed showing a page of tasks, with Prev/Next buttons that edit it in place.
+
+    Pages are keyset-paginated on task_id, so only the visible page is ever read and
+    the cost of showing or refreshing it does not depend on how many tasks exist.
+    The view itself holds no page state: which message shows which page lives in
+    task_view.display_states, keyed by (guild, channel), so displays in different
+    channels never touch each other. One instance is registered as a persistent
+    view and answers the buttons of every task display, including after a restart.
+    """
+
+    def __init__(self, task_view, page_size=10, has_previous=False, has_next=False):
+        super().__init__(timeout=None)
+        self.task_view = task_view
+        self.page_size = page_size
+        self.previous_page.disabled = not has_previous
+        self.next_page.disabled = not has_next
+
+    async def load_page(self, state, after_task_id=None, before_task_id=None):
+        """Fetch a page for `state` and return (embed, view), or (None, None) if there are no tasks at all."""
+        model = self.task_view.model
+        rows, has_previous, has_next = await model.get_tasks_page(
+            after_task_id=after_task_id, before_task_id=before_task_id, limit=self.page_size)
+        if not rows and (after_task_id or before_task_id):
+            # The page emptied (its tasks were deleted), so show the page before it, or the first page
+            anchor = after_task_id + 1 if after_task_id else before_task_id
+            rows, has_previous, has_next = await model.get_tasks_page(before_task_id=anchor, limit=self.page_size)
+            if not rows:
+                rows, has_previous, has_next = await model.get_tasks_page(limit=self.page_size)
+        if not rows:
+            state.first_task_id = state.last_task_id = None
+            state.has_next = False
+            return None, None
+        state.first_task_id, state.last_task_id, state.has_next = rows[0][0], rows[-1][0], has_next
+        view = TaskBrowserView(self.task_view, self.page_size, has_previous, has_next)
+        # Only the persistent instance should handle clicks; stopping this one keeps it out of the view store
+        view.stop()
+        return self.task_view.build_task_page_embed(rows), view
+
+    async def refresh(self, state, channel):
+        """Re-read the page `state` shows and edit its message in place."""
+        if state.message_id is None:
+            return
+        after_task_id = state.first_task_id - 1 if state.first_task_id is not None else None
+        embed, view = await self.load_page(state, after_task_id=after_task_id)
+        message = channel.get_partial_message(state.message_id)
+        try:
+            if embed is None:
+                await message.edit(content="No tasks available. Use 'Add Task' to create a new task.", embed=None, view=None)
+            else:
+                await message.edit(content=None, embed=embed, view=view)
+        except discord.NotFound:
+            await self.task_view.display_states.discard(state.key)  # Someone deleted the display
+            return
+        await self.task_view.display_states.save(state)
+
+    async def turn_page(self, interaction, forward):
+        key = self.task_view.display_states.key_for(interaction.guild, interaction.channel)
+        async with self.task_view.display_states.locked(key) as state:
+            if state is None or state.message_id != interaction.message.id:
+                await interaction.response.send_message("This task list is outdated. Use !manage_tasks to show a new one.", ephemeral=True)
+                return
+            if state.first_task_id is None:
+                embed, view = await self.load_page(state)
+            elif forward:
+                if state.last_task_id is None:
+                    await self.load_page(state, after_task_id=state.first_task_id - 1)  # Restored after a restart; find the page's end
+                embed, view = await self.load_page(state, after_task_id=state.last_task_id)
+            else:
+                embed, view = await self.load_page(state, before_task_id=state.first_task_id)
+            if embed is None:
+                await interaction.response.edit_message(content="No tasks available. Use 'Add Task' to create a new task.", embed=None, view=None)
             else:
-                # If no existing display message, send a new one with all embeds
-                self.task_view.task_display_message = await interaction.channel.send(embed=embeds[0])
-                for embed in embeds[1:]:
-                    await interaction.channel.send(embed=embed)
-        else:
-            await interaction.channel.send("No tasks to display.")
+                await interaction.response.edit_message(embed=embed, view=view)
+            await self.task_view.display_states.save(state)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.grey, custom_id="task_browser:previous")
+    async def previous_page(self, interaction: discord.Interaction, button: Button):
+        await self.turn_page(interaction, forward=False)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.grey, custom_id="task_browser:next")
+    async def next_page(self, interaction: discord.Interaction, button: Button):
+        await self.turn_page(interaction, forward=True)
+
+
+class TaskSearchView(View):
+    """Pages through the results of one !search, ten at a time, editing its message in place."""
+
+    def __init__(self, task_view, query, filters, page_size=10):
+        super().__init__(timeout=600)
+        self.task_view = task_view
+        self.query = query
+        self.filters = filters
+        self.page_size = page_size
+        self.page = 0
+
+    async def load_page(self, page=0):
+        """Fetch a page of results and return its embed (None if nothing matches)."""
+        rows, has_next = await self.task_view.model.search_tasks(
+            self.query, limit=self.page_size, offset=page * self.page_size, **self.filters)
+        if not rows:
+            return None
+        self.page = page
+        self.previous_page.disabled = page == 0
+        self.next_page.disabled = not has_next
+        return self.task_view.build_search_embed(self.query, rows, page)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.grey)
+    async def previous_page(self, interaction: discord.Interaction, button: Button):
+        embed = await self.load_page(max(self.page - 1, 0))
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.grey)
+    async def next_page(self, interaction: discord.Interaction, button: Button):
+        embed = await self.load_page(self.page + 1)
+        if embed is None:  # The results shrank since this page was shown
+            embed = await self.load_page(self.page)
+        await interaction.response.edit_message(embed=embed, view=self)
@@ -1,159 +1,443 @@
 # /view/task_view.py
+import os
+import asyncio
+import logging
 import discord
 from deep_translator import GoogleTranslator
 from model.task_model import TaskModel
+from model.storage_client import StorageClient
+from model.task_ingest_queue import TaskIngestQueue
+from viewmodel.pivot_translation_stage import PivotTranslationStage
+from viewmodel.embedding_stage import EmbeddingStage
+from viewmodel.daily_digest_job import DailyDigestJob
+from viewmodel.history_backfill import HistoryBackfill
+from viewmodel.retention_job import RetentionJob
 from viewmodel.task_viewmodel import TaskViewModel
-from langdetect import detect
 from datetime import datetime, timedelta
 from discord.ext import commands
-from view.task_ui_componanets import AddTaskView, TaskViewButtons  
+from view.task_ui_componanets import AddTaskView, TaskViewButtons, TaskBrowserView, TaskSearchView
+from view.task_display_controller import TaskDisplayController
+from view.display_state import DisplayState, DisplayStateRegistry
+from view.message_dispatcher import MessageDispatcher
+from utils.message_chunker import MessageChunker
+from utils.metrics import counter, span, start_metrics_server, timed
+from utils.profiler import ProfilerToggle
 from discord.ui import View, Button
 from discord import Embed
 
+logger = logging.getLogger(__name__)
+
+# Messages in these channels are stored as tasks
+TASK_CHANNELS = ['général', 'back', 'front', 'database']
+
+MESSAGES = counter('discord_messages_total', "Messages handled by on_message, by outcome", ['outcome'])
+
 
 class TaskView(commands.Bot):
-    def __init__(self, model, viewmodel, **options):
+    def __init__(self, model, viewmodel, nlp_pool=None, embedding_store=None, **options):
         intents = options.get('intents', discord.Intents.default())
-        super().__init__(command_prefix="!", intents=intents)
-        self.model = model
+        # shard_id/shard_count are set when each shard runs in its own process (see app.py --shards)
+        super().__init__(command_prefix="!", intents=intents,
+                         shard_id=options.get('shard_id'), shard_count=options.get('shard_count'))
+        self.model = model  # AsyncTaskModel, or StorageClient when sharded
         self.viewmodel = viewmodel
-        self.task_display_message = None  # Store reference to the task display message
-        self.additional_task_messages = []  # Track additional task display messages
+        self.nlp_pool = nlp_pool  # NLPWorkerPool running detection, translation, embedding and summaries in other processes, if any
+        self.ingest_queue = TaskIngestQueue(model, on_commit=self.notify_stages)  # Group-commits tasks coming from on_message
+        self.pivot_stage = PivotTranslationStage(model, viewmodel, nlp_pool=nlp_pool)  # Stores a pivot-language copy of new tasks
+        self.embedding_store = embedding_store  # EmbeddingStore behind "find", or None to disable semantic search
+        self.embedding_stage = EmbeddingStage(model, embedding_store, viewmodel, nlp_pool=nlp_pool) if embedding_store else None
+        self.digest_job = DailyDigestJob(model, viewmodel, nlp_pool=nlp_pool)  # Precomputed day reports, summarized after midnight
+        self.retention_job = RetentionJob(model)  # Archives tasks past their channel's retention window, then vacuums
+        self.history_backfill = HistoryBackfill(model, viewmodel, nlp_pool=nlp_pool, on_batch=self.pivot_stage.notify)
+        self.warm_up_task = None
+        self.display_states = DisplayStateRegistry(model)  # Task browser message and page per (guild, channel)
+        self.task_browser = None  # Persistent view answering every task display's buttons; views need the running loop
+        self.display_controller = TaskDisplayController(self)  # Debounced refreshes driven by model change events
+        self.dispatcher = MessageDispatcher()  # Rate-limited, per-channel outbound message queues
+        self.profiler = ProfilerToggle()  # Switched on and off with !profile
+        self.metrics_server = None  # Serves /metrics when METRICS_PORT is set
         self.add_commands()
         
         
     def add_commands(self):
         """Register commands for the bot."""
-        print("Registering commands...") 
-        
+        logger.debug("Registering commands")
+
         @self.command()
         async def add_task(ctx):
-            print("Add Task Command Triggered")  # Debug: Check if command is triggered
             await ctx.send("Click below to add a new task:", view=AddTaskView(task_view=self))
 
         @self.command()
-        async def manage_tasks(ctx):
-            """Display task management UI for all tasks in the database."""
-            tasks = self.model.get_all_tasks()
+        async def summary_stats(ctx):
+            """Show summarization latency and batch-size histograms."""
+            await ctx.send(self.viewmodel.summarizer.format_stats())
+
+        @self.command()
+        async def dispatch_stats(ctx):
+            """Show outbound queue depth, wait times and API call counts."""
+            await ctx.send(self.dispatcher.format_stats())
 
-            if not tasks:
-                await ctx.send("No tasks available. Use 'Add Task' to create a new task.")
+        @self.command()
+        async def db_stats(ctx):
+            """Show the storage calls that took the most time since startup."""
+            rows = await self.model.get_query_stats()
+            if not rows:
+                await ctx.send("No storage calls recorded yet.")
                 return
+            lines = [f"{name}: {calls} calls, {total * 1000:.0f} ms total, avg {total / calls * 1000:.1f} ms, "
+                     f"max {longest * 1000:.1f} ms, avg wait {queued / calls * 1000:.1f} ms"
+                     for name, calls, total, longest, queued in rows[:10]]
+            await ctx.send("Storage time by call (most first):\n" + "\n".join(lines))
 
-            # Use `self` to access `build_task_embed` if the method is in the same class
-            embeds = self.build_task_embed(tasks)
+        @self.command()
+        @commands.has_permissions(manage_guild=True)
+        async def db_sizes(ctx):
+            """Show the rows and space of each table, the database file and the task archive (needs Manage Server)."""
+            sizes = await self.model.get_storage_sizes()
+            mib = lambda size: f"{size / 2 ** 20:.1f} MiB"
+            hot_bytes = sizes['file_bytes'] - sizes['free_bytes']
+            lines = [f"Database: {mib(sizes['file_bytes'])} file, {mib(sizes['free_bytes'])} free, WAL {mib(sizes['wal_bytes'])}; "
+                     f"{mib(hot_bytes)} in use {'fits' if hot_bytes <= sizes['mmap_bytes'] else 'does not fit'} in the "
+                     f"{mib(sizes['mmap_bytes'])} memory map" + ("" if sizes['incremental_vacuum'] else " (incremental vacuum is off; `!db_vacuum` turns it on)")]
+            lines += [f"{name}: {rows:,} rows" + (f", {mib(size)}" if size is not None else "") for name, rows, size in sizes['tables']]
+            archives = sizes['archives']
+            if archives:
+                lines.append(f"Archive: {sum(row[1] for row in archives):,} tasks in {len(archives)} months "
+                             f"({archives[0][0]} to {archives[-1][0]}), {mib(sum(row[2] for row in archives))} compressed")
+            lines.append(self.retention_job.describe() + ".")
+            await self.send_long_message(ctx.channel, "\n".join(lines))
+
+        @db_sizes.error
+        async def db_sizes_error(ctx, error):
+            if isinstance(error, commands.MissingPermissions):
+                await ctx.send("You need the Manage Server permission to see database sizes.")
+            else:
+                logger.error("Error in !db_sizes: %s", error)  # A local handler replaces the default logging
 
-            if not embeds:  # Check if embeds were generated correctly
-                await ctx.send("Unable to display tasks. Please try again later.")
+        @self.command()
+        @commands.has_permissions(manage_guild=True)
+        async def db_vacuum(ctx):
+            """Turn on incremental vacuum for an older database with one full VACUUM (needs Manage Server)."""
+            if isinstance(self.model, StorageClient):
+                # Shards cannot block every other shard's writes; the conversion runs next to the database instead
+                await ctx.send("The storage server owns the database: stop the bot, run "
+                               "`python -m model.storage_server --convert-vacuum`, then start it again.")
                 return
+            await ctx.send("Rewriting the database file; tasks are stored once it is done...")
+            freed = await self.model.convert_to_incremental_vacuum()
+            if freed is None:
+                await ctx.send("Incremental vacuum is already on; the retention job returns free pages by itself.")
+            else:
+                await ctx.send(f"Incremental vacuum is on; the rewrite freed {freed / 2 ** 20:.1f} MiB.")
 
-            # Send the first embed and track the message
-            self.task_display_message = await ctx.send(embed=embeds[0])
+        @db_vacuum.error
+        async def db_vacuum_error(ctx, error):
+            if isinstance(error, commands.MissingPermissions):
+                await ctx.send("You need the Manage Server permission to vacuum the database.")
+            else:
+                logger.error("Error in !db_vacuum: %s", error)
+                await ctx.send("Vacuuming the database failed; see the log.")
 
-            # Clear any previous additional messages
-            await self.clear_additional_messages(ctx)
+        @self.command()
+        @commands.has_permissions(manage_guild=True)
+        async def profile(ctx, action="status"):
+            """Profile the event loop with cProfile: !profile start, then !profile stop for the slowest functions (needs Manage Server)."""
+            if action == 'start':
+                started = self.profiler.start()
+                await ctx.send("Profiling started; run `!profile stop` to see the results." if started else "Profiling is already running.")
+            elif action == 'stop':
+                result = self.profiler.stop()
+                if result is None:
+                    await ctx.send("Profiling is not running; start it with `!profile start`.")
+                    return
+                path, elapsed, top = result
+                lines = [f"{cumulative * 1000:.0f} ms ({own * 1000:.0f} ms own, {calls} calls) {function}"
+                         for cumulative, own, calls, function in top]
+                await self.send_long_message(ctx.channel, f"Profiled the event loop for {elapsed:.0f}s, saved to {path}. "
+                                                          f"Most cumulative time:\n" + "\n".join(lines))
+            else:
+                await ctx.send(f"Profiling is {'running' if self.profiler.running else 'off'}. Usage: !profile start|stop")
 
-            # Send additional embeds as separate messages
-            self.additional_task_messages = []
-            for embed in embeds[1:]:
-                msg = await ctx.send(embed=embed)
-                self.additional_task_messages.append(msg)
-                
-        async def clear_additional_messages(self, ctx):
-            """Delete additional task display messages from the channel."""
-            if self.additional_task_messages:
-                for msg in self.additional_task_messages:
-                    try:
-                        await msg.delete()
-                    except discord.NotFound:
-                        pass  # Message already deleted or not found
-                self.additional_task_messages = []        
-                    
-    
-    def build_task_embed(self, tasks):
-        """Create a formatted embed to display the list of tasks grouped by categories."""
-        embeds = []
-        max_embed_size = 6000
-        current_embed = discord.Embed(title="Task List", description="Here are the current tasks:", color=discord.Color.blue())
-        current_size = len(current_embed.title) + len(current_embed.description)
-
-        for task in tasks:
-            task_id, content, author, channel, timestamp, language = task
-            field_value = f"**Author**: {author}\n**Channel**: {channel}\n**Timestamp**: {timestamp}\n**Language**: {language}"
-            field_size = len(f"Task {task_id}: {content}") + len(field_value)
-
-            # Check if adding this field will exceed the embed size limit
-            if current_size + field_size > max_embed_size:
-                # If so, start a new embed
-                embeds.append(current_embed)
-                current_embed = discord.Embed(title="Task List (Continued)", color=discord.Color.blue())
-                current_size = len(current_embed.title)
-
-            current_embed.add_field(
-                name=f"Task {task_id}: {content}",
-                value=field_value,
+        @profile.error
+        async def profile_error(ctx, error):
+            if isinstance(error, commands.MissingPermissions):
+                await ctx.send("You need the Manage Server permission to profile the bot.")
+            else:
+                logger.error("Error in !profile: %s", error)
+
+        @self.command()
+        @commands.has_permissions(manage_guild=True)
+        async def backfill_translations(ctx):
+            """Translate every stored task that has no pivot-language copy yet (needs Manage Server)."""
+            await ctx.send(f"Translating stored tasks to '{self.viewmodel.pivot_language}'...")
+            count = await self.pivot_stage.backfill()
+            await ctx.send(f"Backfill complete: {count} tasks translated.")
+
+        @backfill_translations.error
+        async def backfill_translations_error(ctx, error):
+            if isinstance(error, commands.MissingPermissions):
+                await ctx.send("You need the Manage Server permission to translate stored tasks.")
+            else:
+                logger.error("Error in !backfill_translations: %s", error)
+
+        @self.command()
+        @commands.has_permissions(manage_guild=True)
+        async def backfill_history(ctx, *channel_names):
+            """Import past messages of this server's task channels (or the named ones) as tasks; resumes where it stopped (needs Manage Server)."""
+            names = [name.lstrip('#') for name in channel_names] or TASK_CHANNELS
+            channels = [channel for channel in ctx.guild.text_channels if channel.name in names and channel.name in TASK_CHANNELS]
+            if not channels:
+                await ctx.send(f"No task channels to import; task channels are {', '.join(TASK_CHANNELS)}.")
+                return
+            await ctx.send(f"Importing history of {', '.join('#' + channel.name for channel in channels)}...")
+            counts = await self.history_backfill.import_channels(channels, bot_user_id=self.user.id)
+            if self.embedding_stage:
+                self.embedding_stage.notify()
+            await ctx.send("History import complete: " + ", ".join(f"#{name}: {count} tasks" for name, count in counts.items()))
+
+        @backfill_history.error
+        async def backfill_history_error(ctx, error):
+            if isinstance(error, commands.MissingPermissions):
+                await ctx.send("You need the Manage Server permission to import history.")
+            else:
+                logger.error("Error in !backfill_history: %s", error)
+
+        @self.command()
+        async def search(ctx, *, text=""):
+            """Full-text task search, e.g. !search log* "login bug" channel:back author:name from:2024-08-01 to:2024-08-31"""
+            query, filters = self.viewmodel.parse_search_command(text)
+            if not query:
+                await ctx.send('Usage: !search <words, prefix* or "a phrase"> [channel:name] [author:name] [from:date] [to:date]')
+                return
+            view = TaskSearchView(self, query, filters)
+            embed = await view.load_page()
+            if embed is None:
+                await ctx.send(f"No tasks found matching '{query}'.")
+                return
+            await self.dispatcher.send(ctx.channel, embed=embed, view=view)
+
+        @self.command()
+        async def digest(ctx, day=None):
+            """Show the summarized digest of a finished day, e.g. !digest 2024-08-11 (default: yesterday)."""
+            if day is None:
+                day = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+            elif '/' in day:
+                day = self.viewmodel.preprocessor.parse_date(day)
+            if not day:
+                await ctx.send("Usage: !digest [YYYY-MM-DD or DD/MM/YYYY]")
+                return
+            digests = await self.digest_job.get_report_digest(day)
+            if not digests:
+                await ctx.send(f"No tasks found for any user on {day}.")
+                return
+            lines, current_author = [f"Digest for {day}:"], None
+            for author, channel, contents, summary in digests:
+                if author != current_author:
+                    lines += ["", f"User: {author}"]
+                    current_author = author
+                # Until the day is finalized there is no summary yet, so show the tasks themselves
+                lines.append(f"{channel}: {summary or ', '.join(contents)}")
+            await self.send_long_message(ctx.channel, "\n".join(lines))
+
+        @self.command()
+        async def manage_tasks(ctx):
+            """Display task management UI for all tasks in the database, one page at a time."""
+            key = self.display_states.key_for(ctx.guild, ctx.channel)
+            async with self.display_states.locked(key) as previous:
+                state = DisplayState(key)
+                embed, view = await self.task_browser.load_page(state)
+
+                if embed is None:
+                    await ctx.send("No tasks available. Use 'Add Task' to create a new task.")
+                    return
+
+                # This channel's previous display is replaced by the new one; remember it so it can be cleaned up
+                if previous is not None:
+                    state.stale_message_ids = previous.stale_message_ids + [previous.message_id]
+                message = await self.dispatcher.send(ctx.channel, embed=embed, view=view)
+                state.message_id = message.id
+                await self.display_states.save(state)
+
+                # Clear any previous task display messages
+                await self.clear_additional_messages(state, ctx.channel)
+
+    async def clear_additional_messages(self, state, channel):
+        """Delete the superseded task displays of one channel in a bulk delete (call while holding its lock)."""
+        if state.stale_message_ids:
+            stale = [channel.get_partial_message(message_id) for message_id in state.stale_message_ids]
+            await self.dispatcher.delete_messages(channel, stale)
+            state.stale_message_ids = []
+            await self.display_states.save(state)
+
+    def channel_for(self, channel_id):
+        """A channel object for an id, also for channels that are not cached."""
+        return self.get_channel(channel_id) or self.get_partial_messageable(channel_id)
+
+    async def refresh_task_display(self, key):
+        """Re-render the page a channel's task browser shows; driven by display_controller."""
+        async with self.display_states.locked(key) as state:
+            if state is not None:
+                await self.task_browser.refresh(state, self.channel_for(key[1]))
+
+    def build_task_page_embed(self, tasks):
+        """Create the embed for one page of the task browser."""
+        embed = discord.Embed(title="Task List", description="Here are the current tasks:", color=discord.Color.blue())
+        for task_id, content, author, channel, timestamp, language in tasks:
+            embed.add_field(
+                name=f"Task {task_id}: {content}"[:256],  # Discord's field name limit
+                value=f"**Author**: {author}\n**Channel**: {channel}\n**Timestamp**: {timestamp}\n**Language**: {language}",
                 inline=False
             )
-            current_size += field_size
-
-        # Append the last embed if it has fields
-        if current_embed.fields:
-            embeds.append(current_embed)
+        return embed
 
-        return embeds
+    def build_search_embed(self, query, rows, page):
+        """Create the embed for one page of !search results, matched words in bold."""
+        embed = discord.Embed(title=f"Search: {query}"[:256], description=f"Page {page + 1}", color=discord.Color.blue())
+        for task_id, snippet, author, channel, day in rows:
+            embed.add_field(name=f"Task {task_id} · {author} · #{channel} · {day}"[:256], value=snippet[:1024] or "(empty)", inline=False)
+        return embed
 
 
             
 
+    def notify_stages(self):
+        """Wake the stages that process new tasks; called once a batch of them is committed."""
+        self.pivot_stage.notify()
+        if self.embedding_stage:
+            self.embedding_stage.notify()
+
+    async def setup_hook(self):
+        """Start background workers once the event loop is running."""
+        cache = self.viewmodel.translation_cache
+        if cache is not None and cache.read_only:
+            # Translations made in this process's threads are written by the storage, the database's one writer
+            loop = asyncio.get_running_loop()
+            cache.on_put = lambda source, target, translations: asyncio.run_coroutine_threadsafe(
+                self.save_translations(source, target, translations), loop)
+        self.ingest_queue.start()
+        if not self.shard_id:  # One shard is enough to translate and embed everyone's tasks
+            self.pivot_stage.start()
+            if self.embedding_stage:
+                self.embedding_stage.start()
+                await self.model.add_change_listener(self.embedding_stage.on_changes)  # Deleted and archived tasks leave search
+            self.digest_job.start()
+            if not isinstance(self.model, StorageClient):  # The storage server archives and vacuums by itself
+                self.retention_job.start()
+        self.display_controller.start()
+        self.task_browser = TaskBrowserView(task_view=self)
+        self.add_view(self.task_browser)  # Buttons on task displays keep working across restarts
+        await self.model.add_change_listener(self.display_controller.on_changes)
+        if os.getenv("METRICS_PORT"):
+            # Each shard process serves its own metrics, on the next port up
+            port = int(os.getenv("METRICS_PORT")) + (self.shard_id or 0)
+            self.metrics_server = await start_metrics_server(os.getenv("METRICS_HOST", "127.0.0.1"), port)
+            logger.info("Serving metrics on http://%s:%d/metrics", os.getenv("METRICS_HOST", "127.0.0.1"), port)
+
+    async def close(self):
+        """Send queued messages, shut down the gateway connection, flush buffered tasks, then close the storage thread."""
+        await self.dispatcher.close()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+        await super().close()
+        self.display_controller.close()
+        await self.pivot_stage.close()
+        if self.embedding_stage:
+            await self.embedding_stage.close()
+        await self.digest_job.close()
+        await self.retention_job.close()
+        await self.ingest_queue.close()
+        self.model.close()
+        if self.nlp_pool is not None:
+            await asyncio.to_thread(self.nlp_pool.close)
+
     async def on_ready(self):
-        print(f'Logged on as {self.user}!')
+        logger.info("Logged on as %s", self.user)
         for guild in self.guilds:
-            print(f"- {guild.name} (ID: {guild.id})")
+            logger.info("- %s (ID: %s)", guild.name, guild.id)
+
+        # Load the models this process uses in the background; on_ready can fire again after a reconnect
+        if self.warm_up_task is None and self.nlp_pool is None and os.getenv("WARM_UP_MODELS", "1") != "0":
+            models = ['language']
+            if self.embedding_store is not None:
+                models.append('embedder')  # "find" embeds its query
+            if not self.shard_id:
+                models.append('summarizer')  # This shard summarizes the daily digests
+            self.warm_up_task = asyncio.create_task(asyncio.to_thread(self.viewmodel.warm_up, models))
+
+    async def save_translations(self, source, target, translations):
+        try:
+            await self.model.save_translations(source, target, translations)
+        except Exception as e:
+            logger.warning("Error saving %d translations to the cache: %s", len(translations), e)
+
+    async def run_nlp(self, method_name, *args):
+        """Run a blocking TaskViewModel method in the NLP worker pool, or in a thread without one."""
+        if self.nlp_pool is not None:
+            return await self.nlp_pool.run(method_name, *args)
+        return await asyncio.to_thread(getattr(self.viewmodel, method_name), *args)
 
     async def on_message(self, message):
         if message.author == self.user:
             return
 
-        # Preprocess message content
-        preprocessed_content = self.viewmodel.preprocess_content(message.content)
-        if not preprocessed_content:
-            print("Message content is empty after preprocessing. Skipping message.")
+        # Commands never need the NLP models, so handle them before language detection
+        if message.content.startswith("!"):
+            MESSAGES.inc(outcome='command')
+            with span('on_message.command'):
+                await self.process_commands(message)
             return
 
-        detected_language = self.viewmodel.detect_language(preprocessed_content)
-        print(f"detected language in preprossed: {detected_language}")
-        target_channels = ['général', 'back', 'front', 'database']
+        with span('on_message'):
+            # Preprocess message content
+            processed_message = self.viewmodel.preprocess_message(message.content)
+            preprocessed_content = processed_message.content
+            if not preprocessed_content:
+                MESSAGES.inc(outcome='empty')
+                logger.debug("Message content is empty after preprocessing. Skipping message.")
+                return
+
+            # The first call may still be loading fastText, so keep it off the event loop
+            with span('on_message.detect_language'):
+                detected_language = await self.run_nlp('detect_language', preprocessed_content)
+            # Check if the message should be treated as a task
+            if (not message.content.startswith(f"<@{self.user.id}>") and
+                message.channel.name in TASK_CHANNELS):
+                # Store as a regular task if it doesn't start with a mention or command prefix
+                with span('on_message.enqueue'):
+                    await self.ingest_queue.put(preprocessed_content, str(message.author), message.channel.name, detected_language, message.id)
+                MESSAGES.inc(outcome='task')
+                logger.debug("Queued task in %s [%s]: %s", message.channel.name, detected_language, preprocessed_content)
+                return
 
-        # Check if the message should be treated as a task
-        if (not message.content.startswith(f"<@{self.user.id}>") and not message.content.startswith("!") and
-            message.channel.name in target_channels):
-            # Store as a regular task if it doesn't start with a mention or command prefix
-            self.model.store_task(preprocessed_content, str(message.author), message.channel.name, detected_language)
-            print(f"Stored task: {preprocessed_content}")
-            return
-            if self.user in message.mentions:
-                await self.handle_bot_mentions(message, preprocessed_content, detected_language)
-                
-        # Handle bot mentions or command messages
-        if message.content.startswith("!") or self.user in message.mentions:
-            await self.process_commands(message)        
+        # Handle bot mentions
+        if self.user in message.mentions:
+            MESSAGES.inc(outcome='mention')
+            await self.handle_bot_mentions(message, processed_message, detected_language)
+        else:
+            MESSAGES.inc(outcome='ignored')
 
-    async def handle_bot_mentions(self, message, preprocessed_content, detected_language):
+    async def handle_bot_mentions(self, message, processed_message, detected_language):
         """Handles all the cases where the bot is mentioned."""
-        requested_date = self.viewmodel.extract_date_from_message(preprocessed_content)
+        preprocessed_content = processed_message.content
+        requested_date = processed_message.date
         mentioned_user = next((user for user in message.mentions if user != self.user), None)
 
+        # "find <words>" is a semantic search, even if the words look like a date or "today"
+        if preprocessed_content.lower().startswith('find '):
+            await self.send_search_results(message, preprocessed_content[5:].strip())
+            return
+
         if requested_date:
             if mentioned_user:
                 # Specific user on a specific date or till a specific date
-                if 'till' in preprocessed_content.lower():
+                if processed_message.is_till:
                     await self.send_tasks_till_date(message, mentioned_user, requested_date, detected_language)
                 else:
                     await self.send_tasks_on_date(message, mentioned_user, requested_date, detected_language)
             else:
                 
                  # All users on a specific date or till a specific date
-                if 'till' in preprocessed_content.lower():
+                if processed_message.is_till:
                     await self.send_all_users_tasks_till_date(message, requested_date, detected_language)
                 else:
                     # All users on a specific date
@@ -175,26 +459,53 @@ class TaskView(commands.Bot):
         elif mentioned_user:
             await self.send_all_tasks_for_user(message, mentioned_user, detected_language)
 
+    @timed('report.find')
+    async def send_search_results(self, message, query, limit=5):
+        """Answer "find <query>" with the stored tasks closest in meaning to the query."""
+        if self.embedding_store is None:
+            await self.dispatcher.send_text(message.channel, "Task search is not enabled.")
+            return
+        if query.lower().startswith('tasks about '):
+            query = query[len('tasks about '):]
+        query_vector = (await self.run_nlp('embed_texts', [query]))[0]
+        # Tasks deleted or archived since they were embedded may still be hits until the store drops them,
+        # so keep asking for more until `limit` of them are live tasks or the store has no more
+        k, tasks = limit * 2, {}
+        while True:
+            hits = await asyncio.to_thread(self.embedding_store.search, query_vector, k)
+            unknown = [task_id for task_id, _ in hits if task_id not in tasks]
+            tasks.update((row[0], row) for row in await self.model.get_tasks_by_ids(unknown))
+            live = [(task_id, score) for task_id, score in hits if task_id in tasks]
+            if len(live) >= limit or len(hits) < k:
+                break
+            k *= 4
+        lines = [f"- {tasks[task_id][1]} ({tasks[task_id][2]}, #{tasks[task_id][3]}, {tasks[task_id][4][:10]}) [{score:.2f}]"
+                 for task_id, score in live[:limit]]
+        if lines:
+            await self.send_long_message(message.channel, f"Tasks matching '{query}':\n" + "\n".join(lines))
+        else:
+            await self.dispatcher.send_text(message.channel, f"No tasks found matching '{query}'.")
+
+    @timed('report.day')
     async def send_all_users_tasks_on_date(self, message, requested_date, detected_language):
-        tasks_by_date = self.model.get_tasks_by_date(requested_date)
-        if tasks_by_date:
-            final_report = self.build_task_summary(tasks_by_date)
-            final_report = self.viewmodel.translate_if_needed(final_report, detect(final_report), detected_language)
-            await self.send_long_message(message.channel, final_report)
+        # The day's digests come pre-grouped, and translated once per language
+        digests = await self.digest_job.get_report_digest(requested_date, detected_language)
+        if digests:
+            tasks_by_date = {}
+            for author, channel, contents, _ in digests:
+                tasks_by_date.setdefault(author, {})[channel] = contents
+            await self.send_long_message(message.channel, self.build_task_summary(tasks_by_date))
         else:
-            await message.channel.send(f"No tasks found for any user on {requested_date}.")
+            await self.dispatcher.send_text(message.channel, f"No tasks found for any user on {requested_date}.")
             
+    @timed('report.till_date')
     async def send_all_users_tasks_till_date(self, message, requested_date, detected_language):
         """Retrieve tasks for all users till a specific date."""
         
-        tasks_till_date = self.model.get_tasks_till_date(requested_date)
-        
-        final_report = self.build_task_summary(tasks_till_date, include_date=True)
-        
-        # Translate the report if necessary
-        final_report = self.viewmodel.translate_if_needed(final_report, detect(final_report), detected_language)
-        
-        await self.send_long_message(message.channel, final_report)
+        # Stream rows straight into Discord-sized messages instead of building the whole report
+        rows = self.model.stream('iter_tasks_till_date', requested_date)
+        await self.send_streamed_report(message.channel, rows, detected_language,
+                                        empty_msg=f"No tasks found for any user till {requested_date}.")
         
                 
 
@@ -216,31 +527,31 @@ class TaskView(commands.Bot):
 
     async def send_tasks_on_date(self, message, mentioned_user, requested_date, detected_language):
         """Retrieve tasks for a specific user on a given date."""
-        query_author = str(mentioned_user)
-        tasks = self.model.get_tasks_by_author_and_date(query_author, requested_date)
-        await self.send_user_report(message, tasks, query_author, requested_date, detected_language)
+        await self.send_user_digest_report(message, str(mentioned_user), requested_date, requested_date, detected_language)
 
+    @timed('report.user_till_date')
     async def send_tasks_till_date(self, message, mentioned_user, requested_date, detected_language):
         query_author = str(mentioned_user)
-        tasks_till_date = self.model.get_tasks_by_author_till_date(query_author, requested_date)
-        await self.send_user_report(message, tasks_till_date, query_author, requested_date, detected_language, till=True)
+        rows = self.model.stream('iter_tasks_till_date', requested_date, author=query_author)
+        await self.send_streamed_report(message.channel, rows, detected_language,
+                                        header=f"Here is the task summary for {query_author} till {requested_date}:",
+                                        empty_msg=f"No tasks found for {query_author} till {requested_date}.")
 
     async def send_todays_tasks_for_user(self, message, mentioned_user, detected_language):
         
-        query_author = str(mentioned_user)
-        tasks = self.model.get_todays_tasks_by_author(query_author)
-        await self.send_user_report(message, tasks, query_author, 'today', detected_language) 
+        today_date = datetime.now().strftime('%Y-%m-%d')
+        await self.send_user_digest_report(message, str(mentioned_user), today_date, 'today', detected_language)
         
         
     async def send_yesterdays_tasks_for_user(self, message, mentioned_user, detected_language):
         """Retrieve yesterday's tasks for a specific user."""
-        query_author = str(mentioned_user)
         yesterday_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        await self.send_user_report(message, self.model.get_tasks_by_author_and_date(query_author, yesterday_date), query_author, 'yesterday', detected_language)    
+        await self.send_user_digest_report(message, str(mentioned_user), yesterday_date, 'yesterday', detected_language)
 
+    @timed('report.user_all')
     async def send_all_tasks_for_user(self, message, mentioned_user, detected_language):
         query_author = str(mentioned_user)
-        tasks = self.model.get_tasks_by_author(query_author)
+        tasks = await self.model.get_tasks_by_author(query_author)
         await self.send_user_report(message, tasks, query_author, 'all', detected_language)
         
         
@@ -248,21 +559,32 @@ class TaskView(commands.Bot):
         """Format and send the user-specific report."""
         if tasks:
             summary = self.viewmodel.format_task_summary(query_author, tasks, include_date=True)
-            summary = self.viewmodel.translate_if_needed(summary, detect(summary), detected_language)
+            summary = await self.run_nlp('translate_report', summary, detected_language)
             report_type = f" till {date_desc}" if till else f" on {date_desc}"
-            await message.channel.send(f"Here is the task summary for {query_author}{report_type}:\n{summary}")
+            await self.send_long_message(message.channel, f"Here is the task summary for {query_author}{report_type}:\n{summary}")
         else:
-            await message.channel.send(f"No tasks found for {query_author}{' till ' if till else ' on '}{date_desc}.")
+            await self.dispatcher.send_text(message.channel, f"No tasks found for {query_author}{' till ' if till else ' on '}{date_desc}.")
             
             
+    @timed('report.user_day')
+    async def send_user_digest_report(self, message, query_author, day, date_desc, detected_language):
+        """Send one user's tasks of a day from the digests, already translated."""
+        digests = await self.digest_job.get_report_digest(day, detected_language, query_author)
+        if digests:
+            tasks = {channel: [(content, day) for content in contents] for _, channel, contents, _ in digests}
+            summary = self.viewmodel.format_task_summary(query_author, tasks, include_date=True)
+            await self.send_long_message(message.channel, f"Here is the task summary for {query_author} on {date_desc}:\n{summary}")
+        else:
+            await self.dispatcher.send_text(message.channel, f"No tasks found for {query_author} on {date_desc}.")
+
     async def send_report(self, message, tasks_by_user, empty_msg, detected_language):
         """Format and send the report for multiple users."""
         if tasks_by_user:
             final_report = self.build_task_summary(tasks_by_user)
-            final_report = self.viewmodel.translate_if_needed(final_report, detect(final_report), detected_language)
+            final_report = await self.run_nlp('translate_report', final_report, detected_language)
             await self.send_long_message(message.channel, final_report)
         else:
-            await message.channel.send(empty_msg)            
+            await self.dispatcher.send_text(message.channel, empty_msg)            
 
     def build_task_summary(self, tasks_by_date,include_date=False):
         """Builds a summary of tasks for multiple users."""
@@ -272,10 +594,38 @@ class TaskView(commands.Bot):
         ]
         return "\n".join(all_users_summary)
 
+    async def send_streamed_report(self, channel, rows, detected_language, header=None, empty_msg="No tasks found.",
+                                   translate_batch=100):
+        """Format, translate and send a report while its rows are still being read.
+
+        Lines are translated `translate_batch` at a time and packed into whole-line
+        messages as they are produced, so memory use does not grow with the report.
+        """
+        chunker = MessageChunker()
+        pending_lines = [header] if header else []
+        has_rows = False
+
+        async def send_pending():
+            text = await self.run_nlp('translate_report', "\n".join(pending_lines), detected_language)
+            pending_lines.clear()
+            await self.dispatcher.send_chunks(channel, chunker.add_text(text))
+
+        async for line in self.viewmodel.stream_task_summary_lines(rows, include_date=True):
+            has_rows = True
+            pending_lines.append(line)
+            if len(pending_lines) >= translate_batch:
+                await send_pending()
+
+        if not has_rows:
+            await self.dispatcher.send_text(channel, empty_msg)
+            return
+        await send_pending()
+        await self.dispatcher.send_chunks(channel, [chunker.flush()])
+
     async def send_long_message(self, channel, content, max_length=2000):
-        """Splits a long message into smaller chunks and sends them sequentially."""
-        for i in range(0, len(content), max_length):
-            await channel.send(content[i:i + max_length])
+        """Splits a long message into whole-line chunks and queues them on the channel's dispatcher."""
+        chunker = MessageChunker(max_length)
+        await self.dispatcher.send_chunks(channel, chunker.add_text(content) + [chunker.flush()])
             
             
  
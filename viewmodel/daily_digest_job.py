@@ -0,0 +1,123 @@
+# /viewmodel/daily_digest_job.py
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class DailyDigestJob:
+    """Keeps the daily_digests table current and finalizes each day once it is over.
+
+    Every `refresh_interval` seconds the job folds changed tasks into their digests,
+    so a report request is one indexed lookup. Shortly after midnight it summarizes
+    every past day of the last `summary_days` that is not finalized yet with T5;
+    older days, e.g. from a history import, are finalized without a summary, as
+    upgrading does for the history already stored. It then translates the
+    finished digests into the languages reports were asked in over the last
+    `language_lookback_days`, so the next morning's reports need no translation.
+
+    Every shard builds one to read digests with `get_report_digest`; only one runs
+    the background loop.
+    """
+
+    def __init__(self, storage, viewmodel, refresh_interval=60.0, rollover_delay=5.0, retry_delay=60.0,
+                 batch_size=50, language_lookback_days=7, nlp_pool=None, summary_days=None):
+        self.storage = storage  # AsyncTaskModel or StorageClient
+        self.viewmodel = viewmodel
+        self.refresh_interval = refresh_interval
+        self.rollover_delay = rollover_delay  # Seconds past midnight, so the last tasks of the day are stored first
+        self.retry_delay = retry_delay
+        self.batch_size = batch_size
+        self.language_lookback_days = language_lookback_days
+        self.summary_days = summary_days or int(os.getenv("DIGEST_SUMMARY_DAYS", "7"))
+        self.nlp_pool = nlp_pool  # Summarize and translate in NLPWorkerPool processes instead of this process, if given
+        self._worker = None
+
+    def start(self):
+        """Start the background job on the running event loop."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def get_report_digest(self, day, language=None, author=None):
+        """Return a day's (author, channel, contents, summary) digests in `language`, translating and storing missing ones."""
+        rows = await self.storage.get_daily_digest(day, author, language)
+        if language in (None, 'unknown'):
+            return [(author, channel, contents, summary) for author, channel, contents, summary, _, _ in rows]
+        missing = [row for row in rows if row[4] is None or (row[3] and row[5] is None)]
+        translated = {}
+        if missing:
+            results = await self.translate([(row[2], row[3]) for row in missing], language)
+            new_rows = [(row[0], row[1], contents, summary) for row, (contents, summary) in zip(missing, results)]
+            await self.storage.save_digest_translations(day, language, new_rows)
+            translated = {(author, channel): (contents, summary) for author, channel, contents, summary in new_rows}
+        return [(author, channel) + translated.get((author, channel), (contents, summary))
+                for author, channel, _, _, contents, summary in rows]
+
+    async def translate(self, digests, language):
+        if self.nlp_pool is not None:
+            return await self.nlp_pool.run('translate_digests', digests, language)
+        return await asyncio.to_thread(self.viewmodel.translate_digests, digests, language)
+
+    async def summarize(self, channel_contents):
+        if self.nlp_pool is not None:
+            return await self.nlp_pool.run('summarize_channels', channel_contents)
+        # Submit the whole batch at once so the summarization service can batch it
+        return await asyncio.gather(*(self.viewmodel.summarize_channel_tasks(channel, contents)
+                                      for channel, contents in channel_contents))
+
+    async def finalize(self, today):
+        """Summarize the digests of every recent day before `today` not finalized yet; returns the days finalized."""
+        oldest = (datetime.strptime(today, '%Y-%m-%d') - timedelta(days=self.summary_days)).strftime('%Y-%m-%d')
+        skipped = await self.storage.finalize_old_digests(oldest)
+        if skipped:
+            logger.info("Finalized %d digests from before %s without a summary", skipped, oldest)
+        days = set()
+        while True:
+            digests = await self.storage.get_unfinalized_digests(today, self.batch_size)
+            if not digests:
+                break
+            summaries = await self.summarize([(channel, contents) for _, _, channel, contents, _ in digests])
+            if not await self.storage.finalize_digests([(summary, day, author, channel, updated_at) for summary, (day, author, channel, _, updated_at)
+                                                        in zip(summaries, digests)]):
+                break  # Every digest changed while it was summarized; the next pass picks them up again
+            days.update(day for day, _, _, _, _ in digests)
+        return sorted(days)
+
+    async def run_once(self):
+        """Refresh changed digests, finalize days that are over and pre-translate them; returns the days finalized."""
+        await self.storage.refresh_digests()
+        now = datetime.now()
+        days = await self.finalize(now.strftime('%Y-%m-%d'))
+        if days:
+            since = (now - timedelta(days=self.language_lookback_days)).strftime('%Y-%m-%d')
+            for language in await self.storage.get_digest_languages(since):
+                for day in days:
+                    await self.get_report_digest(day, language)
+            logger.info("Finalized daily digests for %s", ', '.join(days))
+        return days
+
+    def seconds_until_rollover(self, now=None):
+        now = now or datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return (midnight - now).total_seconds() + self.rollover_delay
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning("Error updating daily digests, will retry: %s", e)
+                await asyncio.sleep(self.retry_delay)
+                continue
+            await asyncio.sleep(min(self.refresh_interval, self.seconds_until_rollover()))
@@ -0,0 +1,99 @@
+# /viewmodel/embedding_stage.py
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingStage:
+    """Ingest stage that embeds new tasks for semantic search, in batches.
+
+    Like PivotTranslationStage it runs in the background, woken when tasks are
+    queued (and every `poll_interval` seconds). Tasks above the highest task_id
+    already in the EmbeddingStore are embedded `batch_size` at a time, so the
+    first run also backfills everything stored before search existed. Tasks
+    deleted or archived meanwhile (see on_changes) are removed from the store first.
+    """
+
+    def __init__(self, storage, embedding_store, viewmodel, batch_size=64, poll_interval=5.0, retry_delay=30.0,
+                 nlp_pool=None):
+        self.storage = storage  # AsyncTaskModel or StorageClient
+        self.embedding_store = embedding_store
+        self.viewmodel = viewmodel
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.nlp_pool = nlp_pool  # Embed in NLPWorkerPool processes instead of a thread, if given
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self._deleted = set()  # task_ids deleted since the last run
+        self.loop = None
+
+    def start(self):
+        """Start the background worker on the running event loop."""
+        self.loop = asyncio.get_running_loop()
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    def on_changes(self, changes):
+        """TaskModel change listener; may run on the storage thread, so hop onto the event loop."""
+        deleted = [change.task_id for change in changes if change.kind == 'deleted']
+        loop = self.loop
+        if deleted and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._record_deleted, deleted)
+
+    def _record_deleted(self, task_ids):
+        self._deleted.update(task_ids)
+        self._wakeup.set()
+
+    def notify(self):
+        """Signal that new tasks were queued for storage."""
+        self._wakeup.set()
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def remove_deleted(self):
+        """Remove the vectors of tasks deleted since the last call; returns how many were removed."""
+        task_ids, self._deleted = self._deleted, set()
+        try:
+            return await asyncio.to_thread(self.embedding_store.remove, task_ids)
+        except Exception:
+            self._deleted |= task_ids  # Try again on the next run
+            raise
+
+    async def run_once(self):
+        """Embed one batch of new tasks; returns how many were embedded."""
+        watermark = await asyncio.to_thread(self.embedding_store.max_task_id)
+        tasks = await self.storage.get_tasks_after(watermark, self.batch_size)
+        if not tasks:
+            return 0
+        texts = [task[1] for task in tasks]
+        if self.nlp_pool is not None:
+            vectors = await self.nlp_pool.run('embed_texts', texts)
+        else:
+            vectors = await asyncio.to_thread(self.viewmodel.embed_texts, texts)
+        await asyncio.to_thread(self.embedding_store.add, tasks, vectors)
+        return len(tasks)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                if self._deleted:
+                    await self.remove_deleted()
+                while await self.run_once():
+                    pass
+            except Exception as e:
+                logger.warning("Error embedding tasks for search, will retry: %s", e)
+                await asyncio.sleep(self.retry_delay)
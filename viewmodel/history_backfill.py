@@ -0,0 +1,162 @@
+# /viewmodel/history_backfill.py
+import asyncio
+import json
+import logging
+import os
+from collections import namedtuple
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Anything with an `id` can be passed to channel.history(after=...), so the import does not need discord itself
+_MessageRef = namedtuple('_MessageRef', ['id'])
+
+# A message read from Discord or an export, before preprocessing
+RawMessage = namedtuple('RawMessage', ['message_id', 'content', 'author', 'channel', 'timestamp'])
+
+
+def format_timestamp(value):
+    """Store history timestamps like live ones: local time, 'YYYY-MM-DD HH:MM:SS.ffffff'."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat(sep=' ', timespec='microseconds')
+
+
+class HistoryBackfill:
+    """Imports past messages as tasks, in bulk and resumably.
+
+    Messages are read a page at a time while the previous batch is processed:
+    each batch of `batch_size` messages is cleaned and language-detected in one
+    call, then written with import_tasks, which commits the tasks and the source's
+    checkpoint together. An interrupted import resumes after its last batch, and
+    message ids already stored (by live ingest or an earlier import) are skipped.
+
+    Sources are Discord channels (`import_channels`, `concurrency` channels at a
+    time) or a JSONL export with one {"id", "channel", "author", "timestamp",
+    "content"} object per line (`import_jsonl`).
+    """
+
+    def __init__(self, storage, viewmodel, batch_size=500, concurrency=3, nlp_pool=None, on_batch=None):
+        self.storage = storage  # AsyncTaskModel or StorageClient
+        self.viewmodel = viewmodel
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.nlp_pool = nlp_pool  # Detect languages in NLPWorkerPool processes instead of a thread, if given
+        self.on_batch = on_batch  # Called after each stored batch, e.g. to wake the pivot translation stage
+
+    async def import_channels(self, channels, bot_user_id=None, before=None):
+        """Import the history of each channel up to `before` (default: now); returns {channel name: tasks stored}."""
+        before = before or datetime.now(timezone.utc)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def import_one(channel):
+            async with semaphore:
+                return await self.import_channel(channel, bot_user_id, before)
+
+        counts = await asyncio.gather(*(import_one(channel) for channel in channels))
+        return {channel.name: count for channel, count in zip(channels, counts)}
+
+    async def import_channel(self, channel, bot_user_id=None, before=None):
+        source = f"discord:{channel.guild.id}:{channel.id}"
+        checkpoint = await self.storage.get_import_checkpoint(source)
+        after = _MessageRef(int(checkpoint[0])) if checkpoint else None
+
+        async def batches():
+            batch = []
+            async for message in channel.history(limit=None, after=after, before=before, oldest_first=True):
+                if message.author.bot or not self.is_task_message(message.content, bot_user_id):
+                    continue
+                batch.append(RawMessage(message.id, message.content, str(message.author), channel.name,
+                                        format_timestamp(message.created_at)))
+                if len(batch) >= self.batch_size:
+                    yield batch, batch[-1].message_id
+                    batch = []
+            if batch:
+                yield batch, batch[-1].message_id
+
+        return await self._run(source, batches())
+
+    async def import_jsonl(self, path):
+        """Import an export file; returns how many tasks were stored."""
+        source = f"jsonl:{os.path.abspath(path)}"
+        checkpoint = await self.storage.get_import_checkpoint(source)
+        offset = int(checkpoint[0]) if checkpoint else 0
+
+        def read_batch(export, offset):
+            # Returns (messages, offset after them); an empty list at the end of the file
+            export.seek(offset)
+            batch = []
+            while len(batch) < self.batch_size:
+                line = export.readline()
+                if not line:
+                    break
+                if line.strip():
+                    record = json.loads(line)
+                    if not record.get('bot') and self.is_task_message(record.get('content', '')):
+                        batch.append(RawMessage(int(record['id']), record['content'], record['author'], record['channel'],
+                                                format_timestamp(record['timestamp'])))
+            return batch, export.tell()
+
+        async def batches():
+            nonlocal offset
+            with open(path, 'rb') as export:  # Binary, so tell() gives byte offsets to resume from
+                while True:
+                    batch, next_offset = await asyncio.to_thread(read_batch, export, offset)
+                    if not batch and next_offset == offset:
+                        return
+                    offset = next_offset
+                    yield batch, offset
+
+        return await self._run(source, batches())
+
+    @staticmethod
+    def is_task_message(content, bot_user_id=None):
+        """Mirror on_message: commands and messages addressed to the bot are not tasks."""
+        if not content or content.startswith('!'):
+            return False
+        return not (bot_user_id and content.startswith(f"<@{bot_user_id}>"))
+
+    async def prepare(self, messages):
+        """Clean and language-detect a batch; returns store_tasks rows with message ids."""
+        texts = [message.content for message in messages]
+        if self.nlp_pool is not None:
+            prepared = await self.nlp_pool.run('preprocess_and_identify', texts)
+        else:
+            prepared = await asyncio.to_thread(self.viewmodel.preprocess_and_identify, texts)
+        return [(content, message.author, message.channel, message.timestamp, language, message.message_id)
+                for message, (content, language) in zip(messages, prepared) if content]
+
+    async def _run(self, source, batches):
+        """Read batches in one task while the previous batch is prepared and stored in this one."""
+        queue = asyncio.Queue(maxsize=2)
+
+        async def read():
+            try:
+                async for item in batches:
+                    await queue.put(item)
+            except Exception:
+                await queue.put(None)  # Stop the consumer, which then re-raises the error from `await reader`
+                raise
+            await queue.put(None)
+
+        reader = asyncio.create_task(read())
+        stored = 0
+        try:
+            while (item := await queue.get()) is not None:
+                messages, position = item
+                rows = await self.prepare(messages) if messages else []
+                stored += await self.storage.import_tasks(source, rows, position)
+                if self.on_batch is not None:
+                    self.on_batch()
+            await reader  # Surface errors from reading the history
+        finally:
+            if not reader.done():
+                reader.cancel()
+                try:
+                    await reader
+                except asyncio.CancelledError:
+                    pass
+        logger.info("Imported %d tasks from %s", stored, source)
+        return stored
@@ -0,0 +1,69 @@
+# /viewmodel/nlp_worker_pool.py
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Methods needing T5 or the sentence embedder; they run in one process of their own, so those models load once
+MODEL_METHODS = frozenset({'embed_texts', 'summarize_channels'})
+
+_viewmodel = None  # The TaskViewModel of this worker process
+_writes = []  # (source, target, translations) the current call added to the translation cache
+
+
+def _init_worker(translation_cache_path, models):
+    global _viewmodel
+    # Imported here so the bot process never loads the NLP stack just to create the pool
+    from model.translation_cache import TranslationCache
+    from viewmodel.task_viewmodel import TaskViewModel
+    # Workers only read the cache; their new translations go back with each result, for the storage to write
+    translation_cache = TranslationCache(translation_cache_path, read_only=True,
+                                         on_put=lambda source, target, translations: _writes.append((source, target, translations)))
+    _viewmodel = TaskViewModel(translation_cache=translation_cache)
+    _viewmodel.warm_up(models)
+
+
+def _call(method_name, args):
+    try:
+        return getattr(_viewmodel, method_name)(*args), list(_writes)
+    finally:
+        _writes.clear()
+
+
+class NLPWorkerPool:
+    """Runs TaskViewModel methods in worker processes.
+
+    Language detection and translation run in `workers` processes that load only
+    the language identifier. Embedding and summarization (MODEL_METHODS) run in
+    one more process that loads the embedder and T5, so those large models are
+    in memory once. Workers are spawned rather than forked, so they never
+    inherit the bot's threads or sockets.
+
+    Workers never write the database: translations they add to the cache are
+    saved through `storage` (AsyncTaskModel or StorageClient), its one writer.
+    """
+
+    def __init__(self, workers=None, storage=None, translation_cache_path='discord_tasks.db', warm_up=None):
+        if warm_up is None:
+            warm_up = os.getenv("WARM_UP_MODELS", "1") != "0"
+        self.storage = storage
+        context = multiprocessing.get_context('spawn')
+        self.executor = ProcessPoolExecutor(max_workers=workers or max(1, (os.cpu_count() or 2) - 1), mp_context=context,
+                                            initializer=_init_worker,
+                                            initargs=(translation_cache_path, ('language',) if warm_up else ()))
+        self.model_executor = ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_init_worker,
+                                                  initargs=(translation_cache_path, ('summarizer', 'embedder') if warm_up else ()))
+
+    async def run(self, method_name, *args):
+        """Await TaskViewModel.method_name(*args) computed in a worker; arguments and result must pickle."""
+        loop = asyncio.get_running_loop()
+        executor = self.model_executor if method_name in MODEL_METHODS else self.executor
+        result, writes = await loop.run_in_executor(executor, _call, method_name, args)
+        if self.storage is not None:
+            for source, target, translations in writes:
+                await self.storage.save_translations(source, target, translations)
+        return result
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.model_executor.shutdown(wait=True, cancel_futures=True)
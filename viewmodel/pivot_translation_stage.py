@@ -0,0 +1,103 @@
+# /viewmodel/pivot_translation_stage.py
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PivotTranslationStage:
+    """Ingest stage that fills in tasks.translated_content after the original row is stored.
+
+    It runs in the background, picking up untranslated rows in batches whenever it is
+    notified of newly committed tasks (and every `poll_interval` seconds as a safety
+    net). It only looks at rows newer than the last task translated when it started
+    (or the newest task, if none was ever translated), so new messages never queue
+    behind history; `backfill()` (!backfill_translations) translates the rows stored
+    before the stage existed.
+
+    Each language in a batch is translated on its own. Rows the translator keeps
+    rejecting while the rest of their batch goes through are stored untranslated
+    after `max_attempts`, so they stop holding up the rows behind them.
+    """
+
+    def __init__(self, storage, viewmodel, batch_size=100, poll_interval=5.0, retry_delay=30.0, nlp_pool=None, max_attempts=3):
+        self.storage = storage  # AsyncTaskModel or StorageClient
+        self.viewmodel = viewmodel
+        self.nlp_pool = nlp_pool  # Translate in NLPWorkerPool processes instead of a thread, if given
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self._failures = {}  # task_id -> failed attempts so far
+        self._wakeup = asyncio.Event()
+        self._watermark = None  # Live rows are the ones after this task_id; read when the worker starts
+        self._worker = None
+
+    def start(self):
+        """Start the background worker on the running event loop."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    def notify(self):
+        """Signal that new tasks were committed."""
+        self._wakeup.set()
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def run_once(self, after_task_id=0):
+        """Translate one batch of pending rows after `after_task_id`; returns how many rows were stored."""
+        tasks = await self.storage.get_untranslated_tasks(self.batch_size, after_task_id)
+        if not tasks:
+            return 0
+        try:
+            if self.nlp_pool is not None:
+                translated_rows, failed = await self.nlp_pool.run('translate_to_pivot', tasks)
+            else:
+                translated_rows, failed = await asyncio.to_thread(self.viewmodel.translate_to_pivot, tasks)
+        except Exception:
+            # Every language failed, so the translator itself may be down: only rows seen failing alone before count this attempt
+            translated_rows, failed = [], [task_id for task_id, _, _ in tasks if task_id in self._failures]
+            if not failed:
+                raise
+        for task_id in failed:
+            self._failures[task_id] = self._failures.get(task_id, 0) + 1
+        given_up = [(content, task_id) for task_id, content, _ in tasks if self._failures.get(task_id, 0) >= self.max_attempts]
+        if given_up:
+            logger.warning("Storing %d tasks untranslated after %d failed attempts: %s", len(given_up), self.max_attempts,
+                           ', '.join(str(task_id) for _, task_id in given_up))
+            for _, task_id in given_up:
+                del self._failures[task_id]
+        await self.storage.set_translated_contents(translated_rows + given_up)
+        return len(translated_rows) + len(given_up)
+
+    async def backfill(self, after_task_id=0):
+        """Translate every pending row after `after_task_id`, by default including ones stored before this stage existed."""
+        total = 0
+        while True:
+            count = await self.run_once(after_task_id)
+            if count == 0:
+                return total
+            total += count
+
+    async def _run(self):
+        while True:
+            try:
+                if self._watermark is None:
+                    # Read before the first wait: a task committed before a notification must already be past it
+                    self._watermark = await self.storage.get_translation_watermark()
+                await self.backfill(self._watermark)
+            except Exception as e:
+                logger.warning("Error translating tasks to %s, will retry: %s", self.viewmodel.pivot_language, e)
+                await asyncio.sleep(self.retry_delay)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
@@ -0,0 +1,111 @@
+# /viewmodel/retention_job.py
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+def parse_channel_days(text):
+    """Parse RETENTION_CHANNEL_DAYS, e.g. "back=90, général=365, database=0", into {channel: days}."""
+    channel_days = {}
+    for entry in filter(None, (entry.strip() for entry in (text or "").split(','))):
+        channel, separator, days = entry.partition('=')
+        if not separator or not days.strip().isdigit():
+            raise ValueError(f"Invalid RETENTION_CHANNEL_DAYS entry {entry!r}, expected channel=days")
+        channel_days[channel.strip().lstrip('#')] = int(days)
+    return channel_days
+
+
+class RetentionJob:
+    """Keeps the hot database small: archives tasks past their retention window, then shrinks the file.
+
+    Every `interval` seconds, tasks older than their channel's window move to the
+    monthly archive files, one month per storage call so ingest never waits long
+    on the writer. The pages they freed are then given back to the filesystem a
+    `vacuum_pages` step at a time. Till-date reports still read archived tasks;
+    day reports are served by their digests, which are kept.
+
+    Windows are in days: `default_days` (RETENTION_DAYS) for every channel, and
+    `channel_days` (RETENTION_CHANNEL_DAYS) per channel, where 0 keeps a channel
+    forever. Without either the job does not run at all. A database created
+    before incremental vacuum keeps its free pages for reuse until an admin
+    converts it with !db_vacuum.
+    """
+
+    def __init__(self, storage, default_days=None, channel_days=None, interval=None, vacuum_pages=2000, retry_delay=600.0):
+        self.storage = storage  # AsyncTaskModel or StorageClient
+        self.default_days = int(default_days if default_days is not None else os.getenv("RETENTION_DAYS", "0"))
+        self.channel_days = channel_days if channel_days is not None else parse_channel_days(os.getenv("RETENTION_CHANNEL_DAYS"))
+        self.interval = interval or float(os.getenv("RETENTION_INTERVAL_HOURS", "6")) * 3600
+        self.vacuum_pages = vacuum_pages  # 2000 pages of 4 KiB: a few milliseconds of writer time per step
+        self.retry_delay = retry_delay
+        self._worker = None
+
+    @property
+    def enabled(self):
+        """Whether any channel has a retention window."""
+        return bool(self.default_days or any(self.channel_days.values()))
+
+    def start(self):
+        """Start the background job on the running event loop, if retention is configured."""
+        if not self.enabled:
+            logger.info("Task retention is off; set RETENTION_DAYS or RETENTION_CHANNEL_DAYS to archive old tasks")
+            return
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def cutoffs(self, today=None):
+        """(default first day kept, {channel: first day kept}); None keeps everything."""
+        today = today or datetime.now()
+
+        def first_day_kept(days):
+            return (today - timedelta(days=days)).strftime('%Y-%m-%d') if days else None
+
+        return first_day_kept(self.default_days), {channel: first_day_kept(days) for channel, days in self.channel_days.items()}
+
+    def describe(self):
+        """The policy in words, for !db_sizes."""
+        default = f"{self.default_days} days" if self.default_days else "forever"
+        overrides = [f"#{channel}: {f'{days} days' if days else 'forever'}" for channel, days in self.channel_days.items()]
+        return f"Tasks are kept {default}" + (f" ({', '.join(overrides)})" if overrides else "")
+
+    async def run_once(self, today=None):
+        """Archive every expired month, then vacuum until no free pages are left; returns ({month: tasks}, pages freed)."""
+        archived = {}
+        if not self.enabled:
+            return archived, 0
+        default_cutoff, channel_cutoffs = self.cutoffs(today)
+        while (result := await self.storage.archive_expired_tasks(default_cutoff, channel_cutoffs)) is not None:
+            month, count = result
+            archived[month] = archived.get(month, 0) + count
+        freed = 0
+        while True:
+            pages, remaining = await self.storage.vacuum_free_pages(self.vacuum_pages)
+            freed += pages
+            if not pages or not remaining:
+                break
+        if archived or freed:
+            logger.info("Retention: archived %d tasks (%s), freed %d pages",
+                        sum(archived.values()), ', '.join(sorted(archived)) or 'no months', freed)
+        return archived, freed
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning("Error applying task retention, will retry: %s", e)
+                await asyncio.sleep(self.retry_delay)
+                continue
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,151 @@
+# /viewmodel/summarization_service.py
+import asyncio
+import bisect
+import hashlib
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SummarizationService:
+    """Queues summarization requests, micro-batches them and runs the model off the event loop.
+
+    `summarize_batch(texts, max_length)` is the blocking batch function (e.g.
+    TaskViewModel.summarize_batch_with_t5). Requests arriving within `max_wait`
+    seconds of each other are grouped into one padded batch of at most `max_batch`
+    texts. Results are kept in an LRU cache with a TTL, keyed by a hash of the input,
+    and identical requests already in flight share one generation.
+    """
+
+    LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float('inf'))
+
+    def __init__(self, summarize_batch, max_batch=8, max_wait=0.05, workers=1, cache_size=256, cache_ttl=24 * 3600):
+        self.summarize_batch = summarize_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summarizer")
+        self._workers = workers
+        self._cache = OrderedDict()  # key -> (expires_at, summary)
+        self._inflight = {}  # key -> future shared by identical concurrent requests
+        self._queue = None
+        self._dispatcher = None
+        self._batches = set()  # Running _run_batch tasks; the loop only keeps weak references to tasks
+        self._slots = None
+        self.latency_histogram = Counter()  # bucket upper bound (seconds) -> request count
+        self.batch_size_histogram = Counter()  # batch size -> batch count
+        self.cache_hits = 0
+
+    @staticmethod
+    def cache_key(text, max_length):
+        return hashlib.sha256(f"{max_length}\0{text}".encode('utf-8')).hexdigest()
+
+    async def summarize(self, text, max_length=100):
+        """Return the summary of `text`, from cache if possible, otherwise via the next batch."""
+        start = time.perf_counter()
+        key = self.cache_key(text, max_length)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            self._record_latency(start)
+            return cached
+
+        future = self._inflight.get(key)
+        if future is None:
+            self._ensure_dispatcher()
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            self._queue.put_nowait((text, max_length, key, future))
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._record_latency(start)
+
+    def stats(self):
+        """Snapshot of the latency and batch-size histograms plus cache counters."""
+        return {
+            'latency_seconds': {bound: self.latency_histogram[bound] for bound in self.LATENCY_BUCKETS},
+            'batch_size': dict(sorted(self.batch_size_histogram.items())),
+            'cache_hits': self.cache_hits,
+            'cache_entries': len(self._cache),
+            'queued': self._queue.qsize() if self._queue else 0,
+        }
+
+    def format_stats(self):
+        """Human-readable version of stats() for the bot's stats command."""
+        stats = self.stats()
+        latency = ", ".join(f"≤{bound:g}s: {count}" for bound, count in stats['latency_seconds'].items() if count)
+        batches = ", ".join(f"{size}: {count}" for size, count in stats['batch_size'].items())
+        return (f"Summary latency: {latency or 'no requests yet'}\n"
+                f"Batch sizes: {batches or 'no batches yet'}\n"
+                f"Cache: {stats['cache_entries']} entries, {stats['cache_hits']} hits, {stats['queued']} queued")
+
+    def _cache_get(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, summary = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return summary
+
+    def _cache_put(self, key, summary):
+        self._cache[key] = (time.monotonic() + self.cache_ttl, summary)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _record_latency(self, start):
+        elapsed = time.perf_counter() - start
+        self.latency_histogram[self.LATENCY_BUCKETS[bisect.bisect_left(self.LATENCY_BUCKETS, elapsed)]] += 1
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._slots = self._slots or asyncio.Semaphore(self._workers)
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        """Collect queued requests into batches and hand each batch to a free worker thread."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=max(0, deadline - loop.time())))
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire()
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch):
+        try:
+            # generate() takes one max_length per call, so split the batch by requested length
+            by_length = {}
+            for request in batch:
+                by_length.setdefault(request[1], []).append(request)
+            for max_length, requests in by_length.items():
+                texts = [text for text, _, _, _ in requests]
+                self.batch_size_histogram[len(texts)] += 1
+                try:
+                    summaries = await asyncio.get_running_loop().run_in_executor(
+                        self._executor, self.summarize_batch, texts, max_length)
+                except Exception as e:
+                    for _, _, key, future in requests:
+                        self._inflight.pop(key, None)
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, _, key, future), summary in zip(requests, summaries):
+                    self._cache_put(key, summary)
+                    self._inflight.pop(key, None)
+                    if not future.done():
+                        future.set_result(summary)
+        finally:
+            self._slots.release()
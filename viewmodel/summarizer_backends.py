@@ -0,0 +1,98 @@
+# /viewmodel/summarizer_backends.py
+import logging
+import os
+import shutil
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SummarizerBackend:
+    """Full-precision (fp32) T5 checkpoint from transformers, loaded on first use.
+
+    Every backend exposes a `tokenizer` and a `model` with the usual `generate()` API,
+    so TaskViewModel.summarize_with_t5 works unchanged whichever one is configured.
+    """
+
+    name = "fp32"
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.tokenizer = None
+        self.model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load the tokenizer and model once, on whichever thread needs them first."""
+        if self.model is None:
+            with self._lock:
+                if self.model is None:
+                    logger.info("Loading summarization model %s (%s)", self.model_name, self.name)
+                    self.tokenizer, self.model = self._load()
+        return self
+
+    def _load(self):
+        from transformers import T5ForConditionalGeneration, T5Tokenizer
+        return T5Tokenizer.from_pretrained(self.model_name), T5ForConditionalGeneration.from_pretrained(self.model_name)
+
+
+class QuantizedSummarizerBackend(SummarizerBackend):
+    """T5 with its Linear layers dynamically quantized to int8 for faster CPU inference."""
+
+    name = "int8"
+
+    def _load(self):
+        import torch
+        tokenizer, model = super()._load()
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return tokenizer, model
+
+
+class OnnxSummarizerBackend(SummarizerBackend):
+    """T5 exported to ONNX and run with ONNX Runtime (requires `optimum[onnxruntime]`).
+
+    The export takes minutes, so it runs once: the exported model is saved under
+    `export_dir` (ONNX_EXPORT_DIR) and later loads read it from there.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name, export_dir=None):
+        super().__init__(model_name)
+        self.export_dir = export_dir or os.getenv("ONNX_EXPORT_DIR", "onnx_models")
+
+    @property
+    def export_path(self):
+        return os.path.join(self.export_dir, self.model_name.replace('/', '--'))
+
+    def _load(self):
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise ImportError("The onnx summarizer backend requires `pip install optimum[onnxruntime]`") from e
+        from transformers import T5Tokenizer
+        if not os.path.isfile(os.path.join(self.export_path, 'config.json')):
+            self._export(ORTModelForSeq2SeqLM)
+        return T5Tokenizer.from_pretrained(self.model_name), ORTModelForSeq2SeqLM.from_pretrained(self.export_path)
+
+    def _export(self, model_class):
+        logger.info("Exporting %s to ONNX in %s", self.model_name, self.export_path)
+        temp_path = f"{self.export_path}.tmp-{os.getpid()}"
+        model_class.from_pretrained(self.model_name, export=True).save_pretrained(temp_path)
+        try:
+            os.replace(temp_path, self.export_path)  # Readers never see a half-written export
+        except OSError:
+            shutil.rmtree(temp_path, ignore_errors=True)  # Another process finished its export first
+            if not os.path.isfile(os.path.join(self.export_path, 'config.json')):
+                raise
+
+
+SUMMARIZER_BACKENDS = {backend.name: backend for backend in (SummarizerBackend, QuantizedSummarizerBackend, OnnxSummarizerBackend)}
+
+
+def create_summarizer_backend(backend_name, model_name):
+    """Build the backend registered as `backend_name` ('fp32', 'int8' or 'onnx') for a T5 checkpoint."""
+    try:
+        return SUMMARIZER_BACKENDS[backend_name](model_name)
+    except KeyError:
+        raise ValueError(f"Unknown summarizer backend '{backend_name}', expected one of {sorted(SUMMARIZER_BACKENDS)}") from None
@@ -1,58 +1,280 @@
 # /viewmodel/task_viewmodel.py
-import re
-import fasttext
-from transformers import T5ForConditionalGeneration, T5Tokenizer,pipeline
+import os
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
 from deep_translator import GoogleTranslator
-from datetime import datetime, timedelta
+from datetime import datetime
+from viewmodel.summarization_service import SummarizationService
+from viewmodel.summarizer_backends import create_summarizer_backend
+from utils.metrics import counter, timed
+from utils.preprocess import MessagePreprocessor
 
+logger = logging.getLogger(__name__)
+
+MODELS = ('language', 'summarizer', 'embedder')  # What warm_up can load: fastText, T5, the sentence embedder
+
+LANGUAGE_LOOKUPS = counter('language_lookups_total', "Texts language-identified, by where the answer came from", ['source'])
+TRANSLATED_LINES = counter('translated_lines_total', "Distinct lines translated, by where the translation came from", ['source'])
 
 
 class TaskViewModel:
-    def __init__(self):
-        model_name = "t5-large"
-        self.tokenizer = T5Tokenizer.from_pretrained(model_name)
-        self.model = T5ForConditionalGeneration.from_pretrained(model_name)
-        
-        # Initialize FastText model for language detection
-        # Download a pre-trained language identification model
-        self.language_identifier = fasttext.load_model("D:/Neofid/DiscordBot/DiscordBot/lid.176.bin")
+    def __init__(self, model_name=None, language_model_path=None, summarizer_backend=None,
+                 translation_cache=None, translator_factory=GoogleTranslator, language_identifier=None, embedder=None):
+        # Models are loaded lazily on first use (or by warm_up), so the bot comes online without them
+        self.model_name = model_name or os.getenv("T5_MODEL_NAME", "t5-large")
+        # 'fp32', 'int8' (dynamic quantization) or 'onnx' (ONNX Runtime), see summarizer_backends.py
+        self.summarizer_backend = create_summarizer_backend(summarizer_backend or os.getenv("SUMMARIZER_BACKEND", "fp32"),
+                                                            self.model_name)
+        # Pre-trained fastText language identification model, see https://fasttext.cc/docs/en/language-identification.html
+        self.language_model_path = language_model_path or os.getenv("LID_MODEL_PATH", "lid.176.bin")
+        # A model passed in (e.g. a benchmark stub with the same predict() API) is used instead of loading fastText
+        self._language_identifier = language_identifier
+        self._load_lock = threading.Lock()
+        # Predictions below this fastText probability are reported as 'unknown'
+        self.language_confidence_threshold = float(os.getenv("LANGUAGE_CONFIDENCE_THRESHOLD", "0.5"))
+        self._language_memo = OrderedDict()  # text hash -> language code, bounded LRU
+        self._language_memo_size = 10000
+        self._language_memo_lock = threading.Lock()
+        # Sentence embedding model for semantic task search; multilingual, so French and English tasks match
+        self.embedding_model_name = os.getenv("EMBEDDING_MODEL_NAME", "sentence-transformers/paraphrase-multilingual-mpnet-base-v2")
+        self._embedder = embedder  # Anything with SentenceTransformer's encode(); loaded on first use if not given
+
+        # translator_factory(source=..., target=...) must return an object with translate(text);
+        # tests and benchmarks can pass a local stub instead of the Google client
+        self.translator_factory = translator_factory
+        self.translation_cache = translation_cache  # Optional TranslationCache shared across reports
+        self._translators = {}  # (source, target) -> reusable translator client
+        # Every task is stored with a copy in this language, so reports are assembled pre-translated
+        self.pivot_language = os.getenv("PIVOT_LANGUAGE", "en")
+
+        self.preprocessor = MessagePreprocessor()  # Precompiled cleaning and date extraction
+
+        # Batches and caches summarization requests, running T5 on a worker thread
+        self.summarizer = SummarizationService(self.summarize_batch_with_t5)
+
+    @property
+    def tokenizer(self):
+        return self.summarizer_backend.load().tokenizer
+
+    @property
+    def model(self):
+        return self.summarizer_backend.load().model
+
+    @property
+    def language_identifier(self):
+        if self._language_identifier is None:
+            with self._load_lock:
+                if self._language_identifier is None:
+                    import fasttext
+                    logger.info("Loading fastText language identifier from %s", self.language_model_path)
+                    self._language_identifier = fasttext.load_model(self.language_model_path)
+        return self._language_identifier
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            with self._load_lock:
+                if self._embedder is None:
+                    from sentence_transformers import SentenceTransformer
+                    logger.info("Loading sentence embedding model %s", self.embedding_model_name)
+                    self._embedder = SentenceTransformer(self.embedding_model_name)
+        return self._embedder
+
+    def warm_up(self, models=MODELS):
+        """Load the given models (all by default) up front. Blocking, so run it in a background thread."""
+        if 'language' in models:
+            self.language_identifier
+        if 'summarizer' in models:
+            self.summarizer_backend.load()
+        if 'embedder' in models:
+            self.embedder
+
+    @timed('nlp.embed')
+    def embed_texts(self, texts, batch_size=64):
+        """Return a float32 array with one L2-normalized embedding per text, encoded in batches."""
+        return self.embedder.encode(list(texts), batch_size=batch_size, convert_to_numpy=True,
+                                    normalize_embeddings=True, show_progress_bar=False).astype('float32')
 
 
     def preprocess_content(self, content):
         """Preprocess the content by removing mentions and unwanted characters."""
-        content = re.sub(r'<@!?[0-9]+>', '', content)  # Remove user mentions
-        content = re.sub(r'<@&[0-9]+>', '', content)   # Remove role mentions
-        content = re.sub(r'[^a-zA-Z0-9/\-\s!]', '', content)  # Keep alphanumeric, slashes, dashes, and spaces
-        content = re.sub(r'\s+', ' ', content)  # Replace multiple spaces with a single space
-        return content.strip()
+        return self.preprocessor.clean(content)
+
+    def preprocess_and_identify(self, texts):
+        """Clean a batch of raw messages and detect their languages with one fastText prediction.
+
+        Returns a (content, language) pair per text; content is empty when nothing is left after cleaning.
+        """
+        contents = [self.preprocessor.clean(text) for text in texts]
+        languages = iter(self.identify_languages([content for content in contents if content]))
+        return [(content, next(languages) if content else 'unknown') for content in contents]
+
+    @timed('nlp.preprocess')
+    def preprocess_message(self, content):
+        """Clean a raw message and extract its requested date and keywords (see utils/preprocess.py)."""
+        return self.preprocessor.process(content)
+
+    def parse_search_command(self, text):
+        """Split "!search" input into (search text, filters) with channel:, author:, from: and to: filters.
+
+        Dates may be written YYYY-MM-DD or DD/MM/YYYY; filters with an unreadable date are ignored.
+        """
+        filters, words = {}, []
+        for word in text.split():
+            name, _, value = word.partition(':')
+            name = {'from': 'date_from', 'to': 'date_to'}.get(name.lower(), name.lower())
+            if value and name in ('channel', 'author', 'date_from', 'date_to'):
+                if name.startswith('date_') and '/' in value:
+                    value = self.preprocessor.parse_date(value)
+                if value:
+                    filters[name] = value.lstrip('#') if name == 'channel' else value
+            else:
+                words.append(word)
+        return " ".join(words), filters
   
   
   
     def detect_language(self, text):
-        """Detect the language of a given text using XLM-R."""
-        try:
-            # Use FastText to predict the language
-            prediction = self.language_identifier.predict(text, k=1)
-            detected_lang = prediction[0][0].replace("__label__", "")  # Get the language code
-            print(f"Detected language code: {detected_lang}")  # Debug: Print the detected language code
-            return detected_lang
-        
-        except Exception as e:
-            print(f"Error detecting language with FastText: {e}")
-            return 'unknown'
+        """Detect the language of a given text using fastText."""
+        detected_lang = self.identify_languages([text])[0]
+        logger.debug("Detected language code: %s", detected_lang)
+        return detected_lang
+
+    @timed('nlp.identify_languages')
+    def identify_languages(self, texts):
+        """Return a language code for each text, using one batched fastText prediction for cache misses.
+
+        Results are memoized by text hash. Texts whose top prediction is below the
+        confidence threshold, or that fail to classify, come back as 'unknown'.
+        """
+        keys = [hashlib.sha1(text.encode('utf-8')).digest() for text in texts]
+        languages = [None] * len(texts)
+        with self._language_memo_lock:
+            for i, key in enumerate(keys):
+                if key in self._language_memo:
+                    self._language_memo.move_to_end(key)
+                    languages[i] = self._language_memo[key]
+
+        missing = [i for i, language in enumerate(languages) if language is None]
+        LANGUAGE_LOOKUPS.inc(len(texts) - len(missing), source='memo')
+        if missing:
+            LANGUAGE_LOOKUPS.inc(len(missing), source='fasttext')
+            try:
+                # fastText rejects newlines and works per line, so classify each text as a single line
+                labels, probabilities = self.language_identifier.predict([texts[i].replace("\n", " ") for i in missing], k=1)
+                predictions = [label[0].replace("__label__", "") if probability[0] >= self.language_confidence_threshold else 'unknown'
+                               for label, probability in zip(labels, probabilities)]
+            except Exception as e:
+                logger.warning("Error detecting language with FastText: %s", e)
+                return [language or 'unknown' for language in languages]
+            with self._language_memo_lock:
+                for i, language in zip(missing, predictions):
+                    languages[i] = language
+                    self._language_memo[keys[i]] = language
+                while len(self._language_memo) > self._language_memo_size:
+                    self._language_memo.popitem(last=False)
+        return languages
         
-    def translate(self, text, source_language, target_language):
-        """Translate text from source_language to target_language."""
+    def translate(self, text, source_language, target_language, raise_errors=False):
+        """Translate text from source_language to target_language, line by line through the cache."""
         
         if source_language == target_language or source_language == 'unknown':
             return text  # Skip translation if languages are the same or source language is unknown
         
+        # Unchanged task lines hit the cache, so only new lines are sent to the translator
+        lines = text.split("\n")
+        unique_lines = [line for line in dict.fromkeys(lines) if line.strip()]
+        translations = self.translation_cache.get_many(source_language, target_language, unique_lines) if self.translation_cache else {}
+        missing = [line for line in unique_lines if line not in translations]
+        TRANSLATED_LINES.inc(len(unique_lines) - len(missing), source='cache')
+        if missing:
+            TRANSLATED_LINES.inc(len(missing), source='translator')
+            try:
+                new_translations = self.translate_lines(missing, source_language, target_language)
+            except Exception as e:
+                if raise_errors:
+                    raise
+                logger.warning("Error translating text: %s", e)
+                new_translations = {}
+            translations.update(new_translations)
+            if self.translation_cache:
+                self.translation_cache.put_many(source_language, target_language, new_translations)
+        return "\n".join(translations.get(line, line) for line in lines)
+
+    def translate_to_pivot(self, tasks):
+        """Translate (task_id, content, language) rows to the pivot language; returns ((translation, task_id) rows, failed task_ids).
+
+        Each language is translated on its own, so one failing language does not hold
+        back the rest: its task_ids are returned as failed, to be retried. Languages
+        the translator does not support (fastText codes such as 'arz' or 'wuu') keep
+        their original text. Raises if every language failed, which points at the
+        translator rather than the rows.
+        """
+        # Tasks stored without a language (e.g. from the Add Task modal) are identified in one batch
+        unidentified = [content for _, content, language in tasks if language in ('unknown', None)]
+        identified = iter(self.identify_languages(unidentified) if unidentified else [])
+        by_language = {}
+        for task_id, content, language in tasks:
+            if language in ('unknown', None):
+                language = next(identified)
+            by_language.setdefault(language, []).append((task_id, content))
+
+        translated_rows, failed, error = [], [], None
+        for language, rows in by_language.items():
+            # Stored content is single-line after preprocessing, so one line per task keeps rows aligned
+            contents = [content.replace("\n", " ") for _, content in rows]
+            if language in (self.pivot_language, 'unknown', None) or not self.supports_language(language):
+                translations = contents  # Nothing to translate, the original is already the canonical copy
+            else:
+                try:
+                    translations = self.translate("\n".join(contents), language, self.pivot_language, raise_errors=True).split("\n")
+                except Exception as e:
+                    logger.warning("Error translating %d tasks from %s: %s", len(rows), language, e)
+                    failed += [task_id for task_id, _ in rows]
+                    error = e
+                    continue
+            translated_rows.extend(zip(translations, (task_id for task_id, _ in rows)))
+        if failed and not translated_rows:
+            raise error
+        return translated_rows, failed
+
+    def supports_language(self, language):
+        """Whether the translator accepts `language` as a source; clients reject unknown codes when they are created."""
         try:
-            translated_text = GoogleTranslator(source=source_language, target=target_language).translate(text)
-            return translated_text
+            self.get_translator(language, self.pivot_language)
+            return True
         except Exception as e:
-            print(f"Error translating text: {e}")
-            return text
+            logger.info("No translator from %s to %s, keeping those tasks as written: %s", language, self.pivot_language, e)
+            return False
+
+    def get_translator(self, source_language, target_language):
+        """Return the translator client for a language pair, creating it on first use."""
+        key = (source_language, target_language)
+        if key not in self._translators:
+            self._translators[key] = self.translator_factory(source=source_language, target=target_language)
+        return self._translators[key]
+
+    @timed('nlp.translator_requests')
+    def translate_lines(self, lines, source_language, target_language, max_request_chars=4500):
+        """Translate lines in as few requests as possible; returns {line: translation}."""
+        translator = self.get_translator(source_language, target_language)
+        translations = {}
+        batch, batch_chars = [], 0
+        for line in lines + [None]:  # None flushes the last batch
+            if line is not None and (not batch or batch_chars + len(line) + 1 <= max_request_chars):
+                batch.append(line)
+                batch_chars += len(line) + 1
+                continue
+            translated = (translator.translate("\n".join(batch)) or "").split("\n")
+            if len(translated) != len(batch):
+                # The service merged or split lines, so fall back to one request per line
+                translated = [translator.translate(item) or item for item in batch]
+            translations.update(zip(batch, translated))
+            batch, batch_chars = ([line], len(line) + 1) if line is not None else ([], 0)
+        return translations
         
     def translate_if_needed(self, text, source_language, target_language):
         """Translate the text if the source language differs from the target language."""
@@ -61,62 +283,38 @@ class TaskViewModel:
             return text
         
         if source_language != target_language and target_language != 'unknown':
-            print(f"Translating from '{source_language}' to '{target_language}'")
+            logger.debug("Translating from '%s' to '%s'", source_language, target_language)
             return self.translate(text, source_language, target_language)
-        
-        # Debug print to indicate no translation was needed
-        print(f"No translation needed for text: {text[:50]}")
+
+        logger.debug("No translation needed for text: %.50s", text)
         return text
  
-    def extract_date_from_message(self, message_content):
-        """Extract date from the message if present, including handling 'till date'."""
-        # Pattern for dates in format '11/08/2024' or '11082024'
-        date_pattern = r'(\d{2}[/-]\d{2}[/-]\d{4})'
-        match = re.search(date_pattern, message_content)
-
-        if match:
-            date_str = match.group(1)
-            try:
-                extracted_date = datetime.strptime(date_str, '%d/%m/%Y')
-                return extracted_date.strftime('%Y-%m-%d')
-            except ValueError:
-                return None
-
-        # Handle 'today', 'yesterday', and 'tomorrow' in English and French
-        if any(keyword in message_content.lower() for keyword in ['today', "aujourd'hui"]):
-            return datetime.now().strftime('%Y-%m-%d')
-
-        if any(keyword in message_content.lower() for keyword in ['yesterday', 'hier']):
-            return (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    @timed('nlp.translate_report')
+    def translate_report(self, report, target_language):
+        """Translate an assembled report into target_language.
 
-        if any(keyword in message_content.lower() for keyword in ['tomorrow', 'demain']):
-            return (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        Reports are built from pivot-language copies, but rows still waiting for the
+        pivot stage keep their original text, so each line is identified (memoized,
+        one batched prediction) and translated from its own language.
+        """
+        if not report or target_language in (None, 'unknown'):
+            return report
+        lines = report.split("\n")
+        line_languages = self.identify_languages(lines)
+        by_language = {}
+        for index, (line, language) in enumerate(zip(lines, line_languages)):
+            source_language = self.pivot_language if language == 'unknown' else language
+            if source_language != target_language and line.strip():
+                by_language.setdefault(source_language, []).append(index)
+        for source_language, indexes in by_language.items():
+            translated = self.translate("\n".join(lines[i] for i in indexes), source_language, target_language).split("\n")
+            for i, line in zip(indexes, translated):
+                lines[i] = line
+        return "\n".join(lines)
 
-        # Handle "till" or "jusqu'à" patterns for till date detection
-        till_pattern = r'(till|jusqu\'à) (\d{2}[/-]\d{2}[/-]\d{4})'
-        match_till = re.search(till_pattern, message_content.lower())
-
-        if match_till:
-            date_str = match_till.group(2)
-            try:
-                extracted_date = datetime.strptime(date_str, '%d/%m/%Y')
-                return extracted_date.strftime('%Y-%m-%d')
-            except ValueError:
-                return None
-
-        # Pattern for dates without slashes (e.g., '11082024')
-        no_slash_pattern = r'\b(\d{2})(\d{2})(\d{4})\b'
-        match_no_slash = re.search(no_slash_pattern, message_content)
-
-        if match_no_slash:
-            day, month, year = match_no_slash.groups()
-            try:
-                extracted_date = datetime.strptime(f'{day}/{month}/{year}', '%d/%m/%Y')
-                return extracted_date.strftime('%Y-%m-%d')
-            except ValueError:
-                return None
-
-        return None
+    def extract_date_from_message(self, message_content):
+        """Extract date from the message if present, including handling 'till date'."""
+        return self.preprocessor.extract(message_content)[0]
 
 
 
@@ -131,9 +329,19 @@ class TaskViewModel:
 
     def summarize_with_t5(self, text, max_length=100):
         """Summarize text using the T5 model."""
-        inputs = self.tokenizer.encode(f"summarize: {text}", return_tensors="pt", max_length=512, truncation=True)
-        summary_ids = self.model.generate(inputs, max_length=max_length, min_length=30, length_penalty=2.0, num_beams=4, early_stopping=True)
-        summarized_text = self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+        return self.summarize_batch_with_t5([text], max_length=max_length)[0]
+
+    @timed('nlp.t5_batch')
+    def summarize_batch_with_t5(self, texts, max_length=100):
+        """Summarize several texts in one padded T5 batch; returns summaries in input order."""
+        inputs = self.tokenizer([f"summarize: {text}" for text in texts], return_tensors="pt",
+                                max_length=512, truncation=True, padding=True)
+        summary_ids = self.model.generate(**inputs, max_length=max_length, min_length=30, length_penalty=2.0, num_beams=4, early_stopping=True)
+        return [self.format_summary_sentences(summarized_text)
+                for summarized_text in self.tokenizer.batch_decode(summary_ids, skip_special_tokens=True)]
+
+    def format_summary_sentences(self, summarized_text):
+        """Put each sentence of a generated summary on its own line."""
         sentences = [sentence.strip() for sentence in summarized_text.split('.') if sentence.strip()]
         return "\n".join([f"{sentence.strip()}." for sentence in sentences])
     
@@ -151,49 +359,118 @@ class TaskViewModel:
 
             # Add each task with a bullet point
             for task in tasks:
-                if isinstance(task, tuple):
-                    task_content, task_date = task  # Unpack tuple values
-                    if include_date:
-                        # Ensure task_date is formatted as DD/MM/YYYY
-                        try:
-                            formatted_date = datetime.strptime(task_date, '%Y-%m-%d').strftime('%d/%m/%Y')
-                        except ValueError:
-                            formatted_date = task_date  # If conversion fails, use the original date
-
-                        task_str = f"[{formatted_date}] {task_content}"
-                    else:
-                        task_str = task_content
-                else:
-                    task_str = task
-
-                formatted_summary.append(f"• {task_str.strip()}")
+                formatted_summary.append(self.format_task_line(task, include_date))
 
         # Join all lines into a single string, with newlines between each
         return header + "\n".join(formatted_summary)
 
+    def format_task_line(self, task, include_date=False):
+        """Format one task (content, or a (content, date) tuple) as a bullet point."""
+        if isinstance(task, tuple):
+            task_content, task_date = task  # Unpack tuple values
+            if include_date:
+                # Ensure task_date is formatted as DD/MM/YYYY
+                try:
+                    formatted_date = datetime.strptime(task_date, '%Y-%m-%d').strftime('%d/%m/%Y')
+                except ValueError:
+                    formatted_date = task_date  # If conversion fails, use the original date
 
-    
+                task_str = f"[{formatted_date}] {task_content}"
+            else:
+                task_str = task_content
+        else:
+            task_str = task
+
+        return f"• {task_str.strip()}"
+
+    async def stream_task_summary_lines(self, rows, include_date=False):
+        """Incrementally format (author, channel, content, day) rows, sorted by author and channel.
 
-    def summarize_tasks_with_context(self, tasks):
+        Yields the same lines format_task_summary would produce for each user, but one
+        row at a time, so a report never has to be held in memory as a whole.
+        """
+        current_author = current_channel = None
+        async for author, channel, content, day in rows:
+            if author != current_author:
+                yield ""
+                yield f"User: {author}"
+                current_author, current_channel = author, None
+            if channel != current_channel:
+                yield ""
+                yield f"{channel}:"
+                current_channel = channel
+            yield self.format_task_line((content, day), include_date)
+
+
+    async def summarize_tasks_with_context(self, tasks):
         """Summarize tasks with context using T5 model."""
         if not tasks:
             return "No tasks found for today."
 
-        channel_summaries = []
-        for channel, contents in tasks.items():
-            task_text = self.prioritize_tasks(", ".join(contents))
-            if len(task_text.split()) < 5:
-                channel_summaries.append(f"{channel}: \n {task_text}")
-                continue
+        async def summarize_channel(channel, contents):
+            return f"{channel}: \n {await self.summarize_channel_tasks(channel, contents)}"
 
-            contextual_input = f"Summarize the following tasks for {channel}: \n {task_text}"
+        # Submit every channel at once so the service can batch them together
+        channel_summaries = await asyncio.gather(*(summarize_channel(channel, contents) for channel, contents in tasks.items()))
+        return "\n".join(channel_summaries)
+
+    def channel_summary_input(self, channel, contents):
+        """(prioritized task list, T5 input) for one channel; the input is None if the list is too short to summarize."""
+        task_text = self.prioritize_tasks(", ".join(contents))
+        if len(task_text.split()) < 5:
+            return task_text, None
+        return task_text, f"Summarize the following tasks for {channel}: \n {task_text}"
+
+    @timed('nlp.summarize_channel')
+    async def summarize_channel_tasks(self, channel, contents):
+        """Summarize one channel's tasks with T5; short task lists (and failures) come back as the prioritized list itself."""
+        task_text, contextual_input = self.channel_summary_input(channel, contents)
+        if contextual_input is None:
+            return task_text
+        try:
+            return await self.summarizer.summarize(contextual_input)
+        except Exception as e:
+            logger.warning("Error summarizing tasks for channel %s: %s", channel, e)
+            return task_text
+
+    def summarize_channels(self, channel_contents, batch_size=8):
+        """Blocking summarize_channel_tasks for [(channel, contents)], in T5 batches; for NLPWorkerPool processes."""
+        prepared = [self.channel_summary_input(channel, contents) for channel, contents in channel_contents]
+        summaries = [task_text for task_text, _ in prepared]
+        pending = [i for i, (_, contextual_input) in enumerate(prepared) if contextual_input is not None]
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
             try:
-                summary = self.summarize_or_answer_in_language(contextual_input)
-                channel_summaries.append(f"{channel}: \n {summary}")
+                for i, summary in zip(batch, self.summarize_batch_with_t5([prepared[i][1] for i in batch])):
+                    summaries[i] = summary
             except Exception as e:
-                print(f"Error summarizing tasks for channel {channel}: \n{e}")
-                channel_summaries.append(task_text)
-        return "\n".join(channel_summaries)
+                logger.warning("Error summarizing a batch of %d channels: %s", len(batch), e)
+        return summaries
+
+    def translate_digests(self, digests, target_language):
+        """Translate (contents, summary) digest pairs into target_language; returns them in the same shape.
+
+        Every task line and summary line goes through one translate_report call, so
+        lines already in the target language and cached lines cost nothing.
+        """
+        lines, shapes = [], []
+        for contents, summary in digests:
+            summary_lines = summary.split("\n") if summary else []
+            lines += [content.replace("\n", " ") for content in contents] + summary_lines
+            shapes.append((len(contents), len(summary_lines) if summary else None))
+        translated = self.translate_report("\n".join(lines), target_language).split("\n") if lines else []
+        if len(translated) != len(lines):
+            translated = lines  # Never misalign tasks; an untranslated digest is still correct
+        results, position = [], 0
+        for content_count, summary_count in shapes:
+            contents = translated[position:position + content_count]
+            position += content_count
+            summary = None
+            if summary_count is not None:
+                summary = "\n".join(translated[position:position + summary_count])
+                position += summary_count
+            results.append((contents, summary))
+        return results
     
     
     